@@ -1,15 +1,25 @@
 #!/usr/bin/env python3
 import os
 import sys
+import argparse
 import asyncio
-import datetime
+import time
 import logging
-from typing import TypedDict, List, Optional, Dict, Any
-from langgraph.graph import StateGraph, END
-from research.research_agent import ResearchAgent
-from research.draft_agent import DraftAgent
+import uuid
+import threading
+import functools
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import TypedDict, List, Optional, Dict, Any, AsyncIterator, Annotated, Tuple
+from research.clients import get_research_agent, get_draft_agent, get_search, needs_api_keys, provider_mode
 from research.visualize import VisualizationAgent
-from research.export import Exporter
+from research.export import Exporter, export_pool
+from research.cache import ResultCache
+from research.blobstore import BlobStore
+from research.answer_cache import AnswerCache
+from research.results_store import ResultsStore
+from research.ranking import ResultRanker
+from research.refresh import diff_sources, is_material, summarize_diff
+from research.metrics import METRICS, Trace, span, trace_run, traced_node
 
 # Configure logging
 logging.basicConfig(
@@ -25,35 +35,163 @@ logger = logging.getLogger(__name__)
 # Configuration
 DEFAULT_OUTPUT_DIR = "./research_outputs"
 os.makedirs(DEFAULT_OUTPUT_DIR, exist_ok=True)
+METRICS_PATH = os.getenv("RESEARCH_METRICS_PATH", os.path.join(DEFAULT_OUTPUT_DIR, "metrics.prom"))
+SEARCH_CACHE_PATH = os.getenv("SEARCH_CACHE_PATH", os.path.join(".cache", "search_cache.sqlite"))
+SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", "3600"))
+SEARCH_CACHE = ResultCache(SEARCH_CACHE_PATH, ttl=SEARCH_CACHE_TTL)
+# Per-source summaries are keyed by content hash, so they can be kept much longer
+SUMMARY_CACHE = ResultCache(
+    os.getenv("SUMMARY_CACHE_PATH", os.path.join(".cache", "summary_cache.sqlite")),
+    ttl=float(os.getenv("SUMMARY_CACHE_TTL", str(7 * 86400)))
+)
+BLOB_STORE = BlobStore(os.getenv("RESEARCH_BLOB_DIR", os.path.join(".cache", "blobs")))
+ANSWER_CACHE = AnswerCache(
+    os.getenv("ANSWER_CACHE_PATH", os.path.join(".cache", "answer_cache.sqlite")),
+    threshold=float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.85")),
+    max_age=float(os.getenv("ANSWER_CACHE_MAX_AGE", "86400"))
+)
+# Reusing answers to similar questions is opt-in (ANSWER_CACHE_ENABLED=1 or --answer-cache);
+# answers are always stored so --refresh has a baseline
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "0").lower() in ("1", "true", "yes", "on")
+# Append-only history of every run's sources and timings, for analysis
+RESULTS_STORE = ResultsStore(os.getenv("RESULTS_STORE_DIR", os.path.join(DEFAULT_OUTPUT_DIR, "results")))
+# On a hit, "report" returns the stored report; "redraft" drafts again from the cached sources
+ANSWER_CACHE_ON_HIT = os.getenv("ANSWER_CACHE_ON_HIT", "report")
+# Fraction of sources that must be new, changed or gone before a refresh redrafts
+REFRESH_MIN_CHANGE = float(os.getenv("REFRESH_MIN_CHANGE", "0.2"))
+RANK_TOP_K = int(os.getenv("RANK_TOP_K", "10"))
+# Per-domain score history across runs: blended into ranking and drawn on the chart
+RELIABILITY_PATH = os.getenv("RELIABILITY_INDEX_PATH", os.path.join(".cache", "domain_reliability.npz"))
+RELIABILITY_WEIGHT = float(os.getenv("RELIABILITY_WEIGHT", "0.2"))
+# Domains seen at least EXCLUDE_MIN_COUNT times with reliability below EXCLUDE_BELOW
+# are excluded from searches (0 disables)
+EXCLUDE_BELOW = float(os.getenv("EXCLUDE_BELOW", "0.35"))
+EXCLUDE_MIN_COUNT = int(os.getenv("EXCLUDE_MIN_COUNT", "5"))
+# Comma-separated docx/html/pdf; the first format is the report path returned to callers
+REPORT_FORMATS = [f.strip() for f in os.getenv("REPORT_FORMATS", "docx").split(",") if f.strip()]
+# Render exports in this many worker processes instead of a thread (0 = thread)
+EXPORT_PROCESSES = int(os.getenv("EXPORT_PROCESSES", "0"))
+# "fast" renders a 100 dpi chart on a reused canvas; "print" the 300 dpi tight-layout one
+CHART_QUALITY = os.getenv("CHART_QUALITY", "fast")
+# Word cannot embed svg, so svg charts are only used when no docx report is written
+CHART_FORMAT = os.getenv("CHART_FORMAT", "png") if "docx" not in REPORT_FORMATS else "png"
+DEFAULT_RESEARCH_MODE = os.getenv("RESEARCH_MODE", "agent")
+# single | map_reduce | auto (map-reduce only when the sources overflow the prompt budget)
+DRAFT_MODE = os.getenv("DRAFT_MODE", "single")
+# Graph state is checkpointed here after every node so failed runs can resume ("" disables)
+CHECKPOINT_PATH = os.getenv("CHECKPOINT_PATH", os.path.join(".cache", "checkpoints.sqlite"))
 
 # Disable verbose outputs
 os.environ["LANGCHAIN_VERBOSE"] = "false"
 os.environ["TAVILY_VERBOSE"] = "false"
 
+_reliability_index = None
+_reliability_lock = threading.Lock()
+
+def get_reliability_index() -> Optional[Any]:
+    """Process-wide domain reliability index; NumPy loads on first use, not at startup.
+
+    None in record and replay modes: the index changes with every run, and ranking
+    that depends on it would reorder sources and change the recorded prompts.
+    """
+    global _reliability_index
+    if provider_mode() in ("record", "replay"):
+        return None
+    if _reliability_index is None:
+        with _reliability_lock:
+            if _reliability_index is None:
+                from research.reliability import DomainReliabilityIndex
+                _reliability_index = DomainReliabilityIndex(RELIABILITY_PATH)
+    return _reliability_index
+
+def _run_id(state: Dict[str, Any]) -> str:
+    """Run id that names the run's artifacts; runs checkpointed before it was in state get a fresh one"""
+    return state.get("run_id") or uuid.uuid4().hex
+
+def merge_errors(current: Optional[str], update: Optional[str]) -> Optional[str]:
+    """Combine errors from parallel branches instead of letting one overwrite another"""
+    if not update:
+        return current
+    if not current:
+        return update
+    if update in current:
+        return current
+    return f"{current}; {update}"
+
 class ResearchState(TypedDict):
     query: str
+    run_id: str
+    research_mode: Optional[str]
     research_results: List[Dict[str, Any]]
     visualization_path: Optional[str]
     report: Dict[str, Any]
-    error: Optional[str]
+    output_path: Optional[str]
+    previous: Optional[Dict[str, Any]]
+    source_diff: Optional[Dict[str, Any]]
+    error: Annotated[Optional[str], merge_errors]
 
+@traced_node("research")
 async def research_node(state: ResearchState) -> Dict[str, Any]:
     """Execute research and collect data"""
     try:
         logger.info(f"Starting research for: {state['query']}")
-        agent = ResearchAgent(model="gemini-1.5-pro-latest")
-        results = await agent.run(state["query"])
+        agent = get_research_agent(model="gemini-1.5-pro-latest", cache=SEARCH_CACHE,
+                                   blob_store=BLOB_STORE)
+        index = get_reliability_index()
+        excluded = (index.low_value_domains(EXCLUDE_BELOW, EXCLUDE_MIN_COUNT)
+                    if index is not None and EXCLUDE_BELOW > 0 else [])
+        if excluded:
+            logger.info(f"Excluding {len(excluded)} low-reliability domains: {', '.join(excluded[:5])}")
+        # Refresh runs must see current search results, not cached ones
+        results = await agent.run(state["query"], mode=state.get("research_mode"),
+                                  fresh=state.get("previous") is not None,
+                                  exclude_domains=excluded)
+        logger.info(f"Search cache stats: {SEARCH_CACHE.stats()}")
+        logger.info(f"Search hedging stats: {get_search().stats()}")
         
         if not results:
-            logger.warning("No research results returned")
-            return {"research_results": [], "error": "No research data found"}
+            raise ValueError("No research data found")
             
         logger.info(f"Research completed with {len(results)} sources")
         return {"research_results": results, "error": None}
     except Exception as e:
         logger.error(f"Research failed: {str(e)}", exc_info=True)
-        return {"research_results": [], "error": f"Research failed: {str(e)}"}
+        # Halt the run here; it is checkpointed and resumes by searching again
+        raise
+
+@traced_node("rank")
+async def rank_node(state: ResearchState) -> Dict[str, Any]:
+    """Deduplicate and re-rank research results before drafting"""
+    try:
+        if not state.get("research_results"):
+            return {}
+        ranker = ResultRanker(top_k=RANK_TOP_K, reliability=get_reliability_index(),
+                              reliability_weight=RELIABILITY_WEIGHT)
+        ranked = ranker.rank(state["query"], state["research_results"])
+        logger.info(f"Kept {len(ranked)} of {len(state['research_results'])} research results")
+        return {"research_results": ranked}
+    except Exception as e:
+        logger.error(f"Ranking failed: {str(e)}", exc_info=True)
+        return {}
+
+@traced_node("diff")
+async def diff_node(state: ResearchState) -> Dict[str, Any]:
+    """Compare refreshed sources with the previous run's and reuse its report if little changed"""
+    previous = state["previous"]
+    diff = diff_sources(previous["sources"], state["research_results"])
+    diff["material"] = is_material(diff, REFRESH_MIN_CHANGE)
+    logger.info(f"Refresh diff: {summarize_diff(diff)}")
+    if diff["material"]:
+        return {"source_diff": diff}
+
+    prior_path = previous["result"].get("path")
+    return {
+        "source_diff": diff,
+        "report": previous["report"],
+        "output_path": prior_path if prior_path and os.path.exists(prior_path) else None
+    }
 
+@traced_node("visualize")
 async def visualize_node(state: ResearchState) -> Dict[str, Any]:
     """Generate visualizations from research data"""
     try:
@@ -61,14 +199,19 @@ async def visualize_node(state: ResearchState) -> Dict[str, Any]:
             raise ValueError("No research data for visualization")
         
         logger.info("Generating reliability visualization")
-        viz_agent = VisualizationAgent()
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        image_path = os.path.join(DEFAULT_OUTPUT_DIR, f"reliability_{timestamp}.png")
+        viz_agent = VisualizationAgent(quality=CHART_QUALITY)
+        image_path = os.path.join(DEFAULT_OUTPUT_DIR, f"reliability_{_run_id(state)}.{CHART_FORMAT}")
         
-        viz_agent.plot_reliability(
-            state["research_results"],
+        index = get_reliability_index()
+        # Render in a worker thread so matplotlib does not block the event loop
+        image_path = await asyncio.to_thread(
+            viz_agent.plot_reliability,
+            index.annotate(state["research_results"]) if index is not None else state["research_results"],
             filename=image_path
         )
+        # plot_reliability logs its own failures and returns None instead of raising
+        if image_path is None:
+            raise RuntimeError("chart could not be rendered")
         
         logger.info(f"Visualization saved to {image_path}")
         return {"visualization_path": image_path, "error": None}
@@ -76,6 +219,7 @@ async def visualize_node(state: ResearchState) -> Dict[str, Any]:
         logger.error(f"Visualization failed: {str(e)}", exc_info=True)
         return {"visualization_path": None, "error": f"Visualization failed: {str(e)}"}
 
+@traced_node("draft")
 async def draft_node(state: ResearchState) -> Dict[str, Any]:
     """Generate report from research data"""
     try:
@@ -83,98 +227,467 @@ async def draft_node(state: ResearchState) -> Dict[str, Any]:
             raise ValueError("No research data")
 
         logger.info("Generating research report")
-        agent = DraftAgent(model="gemini-1.5-pro-latest")
-        report = await agent.generate_report(
-            state["query"],
-            state["research_results"]
-        )
+        agent = get_draft_agent(model="gemini-1.5-pro-latest", blob_store=BLOB_STORE,
+                                mode=DRAFT_MODE, summary_cache=SUMMARY_CACHE)
+        if (state.get("source_diff") or {}).get("material"):
+            report = await agent.update_report(
+                state["query"],
+                state["previous"],
+                state["research_results"],
+                state["source_diff"]
+            )
+        else:
+            report = await agent.generate_report(
+                state["query"],
+                state["research_results"]
+            )
         return {"report": report, "error": None}
     except Exception as e:
         logger.error(f"Report generation failed: {str(e)}", exc_info=True)
-        return {
-            "report": {
-                "question": state["query"],
-                "answer": f"Could not generate answer: {str(e)}",
-                "sources": [],
-                "query_variations": []
-            },
-            "error": f"Drafting failed: {str(e)}"
-        }
-
-def create_workflow() -> Any:
-    """Create research workflow with visualization"""
+        # Halt the run so a retry resumes from the checkpoint after research
+        # instead of exporting an error report
+        raise
+
+@traced_node("export")
+async def export_node(state: ResearchState) -> Dict[str, Any]:
+    """Join visualization and draft branches and export the report in each configured format"""
+    try:
+        if not state.get("report"):
+            raise ValueError("No report generated")
+
+        run_id = _run_id(state)
+
+        async def export(format_type: str) -> Optional[str]:
+            call = functools.partial(
+                Exporter.export,
+                format_type,
+                state["report"]["answer"],
+                image_path=state.get("visualization_path"),
+                sources=state["report"].get("sources", []),
+                filename=os.path.join(DEFAULT_OUTPUT_DIR, f"report_{run_id}.{format_type}")
+            )
+            if EXPORT_PROCESSES > 0:
+                return await asyncio.get_running_loop().run_in_executor(export_pool(EXPORT_PROCESSES), call)
+            return await asyncio.to_thread(call)
+
+        saved = await asyncio.gather(*(export(format_type) for format_type in REPORT_FORMATS))
+        output_path = saved[0]
+        if not output_path:
+            raise ValueError(f"Could not save {REPORT_FORMATS[0]} report")
+        return {"output_path": output_path}
+    except Exception as e:
+        logger.error(f"Export failed: {str(e)}", exc_info=True)
+        raise
+
+def route_start(state: ResearchState) -> str:
+    """Skip research when the state already carries sources (e.g. from the answer cache)"""
+    return "rank" if state.get("research_results") else "research"
+
+def route_after_rank(state: ResearchState) -> Any:
+    """Refresh runs diff against the previous run before drafting"""
+    return "diff" if state.get("previous") else ["visualize", "draft"]
+
+def route_after_diff(state: ResearchState) -> Any:
+    """Redraft on material change; otherwise reuse the previous report (re-exporting if it is gone)"""
+    if state["source_diff"]["material"]:
+        return ["visualize", "draft"]
+    from langgraph.graph import END
+    return END if state.get("output_path") else "export"
+
+def create_workflow(checkpointer: Optional[Any] = None) -> Any:
+    """Create research workflow: research -> rank -> [diff] -> (visualize || draft) -> export"""
+    # LangGraph is the heaviest import; load it when the graph is first built, not at startup
+    from langgraph.graph import StateGraph, END
     workflow = StateGraph(ResearchState)
     workflow.add_node("research", research_node)
+    workflow.add_node("rank", rank_node)
+    workflow.add_node("diff", diff_node)
     workflow.add_node("visualize", visualize_node)
     workflow.add_node("draft", draft_node)
+    workflow.add_node("export", export_node)
     
-    workflow.set_entry_point("research")
-    workflow.add_edge("research", "visualize")
-    workflow.add_edge("visualize", "draft")
-    workflow.add_edge("draft", END)
+    workflow.set_conditional_entry_point(route_start, {"research": "research", "rank": "rank"})
+    workflow.add_edge("research", "rank")
+    # Visualization only needs research results, so it runs alongside drafting
+    workflow.add_conditional_edges("rank", route_after_rank, ["diff", "visualize", "draft"])
+    workflow.add_conditional_edges("diff", route_after_diff, ["visualize", "draft", "export", END])
+    workflow.add_edge(["visualize", "draft"], "export")
+    workflow.add_edge("export", END)
     
-    return workflow.compile()
+    return workflow.compile(checkpointer=checkpointer)
 
-async def run_pipeline(query: str) -> Dict[str, Any]:
-    """Execute complete research pipeline"""
-    logger.info(f"Starting pipeline for query: {query}")
-    app = create_workflow()
-    try:
-        results = await app.ainvoke({
-            "query": query,
-            "research_results": [],
-            "visualization_path": None,
-            "report": {},
-            "error": None
+_workflow = None
+_workflow_lock = threading.Lock()
+
+def get_workflow() -> Any:
+    """Return the compiled workflow, building it once per process"""
+    global _workflow
+    if _workflow is None:
+        with _workflow_lock:
+            if _workflow is None:
+                _workflow = create_workflow()
+    return _workflow
+
+@asynccontextmanager
+async def checkpointed_workflow(path: str = CHECKPOINT_PATH) -> AsyncIterator[Any]:
+    """The shared workflow with a SQLite checkpointer open for the duration of the block.
+
+    Each run opens its own connection: aiosqlite connections belong to one event
+    loop and keep a worker thread alive until they are closed. Without a path,
+    without langgraph-checkpoint-sqlite, or when the saver cannot be opened or read
+    (e.g. an incompatible aiosqlite), the plain workflow is used.
+    """
+    saver_class = None
+    if path:
+        try:
+            from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver as saver_class
+        except ImportError:
+            logger.warning("langgraph-checkpoint-sqlite is not installed; failed runs cannot be resumed")
+    if saver_class is None:
+        yield get_workflow()
+        return
+    async with AsyncExitStack() as stack:
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            checkpointer = await stack.enter_async_context(saver_class.from_conn_string(path))
+            # Read once up front: a saver that cannot read state would fail every run
+            await checkpointer.aget_tuple(_run_config(""))
+            app = get_workflow().copy(update={"checkpointer": checkpointer})
+        except Exception as e:
+            logger.warning(f"Checkpointing to {path} is unavailable, failed runs cannot be resumed: {str(e)}")
+            app = get_workflow()
+        yield app
+
+def _run_config(run_id: str, **metadata: Any) -> Dict[str, Any]:
+    return {"configurable": {"thread_id": run_id}, "metadata": metadata}
+
+async def _unfinished_state(app: Any, run_id: str) -> Optional[Any]:
+    """Checkpointed state of run_id if it stopped before reaching the end, else None"""
+    if app.checkpointer is None:
+        return None
+    snapshot = await app.aget_state(_run_config(run_id))
+    return snapshot if snapshot.next else None
+
+async def _finish_run(app: Any, run_id: str) -> None:
+    """Drop a completed run's checkpoints; only unfinished runs are kept"""
+    if app.checkpointer is not None:
+        try:
+            await app.checkpointer.adelete_thread(run_id)
+        except Exception as e:
+            logger.warning(f"Could not delete checkpoints of run {run_id}: {str(e)}")
+
+async def list_runs() -> List[Dict[str, Any]]:
+    """Unfinished (failed or interrupted) runs that can be resumed, newest first"""
+    async with checkpointed_workflow() as app:
+        return await _list_runs(app)
+
+async def _list_runs(app: Any) -> List[Dict[str, Any]]:
+    if app.checkpointer is None:
+        return []
+    run_ids: List[str] = []
+    async for checkpoint in app.checkpointer.alist(None):
+        run_id = checkpoint.config["configurable"]["thread_id"]
+        if run_id not in run_ids:
+            run_ids.append(run_id)
+    runs = []
+    for run_id in run_ids:
+        snapshot = await _unfinished_state(app, run_id)
+        if snapshot is None:
+            continue
+        # Branches cancelled because a sibling failed record a CancelledError; report the cause
+        errors = [str(task.error) for task in snapshot.tasks
+                  if task.error and not str(task.error).startswith("CancelledError")]
+        runs.append({
+            "run_id": run_id,
+            "query": snapshot.values.get("query") or snapshot.metadata.get("query"),
+            "next": list(snapshot.next),
+            "updated_at": snapshot.created_at,
+            "error": errors[0] if errors else None
         })
+    runs.sort(key=lambda run: run["updated_at"] or "", reverse=True)
+    return runs
 
-        if not results.get("report"):
-            raise ValueError("No report generated")
+def _initial_state(query: str, mode: Optional[str] = None, run_id: Optional[str] = None) -> ResearchState:
+    return {
+        "query": query,
+        "run_id": run_id or uuid.uuid4().hex,
+        "research_mode": mode or DEFAULT_RESEARCH_MODE,
+        "research_results": [],
+        "visualization_path": None,
+        "report": {},
+        "output_path": None,
+        "previous": None,
+        "source_diff": None,
+        "error": None
+    }
 
-        # Save report
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        output_path = os.path.join(DEFAULT_OUTPUT_DIR, f"report_{timestamp}.docx")
+def _pipeline_result(results: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the pipeline result from a finished workflow state"""
+    if not results.get("report"):
+        raise ValueError("No report generated")
+    if not results.get("output_path"):
+        raise ValueError(results.get("error") or "Report was not exported")
 
-        Exporter.to_word(
-            content_text=results["report"]["answer"],
-            image_path=results.get("visualization_path"),
-            sources=results["report"].get("sources", []),
-            filename=output_path
-        )
+    result = {
+        "success": True,
+        "answer": results["report"]["answer"],
+        "path": results["output_path"],
+        "sources": len(results["report"].get("sources", [])),
+        "visualization": results.get("visualization_path") is not None,
+        "query_variations": results["report"].get("query_variations", [])
+    }
+    if results.get("source_diff"):
+        result["changes"] = summarize_diff(results["source_diff"])
+    return result
+
+def _check_answer_cache(query: str, mode: Optional[str] = None, use_cache: Optional[bool] = None,
+                        refresh: bool = False, run_id: Optional[str] = None) -> Tuple[Optional[Dict[str, Any]], ResearchState]:
+    """Return (cached pipeline result or None, initial workflow state) for a query"""
+    state = _initial_state(query, mode, run_id)
+    if refresh:
+        state["previous"] = ANSWER_CACHE.previous(query)
+        if state["previous"] is None:
+            logger.info(f"No previous answer to refresh for '{query}'; researching from scratch")
+        return None, state
+    if not (ANSWER_CACHE_ENABLED if use_cache is None else use_cache):
+        return None, state
+    with span("answer_cache") as s:
+        hit = ANSWER_CACHE.lookup(query)
+        s.set(cache_hit=hit is not None)
+        if hit is None:
+            return None, state
+        s.set(similarity=round(hit["similarity"], 4), age=round(hit["age"], 1), matched_query=hit["query"])
 
+    if ANSWER_CACHE_ON_HIT == "report" and os.path.exists(hit["result"].get("path") or ""):
         return {
-            "success": True,
-            "answer": results["report"]["answer"],
-            "path": output_path,
-            "sources": len(results["report"].get("sources", [])),
-            "visualization": results.get("visualization_path") is not None,
-            "query_variations": results["report"].get("query_variations", [])
-        }
+            **hit["result"],
+            "cached": True,
+            "similarity": hit["similarity"],
+            "cache_age": hit["age"]
+        }, state
+    # Stored report is gone or unwanted: redraft from the cached sources
+    state["research_results"] = hit["sources"]
+    return None, state
+
+def _store_answer(query: str, results: Dict[str, Any], result: Dict[str, Any]) -> None:
+    if results.get("source_diff") and not results["source_diff"]["material"]:
+        # The previous report was kept. Storing it with the new sources would move the
+        # refresh baseline without a redraft, so small changes could add up unnoticed
+        return
+    try:
+        ANSWER_CACHE.store(query, results["report"], results["research_results"], result)
+        logger.info(f"Answer cache stats: {ANSWER_CACHE.stats()}")
     except Exception as e:
-        logger.error(f"Pipeline failed: {str(e)}", exc_info=True)
-        
-        # Generate error report
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        error_path = os.path.join(DEFAULT_OUTPUT_DIR, f"error_report_{timestamp}.txt")
-        
-        with open(error_path, 'w') as f:
-            f.write(f"Research failed for query: {query}\n")
-            f.write(f"Error: {str(e)}\n")
-            f.write("\nSuggestions:\n")
-            f.write("- Check your query spelling\n")
-            f.write("- Verify your API keys are valid\n")
-            f.write("- Check your internet connection\n")
-        
-        return {
-            "success": False,
-            "answer": f"Research failed. Error report saved to {error_path}",
-            "path": error_path,
-            "sources": 0,
-            "visualization": False,
-            "query_variations": []
-        }
-
-async def interactive_session():
+        logger.warning(f"Could not store answer: {str(e)}")
+
+def _record_results(trace: Trace, results: Dict[str, Any]) -> None:
+    """Append the run's sources and stage timings to the results store"""
+    try:
+        timings = {"total": round(time.time() - trace.start, 3)}
+        for s in trace.spans:
+            if s.name in ("node.research", "node.draft") and s.duration is not None:
+                timings[s.name.split(".", 1)[1]] = round(s.duration, 3)
+        RESULTS_STORE.record_run(trace.run_id, results["query"], results["report"].get("sources", []), timings)
+    except Exception as e:
+        logger.warning(f"Could not record results: {str(e)}")
+
+def _update_reliability(results: Dict[str, Any]) -> None:
+    """Fold this run's freshly searched sources into the domain reliability index"""
+    try:
+        index = get_reliability_index()
+        if index is None:
+            return
+        index.update(results["research_results"])
+        index.save()
+    except Exception as e:
+        logger.warning(f"Could not update reliability index: {str(e)}")
+
+def _failure_result(query: str, e: Exception, run_id: str, resumable: bool = False) -> Dict[str, Any]:
+    """Write an error report and build the failed pipeline result"""
+    error_path = os.path.join(DEFAULT_OUTPUT_DIR, f"error_report_{run_id}.txt")
+    
+    with open(error_path, 'w') as f:
+        f.write(f"Research failed for query: {query}\n")
+        f.write(f"Error: {str(e)}\n")
+        f.write("\nSuggestions:\n")
+        f.write("- Check your query spelling\n")
+        f.write("- Verify your API keys are valid\n")
+        f.write("- Check your internet connection\n")
+        if resumable:
+            f.write(f"- Resume from the last completed step: python app.py --resume {run_id}\n")
+    
+    return {
+        "success": False,
+        "answer": f"Research failed. Error report saved to {error_path}",
+        "path": error_path,
+        "sources": 0,
+        "visualization": False,
+        "query_variations": [],
+        "run_id": run_id if resumable else None
+    }
+
+def _save_trace(trace: Trace, result: Dict[str, Any]) -> None:
+    """Write the run's JSON trace next to its report and refresh the metrics file"""
+    try:
+        # Keyed by run id: a cached or unchanged-refresh result points at an earlier run's report
+        trace_path = os.path.join(DEFAULT_OUTPUT_DIR, f"trace_{trace.run_id}.json")
+        result["trace"] = trace.save(trace_path)
+        METRICS.inc("research_pipeline_runs_total", status="success" if result["success"] else "failed")
+        METRICS.write(METRICS_PATH)
+    except Exception as e:
+        logger.warning(f"Could not save trace: {str(e)}")
+
+async def _resumable(app: Optional[Any], run_id: str) -> bool:
+    try:
+        return app is not None and await _unfinished_state(app, run_id) is not None
+    except Exception:
+        return False
+
+async def _start_run(app: Any, query: str, mode: Optional[str], use_cache: Optional[bool], refresh: bool,
+                     run_id: str) -> Tuple[Optional[Dict[str, Any]], Optional[ResearchState], Dict[str, Any], Dict[str, Any]]:
+    """Return (cached result or None, graph input, run config, state so far).
+
+    When run_id names an unfinished run the graph input is None, which makes the
+    graph continue from that run's last checkpoint.
+    """
+    snapshot = await _unfinished_state(app, run_id)
+    if snapshot is not None:
+        logger.info(f"Resuming run {run_id} at {', '.join(snapshot.next)}")
+        config = _run_config(run_id, query=snapshot.values["query"],
+                             store_answer=snapshot.metadata.get("store_answer", False))
+        return None, None, config, dict(snapshot.values)
+    result, state = _check_answer_cache(query, mode, use_cache, refresh, run_id)
+    # Answers redrafted from answer cache sources are already stored
+    config = _run_config(run_id, query=query, store_answer=not state["research_results"])
+    return result, state, config, dict(state)
+
+async def run_pipeline(query: str, mode: Optional[str] = None, use_cache: Optional[bool] = None,
+                       refresh: bool = False, run_id: Optional[str] = None) -> Dict[str, Any]:
+    """Execute complete research pipeline; mode selects "agent" or "direct" research.
+
+    Near-duplicates of recently answered queries are served from the answer cache
+    when use_cache is True (None follows ANSWER_CACHE_ENABLED). refresh re-searches
+    a previously answered query and only redrafts (from the changed sources) if its
+    sources materially changed.
+    The graph is checkpointed under run_id after every node; passing the id of a
+    failed or interrupted run resumes it from its last completed node.
+    """
+    logger.info(f"Starting pipeline for query: {query}")
+    run_id = run_id or uuid.uuid4().hex
+    with trace_run(query, run_id=run_id) as trace:
+        async with checkpointed_workflow() as app:
+            try:
+                result, graph_input, config, _ = await _start_run(app, query, mode, use_cache, refresh, run_id)
+                if result is None:
+                    results = await app.ainvoke(graph_input, config)
+                    result = _pipeline_result(results)
+                    _record_results(trace, results)
+                    if config["metadata"]["store_answer"]:
+                        _store_answer(results["query"], results, result)
+                        _update_reliability(results)
+                    await _finish_run(app, run_id)
+                result["run_id"] = run_id
+            except Exception as e:
+                logger.error(f"Pipeline failed: {str(e)}", exc_info=True)
+                result = _failure_result(query, e, run_id, resumable=await _resumable(app, run_id))
+    _save_trace(trace, result)
+    return result
+
+async def stream_pipeline(query: str, mode: Optional[str] = None, use_cache: Optional[bool] = None,
+                          refresh: bool = False, run_id: Optional[str] = None) -> AsyncIterator[Dict[str, Any]]:
+    """Execute the pipeline, yielding progress and report tokens as they happen.
+
+    Yields {"type": "node", "node": name} when a graph node finishes,
+    {"type": "token", "text": chunk} for each drafted report chunk, and finally
+    {"type": "result", "result": {...}} once the Word export has completed.
+    An answer cache hit yields only the result. run_id works as in run_pipeline.
+    """
+    logger.info(f"Starting streaming pipeline for query: {query}")
+    run_id = run_id or uuid.uuid4().hex
+    with trace_run(query, run_id=run_id) as trace:
+        async with checkpointed_workflow() as app:
+            try:
+                result, graph_input, config, state = await _start_run(app, query, mode, use_cache, refresh, run_id)
+                if result is None:
+                    async for stream_mode, chunk in app.astream(graph_input, config,
+                                                                stream_mode=["updates", "messages"]):
+                        if stream_mode == "messages":
+                            message, metadata = chunk
+                            if metadata.get("langgraph_node") == "draft" and message.content:
+                                yield {"type": "token", "text": message.content}
+                        else:
+                            for node, update in chunk.items():
+                                for key, value in (update or {}).items():
+                                    state[key] = merge_errors(state["error"], value) if key == "error" else value
+                                yield {"type": "node", "node": node}
+                    result = _pipeline_result(state)
+                    _record_results(trace, state)
+                    if config["metadata"]["store_answer"]:
+                        _store_answer(state["query"], state, result)
+                        _update_reliability(state)
+                    await _finish_run(app, run_id)
+                result["run_id"] = run_id
+            except Exception as e:
+                logger.error(f"Pipeline failed: {str(e)}", exc_info=True)
+                result = _failure_result(query, e, run_id, resumable=await _resumable(app, run_id))
+    _save_trace(trace, result)
+    yield {"type": "result", "result": result}
+
+def _print_result(query: str, result: Dict[str, Any], show_answer: bool = True) -> None:
+    print("\n" + "="*60)
+    if result["success"]:
+        print(f"📝 Research Question: {query}")
+        if show_answer:
+            print("\n🔎 Findings:")
+            print(result["answer"])
+        print(f"\n📄 Report saved to: {result['path']}")
+        print(f"🔗 Sources used: {result['sources']}")
+        if result["visualization"]:
+            print("📊 Reliability visualization included")
+        if result.get("cached"):
+            print(f"♻️ Reused an answer from {result['cache_age'] / 60:.0f} min ago "
+                  f"(similarity {result['similarity']:.2f})")
+        if result.get("changes"):
+            changes = result["changes"]
+            print(f"🔁 Refresh: {changes['added']} new, {changes['changed']} changed, "
+                  f"{changes['removed']} removed sources"
+                  + ("" if changes["material"] else " (report unchanged)"))
+        if len(result["query_variations"]) > 1:
+            print(f"\nℹ️ Note: Searched variations: {', '.join(result['query_variations'])}")
+    else:
+        print("❌ Research failed")
+        print(f"Details: {result['answer']}")
+        if result.get("run_id"):
+            print(f"↩️ Resume from the last completed step: python app.py --resume {result['run_id']}")
+    print("="*60)
+
+async def _stream_to_terminal(query: str, mode: Optional[str] = None, use_cache: Optional[bool] = None,
+                              refresh: bool = False, run_id: Optional[str] = None) -> Dict[str, Any]:
+    result: Dict[str, Any] = {}
+    drafting = False
+    mid_line = False
+    async for event in stream_pipeline(query, mode, use_cache, refresh, run_id):
+        if event["type"] == "node":
+            if mid_line:
+                print()
+                mid_line = False
+            print(f"✅ {event['node']} complete")
+        elif event["type"] == "token":
+            if not drafting:
+                print("\n🔎 Findings:")
+                drafting = True
+            print(event["text"], end="", flush=True)
+            mid_line = True
+        else:
+            result = event["result"]
+    if not drafting and result.get("success"):
+        # Nothing was streamed (e.g. drafting failed), so show the stored answer
+        print("\n🔎 Findings:")
+        print(result["answer"])
+    return result
+
+async def interactive_session(stream: bool = False, mode: Optional[str] = None, use_cache: Optional[bool] = None,
+                              refresh: bool = False):
     """Interactive research interface"""
     print("\n🔍 Research Assistant (type 'exit' to quit)")
     print("-----------------------------------------")
@@ -193,42 +706,82 @@ async def interactive_session():
                 continue
 
             print("\n🔄 Processing your request...")
-            result = await run_pipeline(query)
-
-            print("\n" + "="*60)
-            if result["success"]:
-                print(f"📝 Research Question: {query}")
-                print("\n🔎 Findings:")
-                print(result["answer"])
-                print(f"\n📄 Report saved to: {result['path']}")
-                print(f"🔗 Sources used: {result['sources']}")
-                if result["visualization"]:
-                    print("📊 Reliability visualization included")
-                if len(result["query_variations"]) > 1:
-                    print(f"\nℹ️ Note: Searched variations: {', '.join(result['query_variations'])}")
+            if stream:
+                result = await _stream_to_terminal(query, mode, use_cache, refresh)
+                _print_result(query, result, show_answer=False)
             else:
-                print("❌ Research failed")
-                print(f"Details: {result['answer']}")
-            print("="*60)
+                result = await run_pipeline(query, mode, use_cache, refresh)
+                _print_result(query, result)
 
         except KeyboardInterrupt:
             logger.info("Session ended by keyboard interrupt")
             print("\nSession ended")
             break
 
+async def print_runs() -> None:
+    runs = await list_runs()
+    if not runs:
+        print("No unfinished runs")
+        return
+    for run in runs:
+        print(f"{run['run_id']}  {run['updated_at']}  next: {', '.join(run['next'])}")
+        print(f"    {run['query']}")
+        if run["error"]:
+            print(f"    error: {run['error']}")
+
+async def resume_run(run_id: str, stream: bool = False) -> None:
+    """Resume an unfinished run from its last completed node and print the result"""
+    runs = {run["run_id"]: run for run in await list_runs()}
+    if run_id not in runs:
+        print(f"No unfinished run with id {run_id} (see --list-runs)")
+        return
+    query = runs[run_id]["query"]
+    print(f"\n🔄 Resuming '{query}' at {', '.join(runs[run_id]['next'])}...")
+    if stream:
+        result = await _stream_to_terminal(query, run_id=run_id)
+        _print_result(query, result, show_answer=False)
+    else:
+        result = await run_pipeline(query, run_id=run_id)
+        _print_result(query, result)
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Deep Research Agent")
+    parser.add_argument("--stream", action="store_true",
+                        help="print progress and report text as they are produced")
+    parser.add_argument("--mode", choices=("agent", "direct"), default=None,
+                        help="research through the LLM tool-calling agent or search directly "
+                             "(default: RESEARCH_MODE or agent)")
+    parser.add_argument("--answer-cache", action=argparse.BooleanOptionalAction, default=None,
+                        help="reuse answers to near-identical questions (default: ANSWER_CACHE_ENABLED, off)")
+    parser.add_argument("--refresh", action="store_true",
+                        help="re-search previously answered questions and redraft only if sources changed")
+    parser.add_argument("--list-runs", action="store_true",
+                        help="list failed or interrupted runs that can be resumed")
+    parser.add_argument("--resume", metavar="RUN_ID",
+                        help="resume an unfinished run from its last completed step")
+    return parser.parse_args(argv)
+
 if __name__ == "__main__":
+    args = parse_args()
     try:
-        # Check required environment variables
-        if not os.getenv("TAVILY_API_KEY"):
+        # Check required environment variables (fake/replay providers run offline)
+        if needs_api_keys() and not os.getenv("TAVILY_API_KEY"):
             logger.error("TAVILY_API_KEY environment variable is required")
             print("Error: TAVILY_API_KEY environment variable is required")
             sys.exit(1)
-        if not os.getenv("GOOGLE_API_KEY"):
+        if needs_api_keys() and not os.getenv("GOOGLE_API_KEY"):
             logger.error("GOOGLE_API_KEY environment variable is required")
             print("Error: GOOGLE_API_KEY environment variable is required")
             sys.exit(1)
             
-        asyncio.run(interactive_session())
+        if args.list_runs:
+            asyncio.run(print_runs())
+        elif args.resume:
+            asyncio.run(resume_run(args.resume, stream=args.stream))
+        else:
+            asyncio.run(interactive_session(stream=args.stream, mode=args.mode,
+                                            use_cache=args.answer_cache,
+                                            refresh=args.refresh))
     except Exception as e:
         logger.error(f"System error occurred: {str(e)}", exc_info=True)
         print(f"System error occurred: {str(e)}")
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+import os
+import sys
+import csv
+import json
+import time
+import asyncio
+import argparse
+import datetime
+import logging
+from typing import List, Dict, Any, Optional, Set
+
+from app import run_pipeline
+from research.limits import STAGE_LIMITS
+
+logger = logging.getLogger(__name__)
+
+
+def load_queries(path: str) -> List[Dict[str, str]]:
+    """Read queries from JSONL ({"query": ..., "id": ...}), CSV (query[,id] columns) or plain text"""
+    queries = []
+    with open(path, newline='', encoding='utf-8') as f:
+        if path.endswith(".jsonl"):
+            rows = (json.loads(line) for line in f if line.strip())
+        elif path.endswith(".csv"):
+            rows = csv.DictReader(f)
+        else:
+            rows = ({"query": line.strip()} for line in f if line.strip())
+
+        for index, row in enumerate(rows):
+            query = (row.get("query") or "").strip()
+            if not query:
+                logger.warning(f"Skipping row {index} without a query")
+                continue
+            queries.append({"id": str(row.get("id") or index), "query": query})
+    return queries
+
+
+def completed_ids(output_path: str, retry_failed: bool = False) -> Set[str]:
+    """Ids already recorded in the summary file, so a restarted batch skips them"""
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A crash can leave a truncated final line; that query is simply rerun
+                continue
+            if record.get("success") or not retry_failed:
+                done.add(str(record.get("id")))
+    return done
+
+
+def failed_run_ids(output_path: str) -> Dict[str, str]:
+    """Run ids of failed queries, so --retry-failed resumes them from their last checkpoint"""
+    runs: Dict[str, str] = {}
+    if not os.path.exists(output_path):
+        return runs
+    with open(output_path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if not record.get("success") and record.get("run_id"):
+                runs[str(record.get("id"))] = record["run_id"]
+    return runs
+
+
+async def run_batch(queries: List[Dict[str, str]], output_path: str, concurrency: int = 4,
+                    search_concurrency: Optional[int] = None, llm_concurrency: Optional[int] = None,
+                    retry_failed: bool = False, mode: Optional[str] = None,
+                    refresh: bool = False) -> Dict[str, Any]:
+    """Run run_pipeline over many queries concurrently, appending one JSONL record per query"""
+    STAGE_LIMITS.configure(search=search_concurrency, llm=llm_concurrency)
+    done = completed_ids(output_path, retry_failed)
+    pending = [q for q in queries if q["id"] not in done]
+    resume = failed_run_ids(output_path) if retry_failed else {}
+    logger.info(f"Batch: {len(queries)} queries, {len(done)} already done, {len(pending)} to run")
+
+    semaphore = asyncio.Semaphore(concurrency)
+    write_lock = asyncio.Lock()
+    counts = {"success": 0, "failed": 0}
+    started = time.perf_counter()
+
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    with open(output_path, 'a', encoding='utf-8') as out:
+
+        async def run_one(item: Dict[str, str]) -> None:
+            async with semaphore:
+                item_started = time.perf_counter()
+                try:
+                    result = await run_pipeline(item["query"], mode, refresh=refresh,
+                                                run_id=resume.get(item["id"]))
+                except Exception as e:
+                    logger.error(f"Batch query {item['id']} failed: {str(e)}", exc_info=True)
+                    result = {"success": False, "answer": str(e), "path": None}
+                record = {
+                    "id": item["id"],
+                    "query": item["query"],
+                    "success": result["success"],
+                    "run_id": result.get("run_id"),
+                    "path": result.get("path"),
+                    "sources": result.get("sources", 0),
+                    "visualization": result.get("visualization", False),
+                    "query_variations": result.get("query_variations", []),
+                    "changes": result.get("changes"),
+                    "error": None if result["success"] else result.get("answer"),
+                    "elapsed": round(time.perf_counter() - item_started, 3),
+                    "finished_at": datetime.datetime.now().isoformat(timespec="seconds")
+                }
+                async with write_lock:
+                    out.write(json.dumps(record) + "\n")
+                    out.flush()
+                counts["success" if result["success"] else "failed"] += 1
+                logger.info(f"Batch progress: {sum(counts.values())}/{len(pending)}")
+
+        await asyncio.gather(*(run_one(item) for item in pending))
+
+    elapsed = time.perf_counter() - started
+    summary = {
+        "total": len(queries),
+        "skipped": len(done),
+        "succeeded": counts["success"],
+        "failed": counts["failed"],
+        "elapsed": round(elapsed, 3),
+        "throughput_per_min": round(len(pending) / elapsed * 60, 2) if pending and elapsed else 0.0,
+        "output": output_path
+    }
+    logger.info(f"Batch finished: {summary}")
+    return summary
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run research queries in batch")
+    parser.add_argument("input", help="queries file (.jsonl, .csv or one query per line)")
+    parser.add_argument("-o", "--output", default=os.path.join("research_outputs", "batch_results.jsonl"),
+                        help="JSONL summary file; also used to resume an interrupted batch")
+    parser.add_argument("-c", "--concurrency", type=int, default=4, help="pipelines in flight")
+    parser.add_argument("--search-concurrency", type=int, default=None, help="concurrent web searches")
+    parser.add_argument("--llm-concurrency", type=int, default=None, help="concurrent LLM calls")
+    parser.add_argument("--retry-failed", action="store_true", help="rerun queries recorded as failed")
+    parser.add_argument("--mode", choices=("agent", "direct"), default=None, help="research mode")
+    parser.add_argument("--refresh", action="store_true",
+                        help="update previously answered queries, redrafting only on material change")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    try:
+        summary = asyncio.run(run_batch(
+            load_queries(args.input),
+            args.output,
+            concurrency=args.concurrency,
+            search_concurrency=args.search_concurrency,
+            llm_concurrency=args.llm_concurrency,
+            retry_failed=args.retry_failed,
+            mode=args.mode,
+            refresh=args.refresh
+        ))
+        print(json.dumps(summary, indent=2))
+    except Exception as e:
+        logger.error(f"Batch failed: {str(e)}", exc_info=True)
+        print(f"Batch failed: {str(e)}")
+        sys.exit(1)
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""End-to-end pipeline benchmark against offline fake or replayed providers.
+
+Example:
+    python benchmarks/bench_pipeline.py --mode fake --latency 0.05 --concurrency 4
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import logging
+import argparse
+import tempfile
+import tracemalloc
+from typing import Dict, List, Any
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def summarize(latencies: List[float], peaks: List[int] = None) -> Dict[str, Any]:
+    summary = {
+        "runs": len(latencies),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 2) if latencies else 0.0,
+    }
+    if peaks:
+        summary["peak_mem_kb"] = round(max(peaks) / 1024, 1)
+    return summary
+
+
+async def bench_stages(app: Any, queries: List[str], research_mode: str = None) -> Dict[str, Any]:
+    """Run each node in isolation, measuring wall time and peak traced memory"""
+    stages = [
+        ("research", app.research_node),
+        ("rank", app.rank_node),
+        ("visualize", app.visualize_node),
+        ("draft", app.draft_node),
+        ("export", app.export_node),
+    ]
+    latencies: Dict[str, List[float]] = {name: [] for name, _ in stages}
+    peaks: Dict[str, List[int]] = {name: [] for name, _ in stages}
+
+    tracemalloc.start()
+    try:
+        for query in queries:
+            state = dict(app._initial_state(query, research_mode))
+            for name, node in stages:
+                tracemalloc.reset_peak()
+                baseline = tracemalloc.get_traced_memory()[0]
+                started = time.perf_counter()
+                update = await node(state)
+                latencies[name].append(time.perf_counter() - started)
+                peaks[name].append(tracemalloc.get_traced_memory()[1] - baseline)
+                for key, value in (update or {}).items():
+                    state[key] = app.merge_errors(state["error"], value) if key == "error" else value
+    finally:
+        tracemalloc.stop()
+    return {name: summarize(latencies[name], peaks[name]) for name, _ in stages}
+
+
+async def bench_pipeline(app: Any, queries: List[str], iterations: int, concurrency: int,
+                         research_mode: str = None) -> Dict[str, Any]:
+    """Run the full pipeline concurrently and report latency and throughput"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    failures = 0
+
+    async def one(query: str) -> None:
+        nonlocal failures
+        async with semaphore:
+            started = time.perf_counter()
+            # Answer cache hits would measure the cache, not the pipeline
+            result = await app.run_pipeline(query, research_mode, use_cache=False)
+            latencies.append(time.perf_counter() - started)
+            failures += 0 if result["success"] else 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(q) for _ in range(iterations) for q in queries))
+    wall = time.perf_counter() - started
+    summary = summarize(latencies)
+    summary.update({
+        "failures": failures,
+        "concurrency": concurrency,
+        "wall_s": round(wall, 3),
+        "throughput_per_s": round(len(latencies) / wall, 3) if wall else 0.0,
+    })
+    return summary
+
+
+def parse_args(argv: List[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the research pipeline offline")
+    parser.add_argument("--corpus", default=os.path.join(ROOT, "benchmarks", "queries.txt"))
+    parser.add_argument("--mode", choices=("fake", "replay"), default="fake",
+                        help="fake providers or replay of recorded fixtures")
+    parser.add_argument("--fixtures", default=os.path.join(ROOT, "fixtures"))
+    parser.add_argument("--latency", type=float, default=0.0, help="fake provider latency in seconds")
+    parser.add_argument("--slow-rate", type=float, default=0.0,
+                        help="fraction of fake searches that take --slow-latency instead")
+    parser.add_argument("--slow-latency", type=float, default=0.0, help="fake tail latency in seconds")
+    parser.add_argument("--search-hedge", choices=("off", "basic", "delayed"), default=None,
+                        help="search hedging mode (default: SEARCH_HEDGE or off)")
+    parser.add_argument("--research-mode", choices=("agent", "direct"), default=None)
+    parser.add_argument("--iterations", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--output", default=None, help="write the JSON results here")
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str] = None) -> Dict[str, Any]:
+    args = parse_args(argv)
+
+    # Provider selection is read when clients are first built, so set it before importing app
+    os.environ["RESEARCH_PROVIDER_MODE"] = args.mode
+    os.environ["RESEARCH_FIXTURE_DIR"] = args.fixtures
+    os.environ["RESEARCH_FAKE_LATENCY"] = str(args.latency)
+    os.environ["RESEARCH_FAKE_SLOW_RATE"] = str(args.slow_rate)
+    os.environ["RESEARCH_FAKE_SLOW_LATENCY"] = str(args.slow_latency)
+    if args.search_hedge:
+        os.environ["SEARCH_HEDGE"] = args.search_hedge
+    os.environ.setdefault("SEARCH_CACHE_PATH", ":memory:")
+    # Everything else the pipeline persists goes to a scratch directory, so a run is
+    # not served from an earlier run's state and fake results never reach real stores
+    scratch = tempfile.TemporaryDirectory(prefix="bench_pipeline_")
+    for name, path in (("ANSWER_CACHE_PATH", "answer_cache.sqlite"),
+                       ("SUMMARY_CACHE_PATH", "summary_cache.sqlite"),
+                       ("RESEARCH_BLOB_DIR", "blobs"),
+                       ("RELIABILITY_INDEX_PATH", "domain_reliability.npz"),
+                       ("RESULTS_STORE_DIR", "results"),
+                       ("CHECKPOINT_PATH", "checkpoints.sqlite")):
+        os.environ[name] = os.path.join(scratch.name, path)
+    # Offline providers have no quota, so do not let the client-side rate limits dominate
+    os.environ.setdefault("GEMINI_RATE_PER_SEC", "1000")
+    os.environ.setdefault("TAVILY_RATE_PER_SEC", "1000")
+    sys.path.insert(0, ROOT)
+    import app
+    logging.getLogger().setLevel(logging.WARNING)
+
+    with open(args.corpus) as f:
+        queries = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+    results = {
+        "mode": args.mode,
+        "latency_s": args.latency,
+        "slow_rate": args.slow_rate,
+        "slow_latency_s": args.slow_latency,
+        "search_hedge": os.getenv("SEARCH_HEDGE", "off"),
+        "queries": len(queries),
+        "research_mode": args.research_mode or app.DEFAULT_RESEARCH_MODE,
+        "stages": asyncio.run(bench_stages(app, queries, args.research_mode)),
+        "pipeline": asyncio.run(bench_pipeline(app, queries, args.iterations, args.concurrency,
+                                               args.research_mode)),
+    }
+
+    print(f"{'stage':<12}{'p50 ms':>10}{'p95 ms':>10}{'peak KB':>12}")
+    for name, stats in results["stages"].items():
+        print(f"{name:<12}{stats['p50_ms']:>10}{stats['p95_ms']:>10}{stats['peak_mem_kb']:>12}")
+    pipeline = results["pipeline"]
+    print(f"\npipeline: p50 {pipeline['p50_ms']} ms, p95 {pipeline['p95_ms']} ms, "
+          f"{pipeline['throughput_per_s']} runs/s at concurrency {pipeline['concurrency']} "
+          f"({pipeline['failures']} failures)")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    scratch.cleanup()
+    return results
+
+
+if __name__ == "__main__":
+    main()
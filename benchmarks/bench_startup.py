@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""Startup benchmark: import cost of the entry points, checked against a budget.
+
+Each module is imported in a fresh interpreter under ``python -X importtime``.
+The script exits non-zero if the median cumulative import time exceeds
+--budget-ms, or if a heavy dependency is loaded at import time, so it can
+gate CI.
+
+Example:
+    python benchmarks/bench_startup.py --budget-ms 400
+"""
+import os
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+from typing import Any, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.bench_pipeline import percentile  # noqa: E402
+
+# Dependencies that must only load on first use
+HEAVY_MODULES = ("langgraph", "langchain", "langchain_core", "langchain_google_genai",
+                 "matplotlib", "seaborn", "numpy", "docx", "markdown2", "tavily", "httpx")
+
+# Median import time allowed per entry point
+STARTUP_BUDGET_MS = float(os.getenv("STARTUP_BUDGET_MS", "500"))
+
+PROBE = ("import json, sys; import {module}; "
+         "print(json.dumps(sorted({{m.split('.')[0] for m in sys.modules}} & set({heavy!r}))))")
+
+
+def import_profile(module: str) -> Dict[str, Any]:
+    """Import module in a fresh interpreter; return its import time tree and heavy deps loaded"""
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    # Importing app creates its log file and output directory in the working directory
+    with tempfile.TemporaryDirectory(prefix="bench_startup_") as scratch:
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", PROBE.format(module=module, heavy=HEAVY_MODULES)],
+            cwd=scratch, env=env, capture_output=True, text=True, check=True
+        )
+    timings = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit():
+            # Nested imports are indented; keep the top-level cumulative entries
+            timings[name.strip()] = max(timings.get(name.strip(), 0), int(cumulative))
+    return {
+        "cumulative_us": timings.get(module, 0),
+        "heaviest": sorted(timings.items(), key=lambda item: -item[1])[:8],
+        "heavy_loaded": json.loads(completed.stdout.strip().splitlines()[-1])
+    }
+
+
+def bench_startup(modules: List[str], iterations: int) -> Dict[str, Any]:
+    results = {}
+    for module in modules:
+        runs = [import_profile(module) for _ in range(iterations)]
+        times = [run["cumulative_us"] / 1e6 for run in runs]
+        results[module] = {
+            "p50_ms": round(percentile(times, 50) * 1000, 2),
+            "max_ms": round(max(times) * 1000, 2),
+            "heavy_loaded": runs[-1]["heavy_loaded"],
+            "heaviest": [(name, round(us / 1000, 2)) for name, us in runs[-1]["heaviest"]]
+        }
+    return results
+
+
+def parse_args(argv: List[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark import time of the entry points")
+    parser.add_argument("--modules", nargs="+", default=["app", "batch", "server", "research"])
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=STARTUP_BUDGET_MS,
+                        help="fail if a module's median import time exceeds this")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str] = None) -> int:
+    args = parse_args(argv)
+    results = bench_startup(args.modules, args.iterations)
+
+    failures = []
+    print(f"{'module':<12}{'p50 ms':>10}{'max ms':>10}  heavy deps loaded")
+    for module, stats in results.items():
+        print(f"{module:<12}{stats['p50_ms']:>10}{stats['max_ms']:>10}  {', '.join(stats['heavy_loaded']) or '-'}")
+        if stats["p50_ms"] > args.budget_ms:
+            failures.append(f"{module} imports in {stats['p50_ms']} ms (budget {args.budget_ms} ms)")
+        if stats["heavy_loaded"]:
+            failures.append(f"{module} loads {', '.join(stats['heavy_loaded'])} at import time")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,38 @@
-from .research_agent import ResearchAgent
-from .draft import DraftAgent
-from .visualize import VisualizationAgent
-from .export import ExportAgent
+"""Research pipeline components.
 
-__all__ = ['ResearchAgent', 'DraftAgent', 'VisualizationAgent', 'ExportAgent']
+Attributes are imported on first access (PEP 562), so ``import research`` stays
+cheap and LangChain, matplotlib and python-docx load only when used.
+"""
+import importlib
+
+_EXPORTS = {
+    "ResearchAgent": ".research_agent",
+    "DraftAgent": ".draft_agent",
+    "VisualizationAgent": ".visualize",
+    "Exporter": ".export",
+    "ResultCache": ".cache",
+    "BlobStore": ".blobstore",
+    "AnswerCache": ".answer_cache",
+    "ResultsStore": ".results_store",
+    "ResultRanker": ".ranking",
+    "DomainReliabilityIndex": ".reliability",
+    "SearchProvider": ".search_providers",
+    "HedgedSearch": ".search_providers",
+    "ContextPacker": ".context",
+    "QueryExpander": ".query_expansion",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,218 @@
+import os
+import re
+import json
+import math
+import time
+import sqlite3
+import threading
+import logging
+from collections import Counter
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+DEFAULT_ANSWER_CACHE_PATH = os.path.join(".cache", "answer_cache.sqlite")
+
+WORD = re.compile(r"[a-z0-9]+(?:['.][a-z0-9]+)*")
+# Words that do not change what a question asks; negations are deliberately absent
+STOPWORDS = frozenset("""
+    a an the of in on at to for from by with about into over under between and or
+    is are was were be been being do does did has have had can could should would will
+    what which who whom whose when where why how this that these those it its
+    i me my we our you your they their there here as than then so such
+    tell explain describe give show list please
+""".split())
+
+
+def ngram_vector(text: str, n: int = 3) -> Dict[str, float]:
+    """L2-normalized character n-gram counts; robust to rephrasing and typos"""
+    normalized = f" {' '.join(text.lower().split())} "
+    counts = Counter(normalized[i:i + n] for i in range(max(1, len(normalized) - n + 1)))
+    norm = math.sqrt(sum(c * c for c in counts.values())) or 1.0
+    return {gram: c / norm for gram, c in counts.items()}
+
+
+def content_words(text: str) -> List[str]:
+    """Words that carry a question's meaning, in order: everything but stopwords, plurals folded"""
+    words = []
+    for word in WORD.findall(text.lower()):
+        if word in STOPWORDS:
+            continue
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        words.append(word)
+    return words
+
+
+def content_tokens(text: str) -> FrozenSet[str]:
+    """The set of content_words(text).
+
+    Two queries only share an answer when these sets are equal, so numbers,
+    negations and names that differ ("2023"/"2024", "inflation"/"deflation")
+    veto a match that character n-grams alone would allow.
+    """
+    return frozenset(content_words(text))
+
+
+def query_vector(text: str) -> Dict[str, float]:
+    """n-gram vector of the content words, so stopwords and plurals do not lower similarity"""
+    return ngram_vector(" ".join(content_words(text)))
+
+
+def cosine(a: Dict[str, float], b: Dict[str, float]) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(weight * b.get(gram, 0.0) for gram, weight in a.items())
+
+
+class AnswerCache:
+    """Semantic cache of past (query, report, sources) answers.
+
+    Entries persist in SQLite; their n-gram vectors are kept in memory so a lookup
+    is a scan of sparse dot products. A lookup hits when the most similar entry
+    younger than max_age clears the similarity threshold. Only entries with the
+    same content tokens are candidates, since a one-word change can be a
+    different question.
+    """
+
+    def __init__(self, path: str = DEFAULT_ANSWER_CACHE_PATH, threshold: float = 0.85,
+                 max_age: float = 86400.0, max_entries: int = 2000):
+        self.logger = logging.getLogger(__name__)
+        self.path = path
+        self.threshold = threshold
+        self.max_age = max_age
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._similarity_sum = 0.0
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS answers (
+                   id INTEGER PRIMARY KEY AUTOINCREMENT,
+                   query TEXT NOT NULL,
+                   report TEXT NOT NULL,
+                   sources TEXT NOT NULL,
+                   result TEXT NOT NULL,
+                   created_at REAL NOT NULL
+               )"""
+        )
+        self._conn.commit()
+        self._index: List[Tuple[int, Dict[str, float], FrozenSet[str], float]] = [
+            (row_id, query_vector(query), content_tokens(query), created_at)
+            for row_id, query, created_at in self._conn.execute(
+                "SELECT id, query, created_at FROM answers ORDER BY id"
+            )
+        ]
+
+    def nearest(self, query: str, max_age: Optional[float] = None) -> Tuple[Optional[int], float, float]:
+        """Most similar entry younger than max_age (default self.max_age) as (id, similarity, age).
+
+        Entries whose content tokens differ from the query's are never returned.
+        """
+        vector = query_vector(query)
+        tokens = content_tokens(query)
+        now = time.time()
+        max_age = self.max_age if max_age is None else max_age
+        best: Tuple[Optional[int], float, float] = (None, 0.0, 0.0)
+        with self._lock:
+            for row_id, entry_vector, entry_tokens, created_at in self._index:
+                age = now - created_at
+                if age > max_age or entry_tokens != tokens:
+                    continue
+                similarity = cosine(vector, entry_vector)
+                # Ties go to the newer entry
+                if similarity >= best[1]:
+                    best = (row_id, similarity, age)
+        return best
+
+    def lookup(self, query: str) -> Optional[Dict[str, Any]]:
+        """Return the cached answer for a near-duplicate query, or None.
+
+        The returned dict holds query, report, sources (the ranked research
+        results), result (the pipeline result) plus similarity and age.
+        """
+        row_id, similarity, age = self.nearest(query)
+        with self._lock:
+            self._similarity_sum += similarity
+            entry = self._load(row_id, similarity, age) if similarity >= self.threshold else None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        self.logger.info(f"Answer cache hit for '{query}' -> '{entry['query']}' "
+                         f"(similarity={similarity:.3f}, age={age:.0f}s)")
+        return entry
+
+    def previous(self, query: str) -> Optional[Dict[str, Any]]:
+        """Latest stored answer to this query however old it is, for refresh runs.
+
+        Does not count towards hit/miss statistics.
+        """
+        row_id, similarity, age = self.nearest(query, max_age=float("inf"))
+        if similarity < self.threshold:
+            return None
+        with self._lock:
+            return self._load(row_id, similarity, age)
+
+    def _load(self, row_id: Optional[int], similarity: float, age: float) -> Optional[Dict[str, Any]]:
+        if row_id is None:
+            return None
+        row = self._conn.execute(
+            "SELECT query, report, sources, result FROM answers WHERE id = ?", (row_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {
+            "query": row[0],
+            "report": json.loads(row[1]),
+            "sources": json.loads(row[2]),
+            "result": json.loads(row[3]),
+            "similarity": similarity,
+            "age": age
+        }
+
+    def store(self, query: str, report: Dict[str, Any], sources: List[Dict[str, Any]],
+              result: Dict[str, Any]) -> None:
+        """Record a successful answer and evict the oldest entries over max_entries"""
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO answers (query, report, sources, result, created_at) VALUES (?, ?, ?, ?, ?)",
+                (query, json.dumps(report), json.dumps(sources), json.dumps(result), now)
+            )
+            self._index.append((cursor.lastrowid, query_vector(query), content_tokens(query), now))
+            overflow = len(self._index) - self.max_entries
+            if overflow > 0:
+                evicted = [row_id for row_id, _, _, _ in self._index[:overflow]]
+                self._conn.executemany("DELETE FROM answers WHERE id = ?", [(i,) for i in evicted])
+                del self._index[:overflow]
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM answers")
+            self._conn.commit()
+            self._index.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit rate, mean lookup similarity and entry staleness"""
+        now = time.time()
+        with self._lock:
+            ages = [now - created_at for _, _, _, created_at in self._index]
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "mean_similarity": self._similarity_sum / total if total else 0.0,
+            "entries": len(ages),
+            "fresh_entries": sum(1 for age in ages if age <= self.max_age),
+            "oldest_age": max(ages) if ages else 0.0
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,60 @@
+import os
+import gzip
+import hashlib
+import logging
+import tempfile
+from typing import Optional
+
+DEFAULT_BLOB_DIR = os.path.join(".cache", "blobs")
+
+
+class BlobStore:
+    """Content-addressed on-disk store for raw page text.
+
+    Blobs are gzip-compressed and named by the SHA-256 of their text, so the same
+    page fetched by several queries or runs is stored once. Graph state carries only
+    the blob id; readers load (a bounded prefix of) the text when they need it.
+    """
+
+    def __init__(self, root: str = DEFAULT_BLOB_DIR, max_chars: int = 200_000):
+        self.logger = logging.getLogger(__name__)
+        self.root = root
+        self.max_chars = max_chars
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, blob_id: str) -> str:
+        return os.path.join(self.root, blob_id[:2], f"{blob_id[2:]}.txt.gz")
+
+    def put(self, text: str) -> str:
+        """Store text (capped at max_chars) and return its blob id"""
+        text = text[:self.max_chars]
+        data = text.encode("utf-8")
+        blob_id = hashlib.sha256(data).hexdigest()
+        path = self._path(blob_id)
+        if os.path.exists(path):
+            return blob_id
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=5) as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return blob_id
+
+    def get(self, blob_id: str, max_chars: Optional[int] = None) -> Optional[str]:
+        """Load a blob's text, reading only the first max_chars characters if given"""
+        path = self._path(blob_id)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                return f.read(max_chars) if max_chars else f.read()
+        except FileNotFoundError:
+            self.logger.warning(f"Blob {blob_id} not found")
+            return None
+
+    def exists(self, blob_id: str) -> bool:
+        return os.path.exists(self._path(blob_id))
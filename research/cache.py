@@ -0,0 +1,121 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+import logging
+from typing import Any, Dict, List, Optional
+
+DEFAULT_CACHE_PATH = os.path.join(".cache", "search_cache.sqlite")
+
+
+class ResultCache:
+    """Persistent SQLite key/value cache with per-entry TTL and LRU eviction"""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, ttl: float = 3600.0,
+                 max_entries: int = 5000):
+        self.logger = logging.getLogger(__name__)
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS cache (
+                   key TEXT PRIMARY KEY,
+                   value TEXT NOT NULL,
+                   expires_at REAL NOT NULL,
+                   last_access REAL NOT NULL
+               )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_access ON cache(last_access)")
+        self._conn.commit()
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        """Collapse case and whitespace so trivially different queries share a key"""
+        return " ".join(query.lower().split())
+
+    @classmethod
+    def key_for(cls, query: str, **params: Any) -> str:
+        """Build a cache key from the normalized query plus search parameters"""
+        payload = json.dumps(
+            {"query": cls.normalize_query(query), "params": params},
+            sort_keys=True, default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value, or None when missing or expired"""
+        return self.get_first([key])
+
+    def get_first(self, keys: List[str]) -> Optional[Any]:
+        """Value of the first live key, counted as one hit or miss"""
+        now = time.time()
+        with self._lock:
+            for key in keys:
+                row = self._conn.execute(
+                    "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and row[1] < now:
+                    self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                    self._conn.commit()
+                elif row is not None:
+                    self._conn.execute("UPDATE cache SET last_access = ? WHERE key = ?", (now, key))
+                    self._conn.commit()
+                    self.hits += 1
+                    return json.loads(row[0])
+            self.misses += 1
+        return None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a JSON-serializable value and evict least recently used entries"""
+        now = time.time()
+        expires_at = now + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), expires_at, now)
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float) -> None:
+        self._conn.execute("DELETE FROM cache WHERE expires_at < ?", (now,))
+        count = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM cache WHERE key IN "
+                "(SELECT key FROM cache ORDER BY last_access ASC LIMIT ?)",
+                (overflow,)
+            )
+            self.logger.debug(f"Evicted {overflow} least recently used cache entries")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current size"""
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": size
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,185 @@
+import os
+import threading
+import logging
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.RLock()
+_instances: Dict[Hashable, Any] = {}
+
+# Keep-alive pool size for the shared Tavily HTTP connections
+HTTP_POOL_SIZE = int(os.getenv("RESEARCH_HTTP_POOL_SIZE", "32"))
+
+PROVIDER_MODES = ("live", "fake", "record", "replay")
+
+# "off": one advanced search; "basic": a basic search raced alongside it;
+# "delayed": a second advanced search once the first outlasts the recent p95
+SEARCH_HEDGE_MODES = ("off", "basic", "delayed")
+
+
+def provider_mode() -> str:
+    """Provider backend: live APIs, offline fakes, or record/replay of fixture files"""
+    mode = os.getenv("RESEARCH_PROVIDER_MODE", "live").lower()
+    if mode not in PROVIDER_MODES:
+        raise ValueError(f"RESEARCH_PROVIDER_MODE must be one of {PROVIDER_MODES}, got '{mode}'")
+    return mode
+
+
+def fixture_dir() -> str:
+    return os.getenv("RESEARCH_FIXTURE_DIR", "fixtures")
+
+
+def fake_latency() -> float:
+    return float(os.getenv("RESEARCH_FAKE_LATENCY", "0"))
+
+
+def search_hedging() -> Tuple[str, float, Optional[float]]:
+    """Hedge mode, per-search deadline and fixed hedge delay (None = adaptive p95)"""
+    hedge = os.getenv("SEARCH_HEDGE", "off").lower()
+    if hedge not in SEARCH_HEDGE_MODES:
+        raise ValueError(f"SEARCH_HEDGE must be one of {SEARCH_HEDGE_MODES}, got '{hedge}'")
+    delay = os.getenv("SEARCH_HEDGE_DELAY")
+    return hedge, float(os.getenv("SEARCH_DEADLINE", "30")), float(delay) if delay else None
+
+
+def needs_api_keys() -> bool:
+    return provider_mode() in ("live", "record")
+
+
+def _get_or_create(key: Hashable, factory: Callable[[], Any]) -> Any:
+    """Return the process-wide instance for key, building it once under the lock"""
+    instance = _instances.get(key)
+    if instance is not None:
+        return instance
+    with _lock:
+        instance = _instances.get(key)
+        if instance is None:
+            instance = factory()
+            _instances[key] = instance
+            logger.info(f"Created shared client: {key[0] if isinstance(key, tuple) else key}")
+        return instance
+
+
+def get_llm(model: str = "gemini-1.5-pro-latest", temperature: float = 0.7) -> Any:
+    """Shared Gemini chat model, one per (model, temperature)"""
+    mode = provider_mode()
+
+    def factory():
+        if mode == "fake":
+            from .fakes import FakeChatModel
+            return FakeChatModel(latency=fake_latency())
+        if mode == "replay":
+            from .fakes import RecordingChatModel
+            return RecordingChatModel(fixture_dir=fixture_dir(), mode="replay")
+        from langchain_google_genai import ChatGoogleGenerativeAI
+        llm = ChatGoogleGenerativeAI(
+            model=model,
+            temperature=temperature,
+            google_api_key=os.getenv("GOOGLE_API_KEY")
+        )
+        if mode == "record":
+            from .fakes import RecordingChatModel
+            return RecordingChatModel(inner=llm, fixture_dir=fixture_dir(), mode="record")
+        return llm
+    return _get_or_create(("llm", mode, model, temperature), factory)
+
+
+def get_tavily() -> Any:
+    """Shared Tavily search client.
+
+    Live mode uses the native asyncio client with a pooled keep-alive HTTP/2
+    connection; record mode wraps the blocking TavilyClient so responses can be saved.
+    """
+    mode = provider_mode()
+
+    def factory():
+        from .resilience import GuardedAsyncSearchClient, GuardedTavilyClient, get_guard
+        if mode == "fake":
+            from .fakes import FakeTavilyClient
+            retry_after = os.getenv("RESEARCH_FAKE_RETRY_AFTER")
+            # Guarded like the live client, so injected failures exercise retries and the breaker
+            client = FakeTavilyClient(latency=fake_latency(),
+                                      slow_rate=float(os.getenv("RESEARCH_FAKE_SLOW_RATE", "0")),
+                                      slow_latency=float(os.getenv("RESEARCH_FAKE_SLOW_LATENCY", "0")),
+                                      fail_rate=float(os.getenv("RESEARCH_FAKE_FAIL_RATE", "0")),
+                                      fail_status=int(os.getenv("RESEARCH_FAKE_FAIL_STATUS", "429")),
+                                      retry_after=float(retry_after) if retry_after else None)
+            return GuardedTavilyClient(client, get_guard("tavily"))
+        if mode == "replay":
+            from .fakes import RecordingTavilyClient
+            return RecordingTavilyClient(fixture_dir=fixture_dir(), mode="replay")
+        if mode == "live":
+            from .search_client import AsyncTavilySearchClient
+            client = AsyncTavilySearchClient(
+                timeout=float(os.getenv("RESEARCH_HTTP_TIMEOUT", "60")),
+                max_connections=HTTP_POOL_SIZE
+            )
+            return GuardedAsyncSearchClient(client, get_guard("tavily"))
+
+        from tavily import TavilyClient
+        from .fakes import RecordingTavilyClient
+        client = TavilyClient(api_key=os.getenv("TAVILY_API_KEY"))
+        session = getattr(client, "session", None)
+        if session is not None and hasattr(session, "mount"):
+            from requests.adapters import HTTPAdapter
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=HTTP_POOL_SIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+        client = RecordingTavilyClient(client, fixture_dir=fixture_dir(), mode="record")
+        return GuardedTavilyClient(client, get_guard("tavily"))
+    return _get_or_create(("tavily", mode), factory)
+
+
+def get_search() -> Any:
+    """Shared search provider: the Tavily client, hedged as SEARCH_HEDGE configures"""
+    hedge, deadline, delay = search_hedging()
+
+    def factory():
+        from .search_providers import HedgedSearch, SearchProvider
+        tavily = get_tavily()
+        providers = [SearchProvider("advanced", tavily)]
+        if hedge == "basic":
+            providers.append(SearchProvider("basic", tavily, search_depth="basic"))
+            return HedgedSearch(providers, deadline=deadline, hedge_delay=0.0 if delay is None else delay)
+        if hedge == "delayed":
+            providers.append(SearchProvider("advanced-hedge", tavily))
+        return HedgedSearch(providers, deadline=deadline, hedge_delay=delay)
+    return _get_or_create(("search", provider_mode(), hedge, deadline, delay), factory)
+
+
+def get_research_agent(model: str = "gemini-1.5-pro-latest", temperature: float = 0.7,
+                       cache: Optional[Any] = None, blob_store: Optional[Any] = None) -> Any:
+    """Shared ResearchAgent wired to the shared LLM, Tavily client and search provider"""
+    def factory():
+        from .research_agent import ResearchAgent
+        return ResearchAgent(
+            model=model,
+            temperature=temperature,
+            cache=cache,
+            llm=get_llm(model, temperature),
+            tavily=get_tavily(),
+            search=get_search(),
+            blob_store=blob_store
+        )
+    return _get_or_create(("research_agent", provider_mode(), model, temperature, search_hedging(),
+                           getattr(cache, "path", None), getattr(blob_store, "root", None)), factory)
+
+
+def get_draft_agent(model: str = "gemini-1.5-pro-latest", temperature: float = 0.7,
+                    blob_store: Optional[Any] = None, mode: str = "single",
+                    summary_cache: Optional[Any] = None) -> Any:
+    """Shared DraftAgent wired to the shared LLM client"""
+    def factory():
+        from .draft_agent import DraftAgent
+        return DraftAgent(model=model, temperature=temperature, llm=get_llm(model, temperature),
+                          blob_store=blob_store, mode=mode, summary_cache=summary_cache,
+                          map_concurrency=int(os.getenv("DRAFT_MAP_CONCURRENCY", "4")))
+    return _get_or_create(("draft_agent", provider_mode(), model, temperature, mode,
+                           getattr(blob_store, "root", None), getattr(summary_cache, "path", None)), factory)
+
+
+def reset() -> None:
+    """Drop all shared instances (used when configuration changes)"""
+    with _lock:
+        _instances.clear()
@@ -0,0 +1,115 @@
+import re
+import math
+import logging
+from typing import List, Dict, Any, Optional, Collection
+
+# Rough characters-per-token ratio for English text with Gemini/GPT tokenizers
+CHARS_PER_TOKEN = 4
+SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+|\n{2,}")
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap local token estimate; no tokenizer download or API call"""
+    return math.ceil(len(text) / CHARS_PER_TOKEN) if text else 0
+
+
+def chunk_text(text: str, chunk_tokens: int = 300) -> List[str]:
+    """Split text on sentence boundaries into chunks of at most chunk_tokens"""
+    chunks: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+    for sentence in SENTENCE_SPLIT.split(text.strip()):
+        sentence = " ".join(sentence.split())
+        if not sentence:
+            continue
+        tokens = estimate_tokens(sentence)
+        if tokens > chunk_tokens:
+            # Hard-wrap sentences that are longer than a chunk on their own
+            width = chunk_tokens * CHARS_PER_TOKEN
+            pieces = [sentence[i:i + width] for i in range(0, len(sentence), width)]
+        else:
+            pieces = [sentence]
+        for piece in pieces:
+            piece_tokens = estimate_tokens(piece)
+            if current and current_tokens + piece_tokens > chunk_tokens:
+                chunks.append(" ".join(current))
+                current, current_tokens = [], 0
+            current.append(piece)
+            current_tokens += piece_tokens
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+class ContextPacker:
+    """Pack the most relevant source chunks into a fixed prompt token budget"""
+
+    def __init__(self, token_budget: int = 6000, chunk_tokens: int = 300,
+                 max_chunks_per_source: int = 4, blob_store: Optional[Any] = None):
+        self.logger = logging.getLogger(__name__)
+        self.blob_store = blob_store
+        self.token_budget = token_budget
+        self.chunk_tokens = chunk_tokens
+        self.max_chunks_per_source = max_chunks_per_source
+
+    def pack(self, research_results: List[Dict[str, Any]],
+             only: Optional[Collection[int]] = None) -> str:
+        """Return a numbered source listing that fits the token budget.
+
+        Source numbers are positions in research_results (1-based), matching the
+        ids DraftAgent._process_sources assigns, so [Source N] citations line up
+        with the references list. only restricts packing to those 0-based
+        positions while keeping their numbers.
+        """
+        candidates = []
+        for index, result in enumerate(research_results):
+            if only is not None and index not in only:
+                continue
+            relevance = float(result.get("relevance", result.get("score", 0.0)))
+            chunks = chunk_text(self.content_of(result), self.chunk_tokens)
+            for position, chunk in enumerate(chunks[:self.max_chunks_per_source]):
+                # Later chunks of a page are worth progressively less than its lead
+                candidates.append((relevance / (1 + position), index, position, chunk))
+        candidates.sort(key=lambda c: (-c[0], c[1], c[2]))
+
+        selected: Dict[int, List[tuple]] = {}
+        used = 0
+        for _, index, position, chunk in candidates:
+            header_cost = 0 if index in selected else estimate_tokens(self.header(index, research_results[index]))
+            cost = estimate_tokens(chunk) + header_cost
+            if used + cost > self.token_budget:
+                continue
+            selected.setdefault(index, []).append((position, chunk))
+            used += cost
+
+        blocks = []
+        for index in sorted(selected):
+            body = "\n".join(chunk for _, chunk in sorted(selected[index]))
+            blocks.append(f"{self.header(index, research_results[index])}\n{body}")
+
+        self.logger.info(
+            f"Packed {sum(len(c) for c in selected.values())} chunks from {len(selected)} sources "
+            f"into ~{used}/{self.token_budget} tokens"
+        )
+        return "\n\n".join(blocks)
+
+    def content_of(self, result: Dict[str, Any]) -> str:
+        """Full page text from the blob store when available, else the snippet.
+
+        Only the prefix that could ever be packed is read, so large pages are
+        never fully loaded into memory.
+        """
+        if self.blob_store is not None and result.get("content_id"):
+            limit = self.chunk_tokens * self.max_chunks_per_source * CHARS_PER_TOKEN * 2
+            text = self.blob_store.get(result["content_id"], max_chars=limit)
+            if text:
+                return text
+        return result.get("content", "") or ""
+
+    @staticmethod
+    def header(index: int, result: Dict[str, Any]) -> str:
+        title = result.get("title", "")
+        if result.get("url"):
+            return f"[Source {index + 1}] {title} ({result['url']})"
+        # Results without a URL are not listed as references, so they are not citable
+        return f"[Context] {title}"
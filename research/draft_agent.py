@@ -1,15 +1,38 @@
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.runnables import RunnablePassthrough
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.output_parsers import StrOutputParser
-from typing import List, Dict, Any
+from langchain_core.runnables.config import ensure_config, merge_configs
+from typing import List, Dict, Any, Optional, AsyncIterator
+import asyncio
 import logging
 import os
+from .cache import ResultCache
+from .context import ContextPacker, estimate_tokens
+from .refresh import content_hash, renumber_citations
+from .resilience import get_guard
+from .metrics import span, usage_callback
+
+# "single" packs source chunks into one prompt; "map_reduce" summarizes each source
+# first; "auto" switches to map-reduce when the sources do not fit the token budget
+DRAFT_MODES = ("single", "map_reduce", "auto")
+
+# LangGraph leaves runs with this tag out of its "messages" stream
+NOSTREAM_TAG = "nostream"
 
 class DraftAgent:
-    def __init__(self, model="gemini-1.5-pro-latest", temperature=0.7):
+    def __init__(self, model="gemini-1.5-pro-latest", temperature=0.7, llm: Optional[Any] = None,
+                 token_budget: int = 6000, blob_store: Optional[Any] = None, mode: str = "single",
+                 summary_cache: Optional[ResultCache] = None, map_concurrency: int = 4):
+        if mode not in DRAFT_MODES:
+            raise ValueError(f"Draft mode must be one of {DRAFT_MODES}, got '{mode}'")
         self.logger = logging.getLogger(__name__)
-        self.llm = ChatGoogleGenerativeAI(
+        self.model = model
+        self.mode = mode
+        self.summary_cache = summary_cache
+        self.map_concurrency = map_concurrency
+        self.packer = ContextPacker(token_budget=token_budget, blob_store=blob_store)
+        self.llm_guard = get_guard("gemini")
+        self.llm = llm or ChatGoogleGenerativeAI(
             model=model,
             temperature=temperature,
             google_api_key=os.getenv("GOOGLE_API_KEY")
@@ -21,7 +44,7 @@ class DraftAgent:
             
             Original Research Question: {query}
             
-            Research Data:
+            Research Data (each source is labelled [Source N]):
             {results}
             
             Structure your report with:
@@ -36,8 +59,49 @@ class DraftAgent:
         )
         
         self.chain = (
-            {"query": RunnablePassthrough(), "results": RunnablePassthrough()}
-            | self.prompt
+            self.prompt
+            | self.llm
+            | StrOutputParser()
+        )
+
+        # Refresh runs send only what changed plus the prior report
+        self.update_prompt = ChatPromptTemplate.from_template(
+            """Update an existing research report with new information.
+            
+            Original Research Question: {query}
+            
+            Current Report (citations use the current source numbering):
+            {report}
+            
+            New or Changed Sources (each source is labelled [Source N]):
+            {results}
+            
+            Sources No Longer Found:
+            {removed}
+            
+            Revise the report so it reflects the new and changed sources, remove claims
+            that relied only on [Removed source], and keep everything else as it is.
+            Keep the same structure and markdown formatting, cite sources as [Source N],
+            and return the complete updated report."""
+        )
+        self.update_chain = (
+            self.update_prompt
+            | self.llm
+            | StrOutputParser()
+        )
+
+        # Map step of map-reduce drafting: one query-independent summary per source,
+        # so a summary can be reused by every report that cites the same page
+        self.summary_prompt = ChatPromptTemplate.from_template(
+            """Extract the key facts, figures, dates and claims from this source as
+            3-6 concise markdown bullet points. Do not add anything that is not in the source.
+            
+            Title: {title}
+            
+            {content}"""
+        )
+        self.summary_chain = (
+            self.summary_prompt
             | self.llm
             | StrOutputParser()
         )
@@ -53,11 +117,12 @@ class DraftAgent:
             # Check for query variations
             query_variations = set(r['query_used'] for r in research_results if 'query_used' in r)
             
-            # Generate full report
-            report = await self.chain.ainvoke({
-                "query": query,
-                "results": research_results
-            })
+            # Generate full report, consuming the token stream
+            with span("llm.draft", sources=len(research_results)) as s:
+                report = "".join([
+                    chunk async for chunk in self.astream_report(query, research_results, callbacks=[usage_callback(s)])
+                ])
+                s.set(output_chars=len(report))
             
             return {
                 "question": query,
@@ -67,12 +132,121 @@ class DraftAgent:
             }
         except Exception as e:
             self.logger.error(f"Report generation failed: {str(e)}", exc_info=True)
+            raise
+
+    async def update_report(self, query: str, previous: Dict[str, Any],
+                            research_results: List[Dict[str, Any]], diff: Dict[str, Any],
+                            callbacks: Optional[List[Any]] = None) -> Dict[str, Any]:
+        """Revise a prior report from a source diff instead of drafting from scratch.
+
+        previous holds the prior run's report and (ranked) sources; diff comes from
+        refresh.diff_sources(previous sources, research_results).
+        """
+        try:
+            self.logger.info("Updating research report from changed sources")
+            prior = renumber_citations(previous["report"]["answer"], previous["sources"], research_results)
+            inputs = {
+                "query": query,
+                "report": prior,
+                "results": self.packer.pack(research_results, only=set(diff["added"] + diff["changed"])) or "None",
+                "removed": "\n".join(diff["removed"]) or "None"
+            }
+            with span("llm.update", changed=len(diff["added"]) + len(diff["changed"])) as s:
+                config = self._config((callbacks or []) + [usage_callback(s)])
+                report = "".join([
+                    chunk async for chunk in self.llm_guard.astream(
+                        lambda: self.update_chain.astream(inputs, config=config)
+                    )
+                ])
+                s.set(output_chars=len(report))
+
             return {
                 "question": query,
-                "answer": f"Error generating report: {str(e)}",
-                "sources": [],
-                "query_variations": []
+                "answer": report,
+                "sources": self._process_sources(research_results),
+                "query_variations": list(set(r['query_used'] for r in research_results if 'query_used' in r))
             }
+        except Exception as e:
+            self.logger.error(f"Report update failed: {str(e)}", exc_info=True)
+            raise
+
+    async def astream_report(self, query: str, research_results: List[Dict[str, Any]],
+                             callbacks: Optional[List[Any]] = None) -> AsyncIterator[str]:
+        """Yield report text chunks as the LLM produces them.
+
+        In map-reduce mode the sources are summarized first and only the final
+        (reduce) call is streamed.
+        """
+        if self._use_map_reduce(research_results):
+            results = await self.summarize_sources(research_results)
+        else:
+            results = self.packer.pack(research_results)
+        inputs = {
+            "query": query,
+            "results": results
+        }
+        config = self._config(callbacks)
+        async for chunk in self.llm_guard.astream(lambda: self.chain.astream(inputs, config=config)):
+            yield chunk
+
+    def _use_map_reduce(self, research_results: List[Dict[str, Any]]) -> bool:
+        if self.mode != "auto":
+            return self.mode == "map_reduce"
+        needed = sum(estimate_tokens(self.packer.content_of(r)) for r in research_results)
+        return needed > self.packer.token_budget
+
+    async def summarize_sources(self, research_results: List[Dict[str, Any]]) -> str:
+        """Summarize every source concurrently; return them as a [Source N] listing.
+
+        At most map_concurrency summaries are in flight. Summaries are cached by
+        content hash, and a source whose summary fails falls back to its snippet.
+        """
+        semaphore = asyncio.Semaphore(self.map_concurrency)
+
+        async def summarize(index: int, result: Dict[str, Any]) -> str:
+            async with semaphore:
+                summary = await self._summarize(result)
+            return f"{self.packer.header(index, result)}\n{summary}"
+
+        with span("llm.map", sources=len(research_results)):
+            blocks = await asyncio.gather(*(summarize(i, r) for i, r in enumerate(research_results)))
+        return "\n\n".join(blocks)
+
+    async def _summarize(self, result: Dict[str, Any]) -> str:
+        key = ResultCache.key_for(content_hash(result), kind="summary", model=self.model)
+        if self.summary_cache is not None:
+            cached = await asyncio.to_thread(self.summary_cache.get, key)
+            if cached is not None:
+                with span("llm.summarize", cached=True):
+                    return cached
+
+        inputs = {"title": result.get("title", ""), "content": self.packer.content_of(result)}
+        try:
+            with span("llm.summarize", cached=False) as s:
+                config = self._config([usage_callback(s)], tags=[NOSTREAM_TAG])
+                summary = await self.llm_guard.acall(self.summary_chain.ainvoke, inputs, config=config)
+                s.set(output_chars=len(summary))
+        except Exception as e:
+            self.logger.warning(f"Summarizing {result.get('url', 'source')} failed, using its snippet: {str(e)}")
+            return result.get("content", "") or ""
+
+        if self.summary_cache is not None:
+            await asyncio.to_thread(self.summary_cache.set, key, summary)
+        return summary
+
+    @staticmethod
+    def _config(callbacks: Optional[List[Any]], tags: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+        """Add callbacks (and tags) on top of the inherited run config.
+
+        A bare {"callbacks": [...]} would replace the caller's handlers, including
+        the one LangGraph uses to stream LLM tokens out of the graph.
+        """
+        if not callbacks and not tags:
+            return None
+        extra: Dict[str, Any] = {"callbacks": callbacks or []}
+        if tags:
+            extra["tags"] = tags
+        return merge_configs(ensure_config(), extra)
 
     def _process_sources(self, research_results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Format source information with query info"""
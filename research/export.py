@@ -1,36 +1,100 @@
+import os
 import json
 import csv
+import html
+import base64
+import threading
 from datetime import datetime
-from docx import Document
-from docx.shared import Inches, Pt
-from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
+from concurrent.futures import ProcessPoolExecutor
+
+HTML_TEMPLATE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>AI Research Report</title>
+<style>
+body {{ font-family: Calibri, Arial, sans-serif; max-width: 50em; margin: 2em auto; line-height: 1.45; }}
+table {{ border-collapse: collapse; }} td, th {{ border: 1px solid #999; padding: 0.3em 0.6em; }}
+img {{ max-width: 100%; }} .meta {{ color: #555; }}
+</style></head>
+<body>
+<h1 style="text-align: center">AI Research Report</h1>
+<p class="meta"><b>Generated on:</b> {generated}</p>
+<h1>Research Findings</h1>
+{body}
+</body></html>
+"""
+
+# Export threads that start together would import python-docx concurrently, which
+# importlib can abort with "deadlock detected"; the first import runs under this lock
+_import_lock = threading.Lock()
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def export_pool(workers: int) -> ProcessPoolExecutor:
+    """Process pool for CPU-bound exports, so long reports do not hold the GIL"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=workers)
+        return _pool
+
+
+def _source_entries(sources):
+    for i, source in enumerate(sources or [], 1):
+        if isinstance(source, dict):
+            i = source.get('id', i)
+            yield i, source.get('title', f'Source {i}'), source.get('url', '')
+        else:
+            yield i, f'Source {i}', source
 
 class Exporter:
     @staticmethod
-    def save_json(data, filename="output.json"):
+    def _output_path(filename, output_dir=None):
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+            return os.path.join(output_dir, filename)
+        return filename
+
+    @staticmethod
+    def save_json(data, filename="output.json", output_dir=None):
         try:
-            with open(filename, 'w') as f:
-                json.dump(data, f, indent=4)
-            print(f"[✅] JSON saved to {filename}")
+            path = Exporter._output_path(filename, output_dir)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, separators=(",", ":"), ensure_ascii=False, default=str)
+            print(f"[✅] JSON saved to {path}")
+            return path
         except Exception as e:
             print(f"[❌] Error saving JSON: {e}")
+            return None
 
     @staticmethod
-    def save_csv(data, filename="output.csv"):
+    def save_csv(data, filename="output.csv", output_dir=None, fieldnames=None):
+        """Write dict rows as CSV; columns are fieldnames, or every key seen in order of first use"""
         try:
-            with open(filename, 'w', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow(data[0].keys())  # Writing header
-                for row in data:
-                    writer.writerow(row.values())
-            print(f"[✅] CSV saved to {filename}")
+            path = Exporter._output_path(filename, output_dir)
+            if fieldnames is None:
+                data = list(data)
+                fieldnames = list(dict.fromkeys(key for row in data for key in row))
+            with open(path, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.DictWriter(f, fieldnames=fieldnames, restval="", extrasaction="ignore")
+                writer.writeheader()
+                writer.writerows(data)
+            print(f"[✅] CSV saved to {path}")
+            return path
         except Exception as e:
             print(f"[❌] Error saving CSV: {e}")
+            return None
 
     @staticmethod
-    def to_word(content_text, image_path=None, sources=None, filename="report.docx"):
+    def to_word(content_text, image_path=None, sources=None, filename="report.docx", template=None):
         try:
-            doc = Document()
+            # python-docx and markdown2 load on first export rather than at startup
+            with _import_lock:
+                from docx.shared import Inches
+                from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
+                from .markdown_docx import add_hyperlink, render_markdown, template_document
+
+            doc = template_document(template)
             
             # Title and metadata
             title = doc.add_heading("AI Research Report", level=0)
@@ -40,16 +104,9 @@ class Exporter:
             date_para.add_run("Generated on: ").bold = True
             date_para.add_run(datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
             
-            # Add content with improved formatting
+            # Render the markdown report (headings, emphasis, lists, links, tables)
             doc.add_heading("Research Findings", level=1)
-            for paragraph in content_text.split('\n'):
-                if paragraph.strip().startswith('#'):
-                    # Handle markdown headings
-                    level = paragraph.count('#')
-                    doc.add_heading(paragraph.replace('#', '').strip(), level=min(level, 3))
-                elif paragraph.strip():
-                    p = doc.add_paragraph(paragraph)
-                    p.paragraph_format.space_after = Pt(8)
+            render_markdown(doc, content_text)
             
             # Add visualization if available
             if image_path:
@@ -59,17 +116,12 @@ class Exporter:
             # Add sources section if available
             if sources:
                 doc.add_heading("References", level=1)
-                for i, source in enumerate(sources, 1):
-                    if isinstance(source, dict):
-                        url = source.get('url', '')
-                        title = source.get('title', f'Source {i}')
-                    else:
-                        url = source
-                        title = f'Source {i}'
-                    
+                for i, title, url in _source_entries(sources):
                     p = doc.add_paragraph()
                     p.add_run(f"[{i}] ").bold = True
-                    p.add_run(f"{title}: {url}")
+                    p.add_run(f"{title}: ")
+                    if url:
+                        add_hyperlink(p, url, url)
             
             doc.save(filename)
             print(f"[✅] Report saved to {filename}")
@@ -79,10 +131,74 @@ class Exporter:
             return None
 
     @staticmethod
-    def format_output(data, format_type="json"):
+    def render_html(content_text, image_path=None, sources=None):
+        """The report as a self-contained HTML document"""
+        with _import_lock:
+            from .markdown_docx import markdown_to_html
+
+        body = [markdown_to_html(content_text)]
+        if image_path:
+            # Inline the chart so the HTML file is self-contained
+            with open(image_path, 'rb') as f:
+                encoded = base64.b64encode(f.read()).decode('ascii')
+            mime = "image/svg+xml" if image_path.endswith(".svg") else "image/png"
+            body.append("<h1>Source Reliability Analysis</h1>")
+            body.append(f'<img src="data:{mime};base64,{encoded}" alt="Source reliability">')
+        if sources:
+            body.append("<h1>References</h1>")
+            for i, title, url in _source_entries(sources):
+                link = f' <a href="{html.escape(url, quote=True)}">{html.escape(url)}</a>' if url else ""
+                body.append(f"<p><b>[{i}]</b> {html.escape(str(title))}:{link}</p>")
+        return HTML_TEMPLATE.format(
+            generated=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            body="\n".join(body)
+        )
+
+    @staticmethod
+    def to_html(content_text, image_path=None, sources=None, filename="report.html"):
+        try:
+            document = Exporter.render_html(content_text, image_path, sources)
+            with open(filename, 'w', encoding='utf-8') as f:
+                f.write(document)
+            print(f"[✅] HTML report saved to {filename}")
+            return filename
+        except Exception as e:
+            print(f"[❌] Error saving HTML report: {e}")
+            return None
+
+    @staticmethod
+    def to_pdf(content_text, image_path=None, sources=None, filename="report.pdf"):
+        """Render the HTML report to PDF; needs the optional weasyprint package"""
+        try:
+            try:
+                from weasyprint import HTML
+            except ImportError:
+                raise ImportError("PDF export requires weasyprint (pip install weasyprint)")
+            # Rendered in memory: the html export may be writing report_<run_id>.html right now
+            document = Exporter.render_html(content_text, image_path, sources)
+            HTML(string=document, base_url=os.path.dirname(os.path.abspath(filename))).write_pdf(filename)
+            print(f"[✅] PDF report saved to {filename}")
+            return filename
+        except Exception as e:
+            print(f"[❌] Error saving PDF report: {e}")
+            return None
+
+    @staticmethod
+    def export(format_type, content_text, image_path=None, sources=None, filename=None):
+        """Export a report as docx, html or pdf"""
+        exporters = {"docx": Exporter.to_word, "html": Exporter.to_html, "pdf": Exporter.to_pdf}
+        if format_type not in exporters:
+            print(f"[❌] Unsupported report format: {format_type}")
+            return None
+        return exporters[format_type](content_text, image_path=image_path, sources=sources,
+                                      filename=filename or f"report.{format_type}")
+
+    @staticmethod
+    def format_output(data, format_type="json", output_dir=None):
         if format_type == "json":
-            Exporter.save_json(data)
+            return Exporter.save_json(data, output_dir=output_dir)
         elif format_type == "csv":
-            Exporter.save_csv(data)
+            return Exporter.save_csv(data, output_dir=output_dir)
         else:
             print(f"[❌] Unsupported format: {format_type}")
+            return None
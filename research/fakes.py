@@ -0,0 +1,282 @@
+import os
+import re
+import json
+import time
+import asyncio
+import hashlib
+import logging
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import (
+    AIMessage, AIMessageChunk, BaseMessage, HumanMessage, ToolMessage,
+    message_to_dict, messages_from_dict, messages_to_dict
+)
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from .cache import ResultCache
+
+logger = logging.getLogger(__name__)
+
+WORDS = ("analysis", "market", "evidence", "policy", "growth", "risk", "study", "data",
+         "impact", "trend", "report", "survey", "model", "energy", "health", "security")
+
+
+def _digest(*parts: Any) -> int:
+    payload = json.dumps(parts, sort_keys=True, default=str).encode("utf-8")
+    return int.from_bytes(hashlib.sha256(payload).digest()[:8], "big")
+
+
+class FakeHTTPError(Exception):
+    """Provider error shaped like an HTTP client's: a status code and a response with headers"""
+
+    def __init__(self, status_code: int, retry_after: Optional[float] = None):
+        super().__init__(f"HTTP {status_code} from fake provider")
+        self.status_code = status_code
+        self.response = SimpleNamespace(
+            status_code=status_code,
+            headers={"Retry-After": str(retry_after)} if retry_after is not None else {}
+        )
+
+
+class FakeTavilyClient:
+    """Deterministic offline stand-in for TavilyClient with configurable latency and failures.
+
+    slow_rate of the calls take slow_latency instead, to simulate a long tail;
+    "basic" searches take half the latency of "advanced" ones. The first fail_first
+    calls, and fail_rate of the rest, raise FakeHTTPError(fail_status) with an
+    optional Retry-After header, to exercise throttling and outage handling.
+    """
+
+    def __init__(self, latency: float = 0.0, raw_content_chars: int = 4000,
+                 slow_rate: float = 0.0, slow_latency: float = 0.0, fail_first: int = 0,
+                 fail_rate: float = 0.0, fail_status: int = 429, retry_after: Optional[float] = None):
+        self.latency = latency
+        self.raw_content_chars = raw_content_chars
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.fail_first = fail_first
+        self.fail_rate = fail_rate
+        self.fail_status = fail_status
+        self.retry_after = retry_after
+        self.calls = 0
+        self.failures = 0
+
+    def search(self, query: str, max_results: int = 5, include_answer: bool = False,
+               include_raw_content: bool = False, search_depth: str = "advanced",
+               **kwargs: Any) -> Dict[str, Any]:
+        self.calls += 1
+        if self.calls <= self.fail_first or (
+                self.fail_rate and _digest("fail", query, self.calls) % 1000 < self.fail_rate * 1000):
+            self.failures += 1
+            raise FakeHTTPError(self.fail_status, self.retry_after)
+        slow = self.slow_rate and _digest(query, self.calls) % 1000 < self.slow_rate * 1000
+        latency = self.slow_latency if slow else self.latency
+        if latency:
+            time.sleep(latency / 2 if search_depth == "basic" else latency)
+        slug = "-".join(query.lower().split())[:40]
+        results = []
+        for i in range(max_results):
+            seed = _digest(query, i)
+            words = " ".join(WORDS[(seed >> (4 * j)) % len(WORDS)] for j in range(12))
+            content = f"{query}: {words}."
+            result = {
+                "url": f"https://source{seed % 7}.example.org/{slug}/{i}",
+                "title": f"{query.title()} - {WORDS[seed % len(WORDS)].title()} {i + 1}",
+                "content": content,
+                "score": round(0.3 + (seed % 70) / 100, 2),
+            }
+            if include_raw_content:
+                result["raw_content"] = (content + " ") * (self.raw_content_chars // (len(content) + 1) + 1)
+            results.append(result)
+        response = {"query": query, "results": results}
+        if include_answer:
+            response["answer"] = f"Summary answer for '{query}'."
+        return response
+
+
+class FakeChatModel(BaseChatModel):
+    """Offline chat model: calls web_search once when tools are bound, then writes a report"""
+
+    latency: float = 0.0
+    tool_names: List[str] = []
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-research-chat"
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "FakeChatModel":
+        names = [getattr(t, "name", None) or getattr(t, "__name__", str(t)) for t in tools]
+        return self.model_copy(update={"tool_names": names})
+
+    def _respond(self, messages: List[BaseMessage]) -> AIMessage:
+        question = next((m.content for m in messages if isinstance(m, HumanMessage)), "")
+        if self.tool_names and not any(isinstance(m, ToolMessage) for m in messages):
+            return AIMessage(content="", tool_calls=[{
+                "name": self.tool_names[0],
+                "args": {"query": str(question)},
+                "id": f"call_{_digest(question) % 10**8}"
+            }])
+        prompt = "\n".join(str(m.content) for m in messages)
+        if prompt.lstrip().startswith("Extract the key facts"):
+            # Per-source summary (map step of map-reduce drafting)
+            return AIMessage(content="\n".join(
+                f"- {WORDS[_digest(prompt, i) % len(WORDS)].title()} "
+                + " ".join(WORDS[_digest(prompt, i, j) % len(WORDS)] for j in range(8))
+                for i in range(4)
+            ))
+        sources = sorted(set(int(n) for n in re.findall(r"\[Source (\d+)\]", prompt)))[:3]
+        cites = " ".join(f"[Source {n}]" for n in sources) or "[Source 1]"
+        text = (
+            "## Executive Summary\n\nThis offline report summarizes the collected research. "
+            f"{cites}\n\n## Key Findings\n\n- **Finding one** is supported by the data {cites}\n"
+            "- Finding two needs further study\n\n## Detailed Analysis\n\n"
+            + " ".join(WORDS[_digest(prompt, i) % len(WORDS)] for i in range(60))
+            + "\n\n## Conclusion\n\nThe evidence is consistent across sources.\n"
+        )
+        return AIMessage(content=text)
+
+    def _usage(self, messages: List[BaseMessage], message: AIMessage) -> Dict[str, int]:
+        input_tokens = sum(len(str(m.content)) for m in messages) // 4
+        output_tokens = len(str(message.content)) // 4
+        return {"input_tokens": input_tokens, "output_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens}
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs: Any) -> ChatResult:
+        if self.latency:
+            time.sleep(self.latency)
+        message = self._respond(messages)
+        message.usage_metadata = self._usage(messages, message)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+                         **kwargs: Any) -> ChatResult:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        message = self._respond(messages)
+        message.usage_metadata = self._usage(messages, message)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                run_manager: Optional[CallbackManagerForLLMRun] = None,
+                **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        result = self._generate(messages, stop, **kwargs)
+        yield from self._chunks(result.generations[0].message)
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                       run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+                       **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        result = await self._agenerate(messages, stop, **kwargs)
+        for chunk in self._chunks(result.generations[0].message):
+            yield chunk
+
+    @staticmethod
+    def _chunks(message: AIMessage) -> Iterator[ChatGenerationChunk]:
+        if message.tool_calls:
+            yield ChatGenerationChunk(message=AIMessageChunk(
+                content="",
+                tool_call_chunks=[{"name": c["name"], "args": json.dumps(c["args"]), "id": c["id"], "index": 0}
+                                  for c in message.tool_calls],
+                usage_metadata=message.usage_metadata
+            ))
+            return
+        words = str(message.content).split(" ")
+        for i, word in enumerate(words):
+            yield ChatGenerationChunk(message=AIMessageChunk(
+                content=word + (" " if i < len(words) - 1 else ""),
+                usage_metadata=message.usage_metadata if i == len(words) - 1 else None
+            ))
+
+
+class RecordingTavilyClient:
+    """Record real Tavily responses to fixture files, or replay them without a network"""
+
+    def __init__(self, client: Any = None, fixture_dir: str = "fixtures", mode: str = "replay"):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unsupported mode: {mode}")
+        if mode == "record" and client is None:
+            raise ValueError("Recording requires a live client")
+        self.client = client
+        self.mode = mode
+        self.fixture_dir = os.path.join(fixture_dir, "tavily")
+        os.makedirs(self.fixture_dir, exist_ok=True)
+
+    def search(self, query: str, **kwargs: Any) -> Dict[str, Any]:
+        path = os.path.join(self.fixture_dir, f"{ResultCache.key_for(query, **kwargs)}.json")
+        if self.mode == "replay":
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"No recorded Tavily response for '{query}' ({path})")
+            with open(path) as f:
+                return json.load(f)["response"]
+
+        response = self.client.search(query=query, **kwargs)
+        with open(path, 'w') as f:
+            json.dump({"query": query, "params": kwargs, "response": response}, f)
+        logger.info(f"Recorded Tavily response to {path}")
+        return response
+
+
+class RecordingChatModel(BaseChatModel):
+    """Record a live chat model's replies keyed by prompt, or replay them offline"""
+
+    inner: Any = None
+    fixture_dir: str = "fixtures"
+    mode: str = "replay"
+    tool_names: List[str] = []
+
+    @property
+    def _llm_type(self) -> str:
+        return f"recording-{self.mode}"
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "RecordingChatModel":
+        names = [getattr(t, "name", None) or getattr(t, "__name__", str(t)) for t in tools]
+        inner = self.inner.bind_tools(tools, **kwargs) if self.inner is not None else None
+        return self.model_copy(update={"inner": inner, "tool_names": names})
+
+    def _path(self, messages: List[BaseMessage]) -> str:
+        # Tool call ids differ between live runs, so they are left out of the key
+        key_messages = [
+            {"type": m["type"], "content": m["data"].get("content")}
+            for m in messages_to_dict(messages)
+        ]
+        key = hashlib.sha256(json.dumps([key_messages, self.tool_names], sort_keys=True,
+                                        default=str).encode("utf-8")).hexdigest()
+        directory = os.path.join(self.fixture_dir, "llm")
+        os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, f"{key}.json")
+
+    def _replay(self, path: str) -> ChatResult:
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"No recorded LLM response ({path})")
+        with open(path) as f:
+            message = messages_from_dict([json.load(f)["message"]])[0]
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _record(self, path: str, message: BaseMessage) -> ChatResult:
+        message = AIMessage(
+            content=message.content,
+            tool_calls=getattr(message, "tool_calls", []),
+            usage_metadata=getattr(message, "usage_metadata", None)
+        )
+        with open(path, 'w') as f:
+            json.dump({"message": message_to_dict(message)}, f)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs: Any) -> ChatResult:
+        path = self._path(messages)
+        if self.mode == "replay":
+            return self._replay(path)
+        return self._record(path, self.inner.invoke(messages, stop=stop))
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+                         **kwargs: Any) -> ChatResult:
+        path = self._path(messages)
+        if self.mode == "replay":
+            return self._replay(path)
+        return self._record(path, await self.inner.ainvoke(messages, stop=stop))
@@ -0,0 +1,35 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+
+
+class StageLimiter:
+    """Named semaphores that cap how many pipelines run a stage at once"""
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    def configure(self, **limits: Optional[int]) -> None:
+        """Set per-stage limits, e.g. configure(search=8, llm=2); None removes a limit"""
+        for stage, limit in limits.items():
+            if limit is None:
+                self._semaphores.pop(stage, None)
+            else:
+                self._semaphores[stage] = asyncio.Semaphore(limit)
+                self.logger.info(f"Limiting stage '{stage}' to {limit} concurrent calls")
+
+    @asynccontextmanager
+    async def slot(self, stage: Optional[str]) -> AsyncIterator[None]:
+        """Hold a slot for stage for the duration of the block (no-op if unlimited or None)"""
+        semaphore = self._semaphores.get(stage) if stage else None
+        if semaphore is None:
+            yield
+            return
+        async with semaphore:
+            yield
+
+
+# Process-wide limiter shared by all pipeline runs
+STAGE_LIMITS = StageLimiter()
@@ -0,0 +1,285 @@
+import io
+import os
+import re
+import threading
+from html.parser import HTMLParser
+from typing import Any, Dict, List, Optional, Tuple
+
+import markdown2
+from docx import Document
+from docx.opc.constants import RELATIONSHIP_TYPE
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+from docx.shared import Pt, RGBColor
+
+MARKDOWN_EXTRAS = ["tables", "fenced-code-blocks", "cuddled-lists", "strike"]
+CODE_FONT = "Consolas"
+LINK_COLOR = RGBColor(0x05, 0x63, 0xC1)
+WHITESPACE = re.compile(r"\s+")
+HEADING_TAGS = {"h1": 1, "h2": 2, "h3": 3, "h4": 3, "h5": 3, "h6": 3}
+
+_templates: Dict[Optional[str], bytes] = {}
+_templates_lock = threading.Lock()
+
+
+def markdown_to_html(text: str) -> str:
+    return markdown2.markdown(text, extras=MARKDOWN_EXTRAS)
+
+
+def _build_template(path: Optional[str]) -> bytes:
+    doc = Document(path) if path else Document()
+    if not path:
+        normal = doc.styles["Normal"]
+        normal.font.name = "Calibri"
+        normal.font.size = Pt(11)
+        normal.paragraph_format.space_after = Pt(8)
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+def template_document(path: Optional[str] = None) -> Any:
+    """New Document from a cached, pre-styled template (path, or the built-in default).
+
+    Styling is applied once per process; each report only parses the saved bytes.
+    """
+    path = path or os.getenv("REPORT_TEMPLATE_PATH") or None
+    data = _templates.get(path)
+    if data is None:
+        with _templates_lock:
+            data = _templates.get(path)
+            if data is None:
+                data = _templates[path] = _build_template(path)
+    return Document(io.BytesIO(data))
+
+
+def add_hyperlink(paragraph: Any, url: str, text: str, bold: bool = False,
+                  italic: bool = False) -> None:
+    """Append a clickable link run; python-docx has no public API for this"""
+    rel_id = paragraph.part.relate_to(url, RELATIONSHIP_TYPE.HYPERLINK, is_external=True)
+    link = OxmlElement("w:hyperlink")
+    link.set(qn("r:id"), rel_id)
+    run = OxmlElement("w:r")
+    props = OxmlElement("w:rPr")
+    color = OxmlElement("w:color")
+    color.set(qn("w:val"), str(LINK_COLOR))
+    props.append(color)
+    underline = OxmlElement("w:u")
+    underline.set(qn("w:val"), "single")
+    props.append(underline)
+    for flag, tag in ((bold, "w:b"), (italic, "w:i")):
+        if flag:
+            props.append(OxmlElement(tag))
+    run.append(props)
+    text_element = OxmlElement("w:t")
+    text_element.text = text
+    text_element.set(qn("xml:space"), "preserve")
+    run.append(text_element)
+    link.append(run)
+    paragraph._p.append(link)
+
+
+class MarkdownDocxRenderer(HTMLParser):
+    """Render markdown into a python-docx Document in a single pass.
+
+    The markdown is converted to HTML by markdown2 and the HTML event stream is
+    mapped straight onto docx paragraphs, runs and tables: headings, bold/italic,
+    inline and block code, links, nested bullet/numbered lists, tables,
+    blockquotes and rules.
+    """
+
+    def __init__(self, doc: Any):
+        super().__init__(convert_charrefs=True)
+        self.doc = doc
+        self.paragraph = None
+        self.bold = 0
+        self.italic = 0
+        self.strike = 0
+        self.code = 0
+        self.pre = 0
+        self.quote = 0
+        self.link: Optional[str] = None
+        self.lists: List[str] = []
+        self.pending_list_item = False
+        # Tables are buffered as rows of cells of (text, bold, italic) runs
+        self.table: Optional[List[List[List[Tuple[str, bool, bool]]]]] = None
+        self.header_rows = 0
+        self.in_cell = False
+        self._style_ids: Dict[str, Optional[str]] = {}
+
+    def render(self, markdown_text: str) -> Any:
+        self.feed(markdown_to_html(markdown_text))
+        self.close()
+        return self.doc
+
+    # Block structure
+
+    def _list_style(self) -> str:
+        base = "List Bullet" if self.lists[-1] == "ul" else "List Number"
+        depth = min(len(self.lists), 3)
+        return base if depth == 1 else f"{base} {depth}"
+
+    def _style_id(self, name: str) -> Optional[str]:
+        # python-docx resolves style names with a scan of every style on each call,
+        # which dominated export time for long reports; resolve each name once
+        if name not in self._style_ids:
+            try:
+                self._style_ids[name] = self.doc.styles[name].style_id
+            except KeyError:
+                # Custom templates may lack a style; fall back to Normal
+                self._style_ids[name] = None
+        return self._style_ids[name]
+
+    def _add_paragraph(self, style: Optional[str] = None) -> Any:
+        paragraph = self.doc.add_paragraph()
+        style_id = self._style_id(style) if style else None
+        if style_id:
+            paragraph._p.style = style_id
+        return paragraph
+
+    def _open_paragraph(self) -> Any:
+        if self.pending_list_item and self.lists:
+            self.paragraph = self._add_paragraph(self._list_style())
+            self.pending_list_item = False
+        elif self.quote:
+            self.paragraph = self._add_paragraph("Quote")
+        else:
+            self.paragraph = self._add_paragraph()
+        return self.paragraph
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        if tag in HEADING_TAGS:
+            self.paragraph = self._add_paragraph(f"Heading {HEADING_TAGS[tag]}")
+        elif tag == "p":
+            # A list item's first paragraph still picks up the list style
+            self.paragraph = None
+        elif tag in ("ul", "ol"):
+            self.lists.append(tag)
+            self.paragraph = None
+        elif tag == "li":
+            self.pending_list_item = True
+            self.paragraph = None
+        elif tag in ("strong", "b"):
+            self.bold += 1
+        elif tag in ("em", "i"):
+            self.italic += 1
+        elif tag in ("del", "s", "strike"):
+            self.strike += 1
+        elif tag == "code":
+            self.code += 1
+        elif tag == "pre":
+            self.pre += 1
+            self.paragraph = None
+        elif tag == "blockquote":
+            self.quote += 1
+            self.paragraph = None
+        elif tag == "a":
+            self.link = dict(attrs).get("href")
+        elif tag == "br" and self.paragraph is not None:
+            self.paragraph.add_run().add_break()
+        elif tag == "hr":
+            self.paragraph = None
+            self._add_paragraph().add_run("_" * 40)
+        elif tag == "table":
+            self.table = []
+            self.header_rows = 0
+        elif tag == "tr" and self.table is not None:
+            self.table.append([])
+        elif tag in ("td", "th") and self.table is not None and self.table:
+            self.table[-1].append([])
+            self.in_cell = True
+            if tag == "th" and len(self.table) > self.header_rows:
+                self.header_rows = len(self.table)
+        elif tag == "img":
+            alt = dict(attrs).get("alt")
+            if alt:
+                self.handle_data(f"[{alt}]")
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in HEADING_TAGS or tag == "p":
+            self.paragraph = None
+        elif tag in ("ul", "ol"):
+            if self.lists:
+                self.lists.pop()
+            self.paragraph = None
+        elif tag == "li":
+            self.pending_list_item = False
+            self.paragraph = None
+        elif tag in ("strong", "b"):
+            self.bold = max(0, self.bold - 1)
+        elif tag in ("em", "i"):
+            self.italic = max(0, self.italic - 1)
+        elif tag in ("del", "s", "strike"):
+            self.strike = max(0, self.strike - 1)
+        elif tag == "code":
+            self.code = max(0, self.code - 1)
+        elif tag == "pre":
+            self.pre = max(0, self.pre - 1)
+            self.paragraph = None
+        elif tag == "blockquote":
+            self.quote = max(0, self.quote - 1)
+            self.paragraph = None
+        elif tag == "a":
+            self.link = None
+        elif tag in ("td", "th"):
+            self.in_cell = False
+        elif tag == "table" and self.table is not None:
+            self._flush_table()
+
+    # Inline content
+
+    def handle_data(self, data: str) -> None:
+        if self.table is not None:
+            if self.in_cell and self.table and self.table[-1]:
+                self.table[-1][-1].append((WHITESPACE.sub(" ", data), bool(self.bold), bool(self.italic)))
+            return
+        if not self.pre:
+            if not data.strip() and self.paragraph is None:
+                return
+            # Collapse source newlines/indentation the way a browser would
+            data = WHITESPACE.sub(" ", data)
+            if self.paragraph is None:
+                data = data.lstrip()
+        else:
+            data = data.rstrip("\n") if data.endswith("\n") else data
+
+        paragraph = self.paragraph if self.paragraph is not None else self._open_paragraph()
+        if self.link and not self.pre:
+            add_hyperlink(paragraph, self.link, data, bool(self.bold), bool(self.italic))
+            return
+        run = paragraph.add_run(data)
+        run.bold = bool(self.bold) or None
+        run.italic = bool(self.italic) or None
+        if self.strike:
+            run.font.strike = True
+        if self.code or self.pre:
+            run.font.name = CODE_FONT
+
+    def _flush_table(self) -> None:
+        rows = [row for row in self.table if row]
+        self.table = None
+        self.paragraph = None
+        if not rows:
+            return
+        columns = max(len(row) for row in rows)
+        table = self.doc.add_table(rows=len(rows), cols=columns)
+        style_id = self._style_id("Table Grid")
+        if style_id:
+            table._tbl.tblPr.style = style_id
+        for r, (table_row, row) in enumerate(zip(table.rows, rows)):
+            cells = table_row.cells
+            for c, runs in enumerate(row):
+                paragraph = cells[c].paragraphs[0]
+                for i, (text, bold, italic) in enumerate(runs):
+                    if i == 0:
+                        text = text.lstrip()
+                    if i == len(runs) - 1:
+                        text = text.rstrip()
+                    run = paragraph.add_run(text)
+                    run.bold = bold or r < self.header_rows or None
+                    run.italic = italic or None
+
+
+def render_markdown(doc: Any, markdown_text: str) -> Any:
+    """Append rendered markdown to doc and return it"""
+    return MarkdownDocxRenderer(doc).render(markdown_text)
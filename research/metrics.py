@@ -0,0 +1,234 @@
+import os
+import json
+import time
+import uuid
+import threading
+import functools
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+# Span attributes that are also accumulated as process-wide counters
+COUNTED_ATTRS = ("input_tokens", "output_tokens", "raw_bytes", "results")
+
+
+class Span:
+    """One timed operation with free-form attributes"""
+
+    def __init__(self, name: str, parent: Optional["Span"] = None, **attrs: Any):
+        self.id = uuid.uuid4().hex[:12]
+        self.name = name
+        self.parent_id = parent.id if parent else None
+        self.attrs: Dict[str, Any] = dict(attrs)
+        self.start = time.time()
+        self._perf_start = time.perf_counter()
+        self.duration: Optional[float] = None
+        self.error: Optional[str] = None
+
+    def set(self, **attrs: Any) -> None:
+        self.attrs.update(attrs)
+
+    def add(self, key: str, value: float) -> None:
+        self.attrs[key] = self.attrs.get(key, 0) + value
+
+    def finish(self) -> None:
+        self.duration = time.perf_counter() - self._perf_start
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": self.start,
+            "duration": round(self.duration or 0.0, 6),
+            "error": self.error,
+            "attrs": self.attrs
+        }
+
+
+class Trace:
+    """All spans recorded during one pipeline run"""
+
+    def __init__(self, query: str, run_id: Optional[str] = None):
+        self.run_id = run_id or uuid.uuid4().hex
+        self.query = query
+        self.start = time.time()
+        self.spans: List[Span] = []
+
+    def to_dict(self) -> Dict[str, Any]:
+        spans = [s.to_dict() for s in self.spans]
+        totals: Dict[str, float] = {}
+        for s in spans:
+            for key in COUNTED_ATTRS:
+                if isinstance(s["attrs"].get(key), (int, float)):
+                    totals[key] = totals.get(key, 0) + s["attrs"][key]
+        return {
+            "run_id": self.run_id,
+            "query": self.query,
+            "start": self.start,
+            "duration": round(time.time() - self.start, 6),
+            "totals": totals,
+            "spans": spans
+        }
+
+    def save(self, path: str) -> str:
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2, default=str)
+        logger.info(f"Trace saved to {path}")
+        return path
+
+
+class MetricsRegistry:
+    """Process-wide counters and latency histograms in Prometheus text format"""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._counters: Dict[Tuple[str, Tuple], float] = {}
+        self._histograms: Dict[Tuple[str, Tuple], List[float]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(name: str, labels: Dict[str, Any]) -> Tuple[str, Tuple]:
+        return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def inc(self, name: str, value: float = 1.0, **labels: Any) -> None:
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        key = self._key(name, labels)
+        with self._lock:
+            # Layout: one cumulative count per bucket, then sum, then count
+            values = self._histograms.setdefault(key, [0.0] * (len(self.buckets) + 2))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    values[i] += 1
+            values[-2] += value
+            values[-1] += 1
+
+    @staticmethod
+    def _labels(labels: Tuple, extra: str = "") -> str:
+        parts = [f'{k}="{v}"' for k, v in labels]
+        if extra:
+            parts.append(extra)
+        return "{" + ",".join(parts) + "}" if parts else ""
+
+    def render(self) -> str:
+        lines: List[str] = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(self._histograms.items())
+        typed = set()
+        for (name, labels), value in counters:
+            if name not in typed:
+                lines.append(f"# TYPE {name} counter")
+                typed.add(name)
+            lines.append(f"{name}{self._labels(labels)} {value:g}")
+        for (name, labels), values in histograms:
+            if name not in typed:
+                lines.append(f"# TYPE {name} histogram")
+                typed.add(name)
+            for bound, count in zip(self.buckets, values):
+                le = 'le="%g"' % bound
+                lines.append(f"{name}_bucket{self._labels(labels, le)} {count:g}")
+            le = 'le="+Inf"'
+            lines.append(f"{name}_bucket{self._labels(labels, le)} {values[-1]:g}")
+            lines.append(f"{name}_sum{self._labels(labels)} {values[-2]:.6f}")
+            lines.append(f"{name}_count{self._labels(labels)} {values[-1]:g}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str) -> str:
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(self.render())
+        os.replace(tmp_path, path)
+        return path
+
+
+METRICS = MetricsRegistry()
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("research_trace", default=None)
+_current_span: ContextVar[Optional[Span]] = ContextVar("research_span", default=None)
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+@contextmanager
+def trace_run(query: str, run_id: Optional[str] = None) -> Iterator[Trace]:
+    """Collect every span recorded in this context (and its tasks/threads) into a Trace"""
+    trace = Trace(query, run_id)
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        try:
+            _current_trace.reset(token)
+        except ValueError:
+            # An async generator closed from another context; the trace is already complete
+            pass
+
+
+@contextmanager
+def span(name: str, **attrs: Any) -> Iterator[Span]:
+    """Time a block, attach it to the current trace and feed the metrics registry"""
+    current = Span(name, parent=_current_span.get(), **attrs)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _current_span.reset(token)
+        current.finish()
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.spans.append(current)
+        METRICS.observe("research_span_seconds", current.duration, span=name)
+        if current.error:
+            METRICS.inc("research_span_errors_total", span=name)
+        for key in COUNTED_ATTRS:
+            value = current.attrs.get(key)
+            if isinstance(value, (int, float)) and value:
+                METRICS.inc(f"research_{key}_total", value, span=name)
+        if "cache_hit" in current.attrs:
+            METRICS.inc("research_cache_requests_total", span=name,
+                        result="hit" if current.attrs["cache_hit"] else "miss")
+
+
+def traced_node(name: str) -> Callable:
+    """Decorator wrapping an async LangGraph node in a span"""
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        async def wrapper(state, *args, **kwargs):
+            with span(f"node.{name}") as s:
+                update = await fn(state, *args, **kwargs)
+                if isinstance(update, dict) and update.get("error"):
+                    s.set(node_error=update["error"])
+                return update
+        return wrapper
+    return decorator
+
+
+def usage_callback(target: Span) -> Any:
+    """LangChain callback handler that adds LLM token usage to a span"""
+    from langchain_core.callbacks import BaseCallbackHandler
+
+    class TokenUsageHandler(BaseCallbackHandler):
+        def on_llm_end(self, response, **kwargs: Any) -> None:
+            target.add("llm_calls", 1)
+            for generations in response.generations:
+                for generation in generations:
+                    usage = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+                    target.add("input_tokens", usage.get("input_tokens", 0))
+                    target.add("output_tokens", usage.get("output_tokens", 0))
+
+    return TokenUsageHandler()
@@ -0,0 +1,97 @@
+import re
+import logging
+from typing import Dict, List
+
+# Frequent misspellings seen in research questions
+SPELLING_CORRECTIONS: Dict[str, str] = {
+    "travily": "tavily",
+    "reserch": "research",
+    "reasearch": "research",
+    "goverment": "government",
+    "enviroment": "environment",
+    "recieve": "receive",
+    "definately": "definitely",
+    "occurence": "occurrence",
+    "seperate": "separate",
+    "technolgy": "technology",
+    "artifical": "artificial",
+    "inteligence": "intelligence",
+}
+
+# Interchangeable terms used to broaden coverage
+SYNONYMS: Dict[str, str] = {
+    "ai": "artificial intelligence",
+    "artificial intelligence": "ai",
+    "llm": "large language model",
+    "llms": "large language models",
+    "ml": "machine learning",
+    "ev": "electric vehicle",
+    "evs": "electric vehicles",
+    "pros and cons": "advantages and disadvantages",
+    "impact": "effects",
+    "effects": "impact",
+    "benefits": "advantages",
+    "risks": "dangers",
+    "latest": "recent",
+    "cost": "price",
+}
+
+# Connectors that split a compound question into independent sub-questions
+SUB_QUESTION_SPLIT = re.compile(r"\s+(?:and|vs\.?|versus|compared to|or)\s+|\s*[;?]\s*", re.IGNORECASE)
+
+
+class QueryExpander:
+    """Generate query variations locally: spelling fixes, synonyms and sub-questions"""
+
+    def __init__(self, corrections: Dict[str, str] = None, synonyms: Dict[str, str] = None,
+                 min_sub_question_words: int = 2):
+        self.logger = logging.getLogger(__name__)
+        self.corrections = SPELLING_CORRECTIONS if corrections is None else corrections
+        self.synonyms = SYNONYMS if synonyms is None else synonyms
+        self.min_sub_question_words = min_sub_question_words
+
+    def expand(self, query: str, max_variations: int = 3) -> List[str]:
+        """Return the original query followed by up to max_variations distinct variations"""
+        query = query.strip()
+        variations = [query]
+        seen = {self._normalize(query)}
+
+        corrected = self.correct_spelling(query)
+        candidates = [corrected]
+        candidates.extend(self.synonym_variations(corrected))
+        candidates.extend(self.sub_questions(corrected))
+
+        for candidate in candidates:
+            if len(variations) > max_variations:
+                break
+            key = self._normalize(candidate)
+            if key and key not in seen:
+                seen.add(key)
+                variations.append(candidate)
+
+        if len(variations) > 1:
+            self.logger.info(f"Expanded query into {len(variations)} variations: {variations}")
+        return variations
+
+    def correct_spelling(self, query: str) -> str:
+        corrected = query
+        for wrong, right in self.corrections.items():
+            corrected = re.sub(rf"\b{re.escape(wrong)}\b", right, corrected, flags=re.IGNORECASE)
+        return corrected
+
+    def synonym_variations(self, query: str) -> List[str]:
+        results = []
+        for term, replacement in self.synonyms.items():
+            pattern = rf"\b{re.escape(term)}\b"
+            if re.search(pattern, query, flags=re.IGNORECASE):
+                results.append(re.sub(pattern, replacement, query, count=1, flags=re.IGNORECASE))
+        return results
+
+    def sub_questions(self, query: str) -> List[str]:
+        parts = [p.strip(" ,.") for p in SUB_QUESTION_SPLIT.split(query)]
+        parts = [p for p in parts if len(p.split()) >= self.min_sub_question_words]
+        return parts if len(parts) > 1 else []
+
+    @staticmethod
+    def _normalize(query: str) -> str:
+        return " ".join(query.lower().split())
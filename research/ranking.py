@@ -0,0 +1,162 @@
+import re
+import math
+import hashlib
+import logging
+from collections import Counter
+from typing import List, Dict, Any, Optional
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# Query parameters that only track the click; other names starting "ref" can select content
+TRACKING_PREFIXES = ("utm_",)
+TRACKING_PARAMS = {"fbclid", "gclid", "mc_cid", "mc_eid", "ref", "ref_src"}
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def canonicalize_url(url: str) -> str:
+    """Normalize a URL so trivially different links to the same page compare equal"""
+    if not url:
+        return ""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if host.endswith(":80") or host.endswith(":443"):
+        host = host.rsplit(":", 1)[0]
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k.lower() not in TRACKING_PARAMS and not k.lower().startswith(TRACKING_PREFIXES)
+    )
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit(("https" if parts.scheme in ("http", "https", "") else parts.scheme,
+                       host, path, urlencode(query), ""))
+
+
+def domain_of(url: str) -> str:
+    """Host of a URL without "www." or a default port ("" for URL-less results)"""
+    canonical = canonicalize_url(url)
+    return canonical.split("/", 3)[2] if canonical.count("/") >= 2 else ""
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def simhash(text: str, bits: int = 64, shingle_size: int = 3) -> int:
+    """SimHash fingerprint over word shingles; similar texts differ in few bits"""
+    tokens = tokenize(text)
+    if len(tokens) >= shingle_size:
+        shingles = [" ".join(tokens[i:i + shingle_size]) for i in range(len(tokens) - shingle_size + 1)]
+    else:
+        shingles = [" ".join(tokens)] if tokens else []
+
+    weights = [0] * bits
+    for shingle, count in Counter(shingles).items():
+        digest = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=bits // 8).digest(), "big")
+        for bit in range(bits):
+            weights[bit] += count if digest >> bit & 1 else -count
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def bm25_scores(query: str, documents: List[str], k1: float = 1.5, b: float = 0.75) -> List[float]:
+    """Okapi BM25 score of each document against the query"""
+    query_terms = set(tokenize(query))
+    doc_tokens = [tokenize(doc) for doc in documents]
+    if not query_terms or not doc_tokens:
+        return [0.0] * len(documents)
+
+    n_docs = len(doc_tokens)
+    avg_len = sum(len(t) for t in doc_tokens) / n_docs or 1.0
+    doc_freq = Counter(term for tokens in doc_tokens for term in set(tokens) if term in query_terms)
+
+    scores = []
+    for tokens in doc_tokens:
+        counts = Counter(tokens)
+        score = 0.0
+        for term in query_terms:
+            tf = counts.get(term, 0)
+            if not tf:
+                continue
+            idf = math.log(1 + (n_docs - doc_freq[term] + 0.5) / (doc_freq[term] + 0.5))
+            score += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * len(tokens) / avg_len))
+        scores.append(score)
+    return scores
+
+
+class ResultRanker:
+    """Deduplicate research results and keep the top-K by blended relevance.
+
+    With a reliability index (see reliability.DomainReliabilityIndex), each
+    result's domain track record across past runs is blended in with
+    reliability_weight.
+    """
+
+    def __init__(self, top_k: int = 10, near_duplicate_distance: int = 3,
+                 score_weight: float = 0.6, reliability: Optional[Any] = None,
+                 reliability_weight: float = 0.2):
+        self.logger = logging.getLogger(__name__)
+        self.top_k = top_k
+        self.near_duplicate_distance = near_duplicate_distance
+        self.score_weight = score_weight
+        self.reliability = reliability
+        self.reliability_weight = reliability_weight
+
+    def rank(self, query: str, results: List[Dict[str, Any]],
+             top_k: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Drop duplicate URLs and near-duplicate content, then re-rank by relevance"""
+        top_k = self.top_k if top_k is None else top_k
+        unique = self.deduplicate(results)
+
+        lexical = bm25_scores(query, [f"{r.get('title', '')} {r.get('content', '')}" for r in unique])
+        max_lexical = max(lexical, default=0.0) or 1.0
+
+        ranked = []
+        for result, lexical_score in zip(unique, lexical):
+            relevance = (self.score_weight * float(result.get("score", 0.0))
+                         + (1 - self.score_weight) * lexical_score / max_lexical)
+            domain = domain_of(result.get("url", ""))
+            if self.reliability is not None and domain:
+                relevance = ((1 - self.reliability_weight) * relevance
+                             + self.reliability_weight * self.reliability.reliability(domain))
+            ranked.append({**result, "relevance": round(relevance, 4)})
+        ranked.sort(key=lambda r: r["relevance"], reverse=True)
+
+        self.logger.info(f"Ranked {len(results)} results -> {len(unique)} unique, keeping top {top_k}")
+        return ranked[:top_k]
+
+    def deduplicate(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Remove repeated URLs (keeping the best score) and near-duplicate content"""
+        by_url: Dict[str, Dict[str, Any]] = {}
+        unique: List[Dict[str, Any]] = []
+        for result in results:
+            url = canonicalize_url(result.get("url", ""))
+            if not url:
+                unique.append(result)
+                continue
+            existing = by_url.get(url)
+            if existing is None or float(result.get("score", 0.0)) > float(existing.get("score", 0.0)):
+                by_url[url] = result
+        unique.extend(by_url.values())
+        unique.sort(key=lambda r: float(r.get("score", 0.0)), reverse=True)
+
+        kept: List[Dict[str, Any]] = []
+        fingerprints: List[int] = []
+        for result in unique:
+            content = result.get("content", "")
+            if not content.strip():
+                kept.append(result)
+                continue
+            fingerprint = simhash(content)
+            if any(hamming_distance(fingerprint, f) <= self.near_duplicate_distance for f in fingerprints):
+                continue
+            fingerprints.append(fingerprint)
+            kept.append(result)
+        return kept
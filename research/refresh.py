@@ -0,0 +1,80 @@
+import re
+import hashlib
+import logging
+from typing import Any, Dict, List, Optional
+
+from .ranking import canonicalize_url
+
+logger = logging.getLogger(__name__)
+
+CITATION_PATTERN = re.compile(r"\[Source (\d+)\]")
+
+
+def content_hash(result: Dict[str, Any]) -> str:
+    """Hash of a source's page text; blob ids already are one"""
+    if result.get("content_id"):
+        return result["content_id"]
+    return hashlib.sha256((result.get("content") or "").encode("utf-8")).hexdigest()
+
+
+def diff_sources(previous: List[Dict[str, Any]], current: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Compare two runs' sources by canonical URL and content hash.
+
+    Returns 0-based positions into current for added and changed sources, the
+    URLs of removed ones, and the fraction of the source set that differs.
+    """
+    before = {canonicalize_url(r["url"]): content_hash(r) for r in previous if r.get("url")}
+    added, changed, seen = [], [], set()
+    for index, result in enumerate(current):
+        if not result.get("url"):
+            continue
+        url = canonicalize_url(result["url"])
+        seen.add(url)
+        if url not in before:
+            added.append(index)
+        elif before[url] != content_hash(result):
+            changed.append(index)
+    removed = [url for url in before if url not in seen]
+    size = max(len(before), len(seen)) or 1
+    return {
+        "added": added,
+        "changed": changed,
+        "removed": removed,
+        "unchanged": len(seen) - len(added) - len(changed),
+        "change_ratio": (len(added) + len(changed) + len(removed)) / size
+    }
+
+
+def is_material(diff: Dict[str, Any], min_change_ratio: float = 0.2) -> bool:
+    """Whether a source diff is worth an LLM call"""
+    if not (diff["added"] or diff["changed"] or diff["removed"]):
+        return False
+    return diff["change_ratio"] >= min_change_ratio
+
+
+def renumber_citations(report: str, previous: List[Dict[str, Any]],
+                       current: List[Dict[str, Any]]) -> str:
+    """Rewrite a prior report's [Source N] citations to the current source numbering.
+
+    Citations of sources that dropped out of the results become [Removed source].
+    """
+    index_by_url = {canonicalize_url(r["url"]): i + 1 for i, r in enumerate(current) if r.get("url")}
+    url_by_id = {i + 1: canonicalize_url(r["url"]) for i, r in enumerate(previous) if r.get("url")}
+
+    def replace(match: re.Match) -> str:
+        new_id = index_by_url.get(url_by_id.get(int(match.group(1)), ""))
+        return f"[Source {new_id}]" if new_id else "[Removed source]"
+
+    return CITATION_PATTERN.sub(replace, report)
+
+
+def summarize_diff(diff: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    if not diff:
+        return {}
+    return {
+        "added": len(diff["added"]),
+        "changed": len(diff["changed"]),
+        "removed": len(diff["removed"]),
+        "unchanged": diff["unchanged"],
+        "material": diff.get("material", False)
+    }
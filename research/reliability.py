@@ -0,0 +1,176 @@
+import os
+import math
+import time
+import tempfile
+import threading
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from .ranking import domain_of
+
+DEFAULT_RELIABILITY_PATH = os.path.join(".cache", "domain_reliability.npz")
+
+
+class DomainReliabilityIndex:
+    """Per-domain history of search scores, persisted as a .npz file.
+
+    Each domain has a row in parallel arrays. The arrays hold a decayed citation
+    weight, decayed sums of score and squared score, a raw citation count and
+    the last update time. Statistics halve in weight every half_life_days, so a
+    domain's standing follows its recent results. Each run is folded in with
+    one vectorized update. A lookup is a dict access plus O(1) arithmetic.
+
+    reliability() shrinks a domain's mean score towards the prior. A domain
+    seen once therefore cannot outrank one with a long good record.
+    """
+
+    def __init__(self, path: str = DEFAULT_RELIABILITY_PATH, half_life_days: float = 30.0,
+                 prior: float = 0.5, prior_weight: float = 2.0):
+        self.logger = logging.getLogger(__name__)
+        self.path = path
+        self.half_life = half_life_days * 86400
+        self.prior = prior
+        self.prior_weight = prior_weight
+        self._lock = threading.Lock()
+
+        self.domains: List[str] = []
+        self.weight = np.zeros(0)
+        self.score_sum = np.zeros(0)
+        self.square_sum = np.zeros(0)
+        self.count = np.zeros(0, dtype=np.int64)
+        self.updated_at = np.zeros(0)
+        if os.path.exists(path):
+            self._load()
+        self._rows = {domain: row for row, domain in enumerate(self.domains)}
+
+    def _load(self) -> None:
+        try:
+            with np.load(self.path, allow_pickle=False) as data:
+                self.domains = [str(d) for d in data["domains"]]
+                self.weight = data["weight"].astype(float)
+                self.score_sum = data["score_sum"].astype(float)
+                self.square_sum = data["square_sum"].astype(float)
+                self.count = data["count"].astype(np.int64)
+                self.updated_at = data["updated_at"].astype(float)
+        except Exception as e:
+            # A corrupt or foreign file is rebuilt from the next runs
+            self.logger.warning(f"Could not load reliability index {self.path}: {str(e)}")
+            self.domains = []
+
+    def save(self) -> None:
+        """Write the index atomically"""
+        with self._lock:
+            arrays = {
+                "domains": np.array(self.domains, dtype=str),
+                "weight": self.weight,
+                "score_sum": self.score_sum,
+                "square_sum": self.square_sum,
+                "count": self.count,
+                "updated_at": self.updated_at
+            }
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".npz")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, **arrays)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def _decay(self, elapsed: Any) -> Any:
+        return np.power(0.5, np.maximum(elapsed, 0) / self.half_life)
+
+    def update(self, results: Iterable[Dict[str, Any]], now: Optional[float] = None) -> int:
+        """Fold one run's scored results into the index; returns the domains touched"""
+        now = time.time() if now is None else now
+        pairs = [(domain_of(r.get("url", "")), float(r.get("score", 0.0))) for r in results]
+        pairs = [(domain, score) for domain, score in pairs if domain]
+        if not pairs:
+            return 0
+
+        names, inverse = np.unique([domain for domain, _ in pairs], return_inverse=True)
+        scores = np.array([score for _, score in pairs])
+        counts = np.bincount(inverse, minlength=len(names))
+        sums = np.bincount(inverse, weights=scores, minlength=len(names))
+        squares = np.bincount(inverse, weights=scores * scores, minlength=len(names))
+
+        with self._lock:
+            new = [str(name) for name in names if name not in self._rows]
+            if new:
+                pad = len(new)
+                self.weight = np.concatenate([self.weight, np.zeros(pad)])
+                self.score_sum = np.concatenate([self.score_sum, np.zeros(pad)])
+                self.square_sum = np.concatenate([self.square_sum, np.zeros(pad)])
+                self.count = np.concatenate([self.count, np.zeros(pad, dtype=np.int64)])
+                self.updated_at = np.concatenate([self.updated_at, np.full(pad, now)])
+                # Register rows only once the arrays have room, for lock-free readers
+                for name in new:
+                    self._rows[name] = len(self.domains)
+                    self.domains.append(name)
+
+            rows = np.array([self._rows[str(name)] for name in names])
+            decay = self._decay(now - self.updated_at[rows])
+            self.weight[rows] = self.weight[rows] * decay + counts
+            self.score_sum[rows] = self.score_sum[rows] * decay + sums
+            self.square_sum[rows] = self.square_sum[rows] * decay + squares
+            self.count[rows] += counts
+            self.updated_at[rows] = now
+        return len(names)
+
+    def stats(self, domain: str, now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Decayed weight, mean and variance of a domain's scores, or None if unseen"""
+        row = self._rows.get(domain)
+        if row is None:
+            return None
+        now = time.time() if now is None else now
+        weight = float(self.weight[row])
+        mean = float(self.score_sum[row]) / weight if weight else 0.0
+        variance = max(float(self.square_sum[row]) / weight - mean * mean, 0.0) if weight else 0.0
+        return {
+            "domain": domain,
+            "weight": weight * math.pow(0.5, max(now - float(self.updated_at[row]), 0) / self.half_life),
+            "mean": mean,
+            "variance": variance,
+            "count": int(self.count[row]),
+            "updated_at": float(self.updated_at[row])
+        }
+
+    def reliability(self, domain: str, now: Optional[float] = None) -> float:
+        """Mean score shrunk towards the prior by the domain's (decayed) evidence"""
+        stats = self.stats(domain, now)
+        if stats is None:
+            return self.prior
+        return (stats["mean"] * stats["weight"] + self.prior * self.prior_weight) / (stats["weight"] + self.prior_weight)
+
+    def annotate(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Copies of results with domain_reliability/domain_count for domains seen before"""
+        annotated = []
+        for result in results:
+            stats = self.stats(domain_of(result.get("url", "")))
+            if stats is not None:
+                result = {**result, "domain_reliability": round(self.reliability(stats["domain"]), 4),
+                          "domain_count": stats["count"]}
+            annotated.append(result)
+        return annotated
+
+    def low_value_domains(self, max_reliability: float = 0.35, min_count: int = 5,
+                          limit: int = 50, now: Optional[float] = None) -> List[str]:
+        """Well-sampled domains whose reliability is below max_reliability, worst first"""
+        with self._lock:
+            if not self.domains:
+                return []
+            now = time.time() if now is None else now
+            weight = self.weight * self._decay(now - self.updated_at)
+            mean = np.divide(self.score_sum, self.weight, out=np.zeros_like(self.score_sum),
+                             where=self.weight > 0)
+            reliability = (mean * weight + self.prior * self.prior_weight) / (weight + self.prior_weight)
+            candidates = np.flatnonzero((self.count >= min_count) & (reliability < max_reliability))
+            worst = candidates[np.argsort(reliability[candidates])][:limit]
+            return [self.domains[row] for row in worst]
+
+    def __len__(self) -> int:
+        return len(self.domains)
@@ -1,67 +1,79 @@
 import os
+import asyncio
+import contextvars
 from tavily import TavilyClient
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Sequence, Tuple
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain.agents import AgentExecutor, create_tool_calling_agent
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.tools import tool
 import logging
+from .cache import ResultCache
+from .blobstore import BlobStore
+from .query_expansion import QueryExpander
+from .limits import STAGE_LIMITS
+from .resilience import GuardedChatModel, GuardedTavilyClient, get_guard
+from .search_providers import SearchProvider
+from .metrics import span, usage_callback
+
+# "agent": the LLM decides when to call web_search; "direct": search every planned variation
+RESEARCH_MODES = ("agent", "direct")
+
+SEARCH_PARAMS = {
+    "search_depth": "advanced",
+    "include_raw_content": True,
+    "max_results": 5,
+    "include_answer": True
+}
+
+# Snippet length kept in graph state; full page text lives in the blob store
+SNIPPET_CHARS = 1000
+
+# Set for refresh runs: search results are re-fetched, then written back to the cache
+_fresh_search = contextvars.ContextVar("fresh_search", default=False)
+# Domains Tavily should not return for this run (e.g. ones with a poor track record)
+_excluded_domains: contextvars.ContextVar[Tuple[str, ...]] = contextvars.ContextVar("excluded_domains", default=())
 
 class ResearchAgent:
-    def __init__(self, model="gemini-1.5-pro-latest", temperature=0.7):
+    def __init__(self, model="gemini-1.5-pro-latest", temperature=0.7,
+                 cache: Optional[ResultCache] = None, llm: Optional[Any] = None,
+                 tavily: Optional[Any] = None, max_variations: int = 3,
+                 max_concurrency: int = 4, search_timeout: float = 90.0, mode: str = "agent",
+                 blob_store: Optional[BlobStore] = None, search: Optional[Any] = None):
         self.logger = logging.getLogger(__name__)
+        self.blob_store = blob_store
+        if mode not in RESEARCH_MODES:
+            raise ValueError(f"Unknown research mode '{mode}', expected one of {RESEARCH_MODES}")
+        self.mode = mode
+        self.cache = cache
+        self.expander = QueryExpander()
+        self.max_variations = max_variations
+        self.max_concurrency = max_concurrency
+        self.search_timeout = search_timeout
         
-        # Verify API keys
-        if not os.getenv("TAVILY_API_KEY"):
+        # Verify API keys for any client we have to build ourselves
+        if tavily is None and not os.getenv("TAVILY_API_KEY"):
             raise ValueError("TAVILY_API_KEY environment variable not set")
-        if not os.getenv("GOOGLE_API_KEY"):
+        if llm is None and not os.getenv("GOOGLE_API_KEY"):
             raise ValueError("GOOGLE_API_KEY environment variable not set")
         
-        self.llm = ChatGoogleGenerativeAI(
+        self.llm = llm or ChatGoogleGenerativeAI(
             model=model,
             temperature=temperature,
             google_api_key=os.getenv("GOOGLE_API_KEY")
         )
-        self.tavily = TavilyClient(api_key=os.getenv("TAVILY_API_KEY"))
+        self.tavily = tavily or GuardedTavilyClient(
+            TavilyClient(api_key=os.getenv("TAVILY_API_KEY")), get_guard("tavily")
+        )
+        # Anything with SearchProvider's interface, e.g. a HedgedSearch racing several
+        self.search_provider = search or SearchProvider("tavily", self.tavily)
+        self.llm_guard = get_guard("gemini")
         
         @tool
-        def web_search(query: str, is_retry: bool = False) -> List[Dict[str, Any]]:
+        async def web_search(query: str, is_retry: bool = False) -> List[Dict[str, Any]]:
             """Perform comprehensive web search using Tavily API"""
-            try:
-                self.logger.info(f"Executing {'retry ' if is_retry else ''}search for: {query}")
-                response = self.tavily.search(
-                    query=query,
-                    search_depth="advanced",
-                    include_raw_content=True,
-                    max_results=5,
-                    include_answer=True
-                )
-                
-                # Structure results
-                structured_results = []
-                for item in response.get('results', []):
-                    structured_results.append({
-                        "content": item.get('content', ''),
-                        "url": item.get('url', ''),
-                        "title": item.get('title', 'No title')[:100],
-                        "score": float(item.get('score', 0.0)),
-                        "query_used": query
-                    })
-                
-                # Include direct answer if available
-                if response.get('answer'):
-                    structured_results.append({
-                        "content": response['answer'],
-                        "url": "",
-                        "title": "Direct Answer",
-                        "score": 1.0,
-                        "query_used": query
-                    })
-                
-                return structured_results
-            except Exception as e:
-                self.logger.error(f"Search failed: {str(e)}")
-                return []
+            self.logger.info(f"Executing {'retry ' if is_retry else ''}search for: {query}")
+            return await self._search(query)
 
         self.tools = [web_search]
         
@@ -74,7 +86,7 @@ class ResearchAgent:
             ("placeholder", "{agent_scratchpad}"),
         ])
         
-        self.agent = create_tool_calling_agent(self.llm, self.tools, prompt)
+        self.agent = create_tool_calling_agent(GuardedChatModel(self.llm, self.llm_guard), self.tools, prompt)
         self.agent_executor = AgentExecutor(
             agent=self.agent,
             tools=self.tools,
@@ -83,44 +95,51 @@ class ResearchAgent:
             return_intermediate_steps=True
         )
 
-    async def run(self, query: str, user_id: str = "default") -> List[Dict[str, Any]]:
-        """Execute research with spelling flexibility"""
+    async def run(self, query: str, user_id: str = "default", mode: Optional[str] = None,
+                  fresh: bool = False, exclude_domains: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """Execute research over the query and its variations concurrently.
+
+        mode overrides the agent's default for this request: "agent" routes the query
+        through the tool-calling LLM loop once and searches the other variations
+        directly alongside it, "direct" searches every locally planned variation
+        without any LLM round-trip. fresh bypasses cached
+        search results. exclude_domains are left out by Tavily, so their pages are
+        never fetched.
+        """
+        fresh_token = _fresh_search.set(fresh)
+        excluded_token = _excluded_domains.set(tuple(sorted(exclude_domains or ())))
         try:
-            self.logger.info(f"Starting research for: {query}")
+            mode = mode or self.mode
+            if mode not in RESEARCH_MODES:
+                raise ValueError(f"Unknown research mode '{mode}', expected one of {RESEARCH_MODES}")
+            self.logger.info(f"Starting {mode} research for: {query}")
             research_results = []
             
-            # First attempt - exact query
-            result = await self.agent_executor.ainvoke({
-                "input": query,
-                "is_retry": False
-            })
+            variations = self.expander.expand(query, self.max_variations)
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            # Only the first variation pays for an agent loop; the rest are plain searches
+            first = self._search_variation if mode == "direct" else self._research_variation
+            tasks = [
+                (first if i == 0 else self._search_variation)(variation, i > 0, semaphore)
+                for i, variation in enumerate(variations)
+            ]
             
-            # Extract results
-            for step in result.get('intermediate_steps', []):
-                if isinstance(step[1], list):
-                    research_results.extend(step[1])
+            # Merge results as each variation completes
+            answered = []
+            for completed in asyncio.as_completed(tasks):
+                variation, results = await completed
+                if results:
+                    answered.append(variation)
+                    research_results.extend(results)
             
-            # Second attempt - try corrected spelling if no results and contains "travily"
-            if not research_results and "travily" in query.lower():
-                corrected_query = query.lower().replace("travily", "tavily")
-                self.logger.info(f"Trying corrected query: {corrected_query}")
-                result = await self.agent_executor.ainvoke({
-                    "input": corrected_query,
-                    "is_retry": True
+            if research_results and query not in answered:
+                research_results.append({
+                    "content": f"Note: Original query was '{query}'. Showing results for {', '.join(repr(v) for v in answered)}",
+                    "url": "",
+                    "title": "Search Note",
+                    "score": 0.5,
+                    "query_used": answered[0]
                 })
-                
-                for step in result.get('intermediate_steps', []):
-                    if isinstance(step[1], list):
-                        research_results.extend(step[1])
-                
-                if research_results:
-                    research_results.append({
-                        "content": f"Note: Original query was '{query}'. Showing results for '{corrected_query}'",
-                        "url": "",
-                        "title": "Search Note",
-                        "score": 0.5,
-                        "query_used": corrected_query
-                    })
             
             if not research_results:
                 self.logger.warning("No research results found")
@@ -132,3 +151,117 @@ class ResearchAgent:
         except Exception as e:
             self.logger.error(f"Research failed: {str(e)}", exc_info=True)
             return []
+        finally:
+            _fresh_search.reset(fresh_token)
+            _excluded_domains.reset(excluded_token)
+
+    async def _research_variation(self, variation: str, is_retry: bool,
+                                  semaphore: asyncio.Semaphore) -> Tuple[str, List[Dict[str, Any]]]:
+        """Research a single query variation under the concurrency limit and timeout"""
+        async with semaphore:
+            try:
+                with span("llm.research_agent", variation=variation) as s:
+                    # Each model call inside the loop is rate limited and retried by the guard
+                    result = await asyncio.wait_for(
+                        self.agent_executor.ainvoke(
+                            {"input": variation, "is_retry": is_retry},
+                            config={"callbacks": [usage_callback(s)]}
+                        ),
+                        timeout=self.search_timeout
+                    )
+            except asyncio.TimeoutError:
+                self.logger.warning(f"Research timed out after {self.search_timeout}s for: {variation}")
+                return variation, []
+            except Exception as e:
+                self.logger.error(f"Research failed for variation '{variation}': {str(e)}")
+                return variation, []
+        
+        results = []
+        for step in result.get('intermediate_steps', []):
+            if isinstance(step[1], list):
+                results.extend(step[1])
+        return variation, results
+
+    async def _search_variation(self, variation: str, is_retry: bool,
+                                semaphore: asyncio.Semaphore) -> Tuple[str, List[Dict[str, Any]]]:
+        """Search a single query variation directly, skipping the agent loop"""
+        async with semaphore:
+            try:
+                results = await asyncio.wait_for(self._search(variation), timeout=self.search_timeout)
+            except asyncio.TimeoutError:
+                self.logger.warning(f"Search timed out after {self.search_timeout}s for: {variation}")
+                return variation, []
+        return variation, results
+
+    async def _search(self, query: str) -> List[Dict[str, Any]]:
+        """Run a Tavily search, serving repeated queries from the result cache"""
+        with span("tool.web_search", query=query) as s:
+            try:
+                params = dict(SEARCH_PARAMS)
+                if _excluded_domains.get():
+                    params["exclude_domains"] = list(_excluded_domains.get())
+                key = ResultCache.key_for(query, **params) if self.cache else None
+                if key and not _fresh_search.get():
+                    # A hedged search accepts any of its providers' answers, so a cached
+                    # win by a cheaper provider (e.g. basic depth) serves it too
+                    # SQLite reads (and their last_access writes) stay off the event loop
+                    cached = await asyncio.to_thread(self.cache.get_first, [key] + [
+                        ResultCache.key_for(query, **used)
+                        for used in self.search_provider.accepted_params(params) if used != params
+                    ])
+                    s.set(cache_hit=cached is not None)
+                    if cached is not None:
+                        self.logger.info(f"Search cache hit for: {query}")
+                        s.set(results=len(cached))
+                        return cached
+
+                async with STAGE_LIMITS.slot("search"):
+                    response = await self.search_provider.search(query, **params)
+                provider = response.get('provider')
+                s.set(provider=provider, raw_bytes=sum(
+                    len(item.get('raw_content') or '') + len(item.get('content') or '')
+                    for item in response.get('results', [])
+                ))
+
+                # Structure results, spilling raw page text to the blob store
+                structured_results = []
+                for item in response.get('results', []):
+                    result = {
+                        "content": (item.get('content') or '')[:SNIPPET_CHARS],
+                        "url": item.get('url', ''),
+                        "title": item.get('title', 'No title')[:100],
+                        "score": float(item.get('score', 0.0)),
+                        "query_used": query
+                    }
+                    raw_content = item.get('raw_content')
+                    if raw_content and self.blob_store:
+                        result["content_id"] = await asyncio.to_thread(self.blob_store.put, raw_content)
+                    structured_results.append(result)
+
+                # Include direct answer if available
+                if response.get('answer'):
+                    structured_results.append({
+                        "content": response['answer'],
+                        "url": "",
+                        "title": "Direct Answer",
+                        "score": 1.0,
+                        "query_used": query
+                    })
+
+                # Only ids and snippets outlive this call; drop the full payload now
+                del response
+
+                if key and structured_results:
+                    # A hedge win with cheaper settings (e.g. basic depth) must not be
+                    # served later as the answer to the caller's parameters
+                    used = self.search_provider.params_for(provider, params)
+                    await asyncio.to_thread(
+                        self.cache.set, key if used == params else ResultCache.key_for(query, **used),
+                        structured_results
+                    )
+                s.set(results=len(structured_results))
+                return structured_results
+            except Exception as e:
+                self.logger.error(f"Search failed: {str(e)}")
+                s.error = str(e)
+                return []
@@ -0,0 +1,347 @@
+import os
+import time
+import random
+import asyncio
+import threading
+import logging
+import email.utils
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+
+from .limits import STAGE_LIMITS
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+
+# Provider exceptions that carry no status code but map onto one
+STATUS_BY_EXCEPTION = {
+    "UsageLimitExceededError": 429,   # tavily
+    "ResourceExhausted": 429,         # google.api_core
+    "TooManyRequests": 429,
+    "InternalServerError": 500,
+    "ServiceUnavailable": 503,
+    "DeadlineExceeded": 504,
+}
+NETWORK_EXCEPTIONS = ("Timeout", "TimeoutError", "ConnectionError", "ConnectTimeout",
+                      "ReadTimeout", "WriteTimeout", "PoolTimeout", "TimeoutException",
+                      "RemoteDisconnected", "RemoteProtocolError", "ConnectError", "ReadError")
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a provider whose circuit breaker is open"""
+
+
+def error_status(exc: BaseException) -> Optional[int]:
+    """Best-effort HTTP status of a provider exception"""
+    for candidate in (getattr(exc, "status_code", None), getattr(exc, "code", None),
+                      getattr(getattr(exc, "response", None), "status_code", None)):
+        try:
+            if candidate is not None and 100 <= int(candidate) < 600:
+                return int(candidate)
+        except (TypeError, ValueError):
+            continue
+    for cls in type(exc).__mro__:
+        if cls.__name__ in STATUS_BY_EXCEPTION:
+            return STATUS_BY_EXCEPTION[cls.__name__]
+    cause = exc.__cause__ or exc.__context__
+    return error_status(cause) if cause is not None and cause is not exc else None
+
+
+def retry_after(exc: BaseException) -> Optional[float]:
+    """Seconds the provider asked us to wait, from a Retry-After header if present"""
+    value = getattr(exc, "retry_after", None)
+    if value is None:
+        headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+        value = headers.get("Retry-After") or headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        parsed = email.utils.parsedate_to_datetime(str(value)) if value else None
+        return max(0.0, parsed.timestamp() - time.time()) if parsed else None
+
+
+def is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, (CircuitOpenError, asyncio.CancelledError)):
+        return False
+    if isinstance(exc, asyncio.TimeoutError):
+        return True
+    status = error_status(exc)
+    if status is not None:
+        return status in RETRYABLE_STATUS
+    return any(cls.__name__ in NETWORK_EXCEPTIONS for cls in type(exc).__mro__)
+
+
+class TokenBucket:
+    """Thread-safe token bucket; callers that exceed the rate wait their turn"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Take a token, going into debt if necessary; return how long to wait"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def acquire(self) -> None:
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self) -> None:
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter that honors Retry-After"""
+
+    def __init__(self, max_attempts: int = 4, base_delay: float = 0.5, max_delay: float = 30.0):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt: int, exc: Optional[BaseException] = None) -> float:
+        backoff = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        requested = retry_after(exc) if exc is not None else None
+        if requested is not None:
+            return min(self.max_delay, max(requested, backoff))
+        return backoff
+
+
+class CircuitBreaker:
+    """Stop calling a provider after repeated failures, probing again after a cool-down.
+
+    Once the cool-down has passed, exactly one caller is let through as a probe;
+    the others are refused until it records a success or failure (or releases it).
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "open" or self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def release(self) -> None:
+        """End a probe that proved nothing either way (e.g. a 400 or a cancellation)"""
+        with self._lock:
+            self._probing = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._probing = False
+            self.failures += 1
+            if self.failures >= self.failure_threshold or self.opened_at is not None:
+                # Trip (or re-trip after a failed half-open probe)
+                self.opened_at = time.monotonic()
+
+
+class ProviderGuard:
+    """Rate limiting, retries and circuit breaking for one upstream provider.
+
+    With a stage, each awaited attempt also holds one of that stage's
+    STAGE_LIMITS slots, so e.g. --llm-concurrency bounds every model call.
+    """
+
+    def __init__(self, name: str, rate: float = 5.0, capacity: Optional[float] = None,
+                 policy: Optional[RetryPolicy] = None, breaker: Optional[CircuitBreaker] = None,
+                 stage: Optional[str] = None):
+        self.logger = logging.getLogger(__name__)
+        self.name = name
+        self.stage = stage
+        self.bucket = TokenBucket(rate, capacity)
+        self.policy = policy or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+
+    def _check_circuit(self) -> None:
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"{self.name} circuit open after {self.breaker.failures} failures")
+
+    def _should_retry(self, exc: BaseException, attempt: int) -> bool:
+        retryable = is_retryable(exc)
+        if retryable:
+            self.breaker.record_failure()
+        else:
+            self.breaker.release()
+        if not retryable or attempt + 1 >= self.policy.max_attempts:
+            return False
+        self.logger.warning(f"{self.name} call failed (status={error_status(exc)}), "
+                            f"retry {attempt + 1}/{self.policy.max_attempts - 1}: {str(exc)}")
+        return True
+
+    def call(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Call a blocking provider function with rate limiting and retries"""
+        for attempt in range(self.policy.max_attempts):
+            self._check_circuit()
+            self.bucket.acquire()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                if not self._should_retry(e, attempt):
+                    raise
+                time.sleep(self.policy.delay(attempt, e))
+                continue
+            except BaseException:
+                self.breaker.release()
+                raise
+            self.breaker.record_success()
+            return result
+
+    async def acall(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Await a provider coroutine function with rate limiting and retries"""
+        for attempt in range(self.policy.max_attempts):
+            self._check_circuit()
+            await self.bucket.acquire_async()
+            try:
+                async with STAGE_LIMITS.slot(self.stage):
+                    result = await fn(*args, **kwargs)
+            except Exception as e:
+                if not self._should_retry(e, attempt):
+                    raise
+                await asyncio.sleep(self.policy.delay(attempt, e))
+                continue
+            except BaseException:
+                self.breaker.release()
+                raise
+            self.breaker.record_success()
+            return result
+
+    async def astream(self, factory: Callable[[], AsyncIterator[Any]]) -> AsyncIterator[Any]:
+        """Stream from a provider, retrying only while nothing has been yielded yet"""
+        for attempt in range(self.policy.max_attempts):
+            self._check_circuit()
+            await self.bucket.acquire_async()
+            started = False
+            try:
+                async with STAGE_LIMITS.slot(self.stage):
+                    async for item in factory():
+                        started = True
+                        yield item
+            except Exception as e:
+                if started or not self._should_retry(e, attempt):
+                    raise
+                await asyncio.sleep(self.policy.delay(attempt, e))
+                continue
+            except BaseException:
+                self.breaker.release()
+                raise
+            self.breaker.record_success()
+            return
+
+
+class GuardedTavilyClient:
+    """TavilyClient wrapper whose search calls go through a ProviderGuard"""
+
+    def __init__(self, client: Any, guard: "ProviderGuard"):
+        self.client = client
+        self.guard = guard
+
+    def search(self, **kwargs: Any) -> Dict[str, Any]:
+        return self.guard.call(self.client.search, **kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.client, name)
+
+
+class GuardedAsyncSearchClient:
+    """Async search client wrapper whose awaited search calls go through a ProviderGuard"""
+
+    def __init__(self, client: Any, guard: "ProviderGuard"):
+        self.client = client
+        self.guard = guard
+
+    async def search(self, **kwargs: Any) -> Dict[str, Any]:
+        return await self.guard.acall(self.client.search, **kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.client, name)
+
+
+class GuardedChatModel:
+    """Chat model proxy for tool-calling agents: every model call goes through a ProviderGuard.
+
+    create_tool_calling_agent only needs bind_tools(); the tool-bound model it gets
+    back is wrapped so each LLM round-trip of the agent loop takes a token and is
+    retried on its own, rather than the whole loop being charged and retried once.
+    """
+
+    def __init__(self, model: Any, guard: "ProviderGuard"):
+        self.model = model
+        self.guard = guard
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> Any:
+        from langchain_core.runnables import RunnableLambda
+        bound = self.model.bind_tools(tools, **kwargs)
+
+        def invoke(inputs: Any, config: Any) -> Any:
+            return self.guard.call(bound.invoke, inputs, config=config)
+
+        async def ainvoke(inputs: Any, config: Any) -> Any:
+            return await self.guard.acall(bound.ainvoke, inputs, config=config)
+
+        return RunnableLambda(invoke, afunc=ainvoke, name="guarded_chat_model")
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.model, name)
+
+
+# Default requests-per-second budgets, overridable per provider via environment
+DEFAULT_RATES = {"tavily": 5.0, "gemini": 2.0}
+# STAGE_LIMITS stage whose slots a provider's calls take; searches take theirs per
+# (possibly hedged) search in ResearchAgent instead
+GUARD_STAGES = {"gemini": "llm"}
+
+_guards: Dict[str, ProviderGuard] = {}
+_guards_lock = threading.Lock()
+
+
+def get_guard(provider: str) -> ProviderGuard:
+    """Process-wide guard for a provider, so all agents share its rate budget"""
+    with _guards_lock:
+        guard = _guards.get(provider)
+        if guard is None:
+            rate = float(os.getenv(f"{provider.upper()}_RATE_PER_SEC", DEFAULT_RATES.get(provider, 5.0)))
+            guard = ProviderGuard(
+                provider,
+                rate=rate,
+                policy=RetryPolicy(max_attempts=int(os.getenv(f"{provider.upper()}_MAX_ATTEMPTS", "4"))),
+                stage=GUARD_STAGES.get(provider)
+            )
+            _guards[provider] = guard
+        return guard
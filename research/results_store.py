@@ -0,0 +1,221 @@
+import os
+import csv
+import json
+import time
+import sqlite3
+import threading
+import logging
+from datetime import date, datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+
+from .cache import ResultCache
+
+DEFAULT_RESULTS_DIR = os.path.join("research_outputs", "results")
+
+# One row per source per run; also the column order of CSV/Parquet exports
+ROW_FIELDS = ("run_id", "created_at", "query", "rank", "url", "title", "score", "query_used",
+              "research_s", "draft_s", "total_s")
+
+DateLike = Union[str, date, datetime, None]
+
+
+def _day(value: DateLike) -> Optional[str]:
+    """YYYY-MM-DD for a date, datetime or ISO string"""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.astimezone(timezone.utc).date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value)[:10]
+
+
+class ResultsStore:
+    """Append-only history of research results for analysis.
+
+    Rows are written as compact JSON lines into one segment file per UTC day, and
+    each run's rows go in a single contiguous write. A SQLite index records where
+    each run's block starts and ends, keyed by normalized query and day. A query
+    filter therefore reads only the matching blocks, and a date filter opens only
+    the segments in range.
+    """
+
+    def __init__(self, root: str = DEFAULT_RESULTS_DIR):
+        self.logger = logging.getLogger(__name__)
+        self.root = root
+        self._lock = threading.Lock()
+
+        os.makedirs(root, exist_ok=True)
+        self._conn = sqlite3.connect(os.path.join(root, "index.sqlite"), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS runs (
+                   run_id TEXT NOT NULL,
+                   query_key TEXT NOT NULL,
+                   day TEXT NOT NULL,
+                   offset INTEGER NOT NULL,
+                   length INTEGER NOT NULL,
+                   rows INTEGER NOT NULL
+               )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_runs_query ON runs(query_key, day)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_runs_day ON runs(day)")
+        self._conn.commit()
+
+    def _segment(self, day: str) -> str:
+        return os.path.join(self.root, f"{day}.jsonl")
+
+    @staticmethod
+    def run_rows(run_id: str, query: str, sources: List[Dict[str, Any]],
+                 timings: Optional[Dict[str, float]] = None,
+                 created_at: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Rows for one run's ranked sources (as in report["sources"])"""
+        stamp = datetime.fromtimestamp(created_at or time.time(), timezone.utc).isoformat(timespec="seconds")
+        timings = timings or {}
+        return [
+            {
+                "run_id": run_id,
+                "created_at": stamp,
+                "query": query,
+                "rank": source.get("id", rank),
+                "url": source.get("url", ""),
+                "title": source.get("title", ""),
+                "score": source.get("score"),
+                "query_used": source.get("query_used"),
+                "research_s": timings.get("research"),
+                "draft_s": timings.get("draft"),
+                "total_s": timings.get("total")
+            }
+            for rank, source in enumerate(sources, start=1)
+        ]
+
+    def append(self, rows: Iterable[Dict[str, Any]]) -> int:
+        """Bulk-append rows; each run's rows are written as one block per day segment"""
+        blocks: Dict[tuple, List[str]] = {}
+        for row in rows:
+            key = (row["run_id"], ResultCache.normalize_query(row["query"]), _day(row["created_at"]))
+            blocks.setdefault(key, []).append(json.dumps(row, separators=(",", ":"), default=str))
+        if not blocks:
+            return 0
+
+        entries = []
+        with self._lock:
+            for (run_id, query_key, day), lines in blocks.items():
+                data = ("\n".join(lines) + "\n").encode("utf-8")
+                with open(self._segment(day), "ab") as f:
+                    offset = f.seek(0, os.SEEK_END)
+                    f.write(data)
+                entries.append((run_id, query_key, day, offset, len(data), len(lines)))
+            self._conn.executemany(
+                "INSERT INTO runs (run_id, query_key, day, offset, length, rows) VALUES (?, ?, ?, ?, ?, ?)",
+                entries
+            )
+            self._conn.commit()
+        return sum(entry[-1] for entry in entries)
+
+    def record_run(self, run_id: str, query: str, sources: List[Dict[str, Any]],
+                   timings: Optional[Dict[str, float]] = None) -> int:
+        return self.append(self.run_rows(run_id, query, sources, timings))
+
+    def rows(self, query: Optional[str] = None, since: DateLike = None, until: DateLike = None,
+             contains: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Stream rows, optionally filtered.
+
+        query matches the normalized query exactly and uses the index. since and
+        until are inclusive dates (or datetimes, compared against created_at).
+        contains is a case-insensitive substring filter applied while reading.
+        """
+        sql = "SELECT day, offset, length FROM runs WHERE 1 = 1"
+        params: List[Any] = []
+        if query is not None:
+            sql += " AND query_key = ?"
+            params.append(ResultCache.normalize_query(query))
+        if since is not None:
+            sql += " AND day >= ?"
+            params.append(_day(since))
+        if until is not None:
+            sql += " AND day <= ?"
+            params.append(_day(until))
+        with self._lock:
+            blocks = self._conn.execute(sql + " ORDER BY day, offset", params).fetchall()
+
+        # Datetime bounds narrow within a day; plain dates are whole days
+        start = since.astimezone(timezone.utc).isoformat() if isinstance(since, datetime) else None
+        end = until.astimezone(timezone.utc).isoformat() if isinstance(until, datetime) else None
+        needle = contains.lower() if contains else None
+        current_day, f = None, None
+        try:
+            for day, offset, length in blocks:
+                if day != current_day:
+                    if f is not None:
+                        f.close()
+                    f = open(self._segment(day), "rb")
+                    current_day = day
+                f.seek(offset)
+                for line in f.read(length).splitlines():
+                    row = json.loads(line)
+                    if (start and row["created_at"] < start) or (end and row["created_at"] > end):
+                        continue
+                    if needle and needle not in row["query"].lower():
+                        continue
+                    yield row
+        finally:
+            if f is not None:
+                f.close()
+
+    def export_csv(self, path: str, **filters: Any) -> int:
+        """Stream matching rows into a CSV file; returns the row count"""
+        count = 0
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=ROW_FIELDS, extrasaction="ignore")
+            writer.writeheader()
+            for row in self.rows(**filters):
+                writer.writerow(row)
+                count += 1
+        self.logger.info(f"Exported {count} rows to {path}")
+        return count
+
+    def export_parquet(self, path: str, batch_size: int = 10_000, **filters: Any) -> int:
+        """Stream matching rows into a Parquet file in batches; needs the optional pyarrow package"""
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Parquet export requires pyarrow (pip install pyarrow)")
+        schema = pa.schema([
+            ("run_id", pa.string()), ("created_at", pa.string()), ("query", pa.string()),
+            ("rank", pa.int64()), ("url", pa.string()), ("title", pa.string()),
+            ("score", pa.float64()), ("query_used", pa.string()), ("research_s", pa.float64()),
+            ("draft_s", pa.float64()), ("total_s", pa.float64())
+        ])
+        count = 0
+        batch: List[Dict[str, Any]] = []
+        with pq.ParquetWriter(path, schema) as writer:
+            for row in self.rows(**filters):
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                    count += len(batch)
+                    batch = []
+            if batch:
+                writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                count += len(batch)
+        self.logger.info(f"Exported {count} rows to {path}")
+        return count
+
+    def export(self, path: str, **filters: Any) -> int:
+        """Export to CSV or Parquet, chosen by the file extension"""
+        if path.endswith(".parquet"):
+            return self.export_parquet(path, **filters)
+        return self.export_csv(path, **filters)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            runs, rows, first, last = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(rows), 0), MIN(day), MAX(day) FROM runs"
+            ).fetchone()
+        return {"runs": runs, "rows": rows, "first_day": first, "last_day": last}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,65 @@
+import os
+import asyncio
+import logging
+from typing import Any, Dict, Optional
+
+import httpx
+
+TAVILY_API_URL = "https://api.tavily.com"
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class AsyncTavilySearchClient:
+    """Native asyncio Tavily client over a pooled keep-alive HTTP/2 connection.
+
+    Drop-in for TavilyClient.search inside async code: the call is awaited on the
+    event loop instead of blocking it or occupying an executor thread.
+    """
+
+    def __init__(self, api_key: Optional[str] = None, base_url: str = TAVILY_API_URL,
+                 timeout: float = 60.0, connect_timeout: float = 10.0,
+                 max_connections: int = 32, max_keepalive: int = 16, http2: Optional[bool] = None):
+        self.logger = logging.getLogger(__name__)
+        self.api_key = api_key or os.getenv("TAVILY_API_KEY")
+        if not self.api_key:
+            raise ValueError("TAVILY_API_KEY environment variable not set")
+        self.base_url = base_url.rstrip("/")
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.limits = httpx.Limits(max_connections=max_connections,
+                                   max_keepalive_connections=max_keepalive)
+        self.http2 = _http2_available() if http2 is None else http2
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        # Connection pools belong to one event loop; batch/bench runs may start several
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                http2=self.http2,
+                timeout=self.timeout,
+                limits=self.limits,
+                headers={"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"}
+            )
+            self._loop = loop
+        return self._client
+
+    async def search(self, query: str, **params: Any) -> Dict[str, Any]:
+        """POST /search; raises httpx.HTTPStatusError on non-2xx responses"""
+        payload = {"query": query, **{k: v for k, v in params.items() if v is not None}}
+        response = await self._get_client().post("/search", json=payload)
+        response.raise_for_status()
+        return response.json()
+
+    async def aclose(self) -> None:
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
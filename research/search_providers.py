@@ -0,0 +1,210 @@
+import asyncio
+import inspect
+import threading
+import logging
+from collections import deque
+from typing import Any, Dict, List, Optional, Sequence
+
+from .metrics import METRICS
+
+# Primary-response samples needed before the adaptive hedge delay replaces initial_delay
+MIN_LATENCY_SAMPLES = 20
+
+
+class SearchProvider:
+    """One way of answering a web search: a Tavily-compatible client plus fixed parameters.
+
+    overrides replace the caller's search parameters, so the same client can serve
+    both an "advanced" and a cheaper "basic" provider. Blocking clients run in a
+    worker thread. A cancelled call stops waiting at once, but the thread still
+    finishes in the background.
+    """
+
+    def __init__(self, name: str, client: Any, **overrides: Any):
+        self.name = name
+        self.client = client
+        self.overrides = overrides
+
+    def params_for(self, provider: Optional[str], params: Dict[str, Any]) -> Dict[str, Any]:
+        """Parameters this provider actually searched with, given the caller's"""
+        return {**params, **self.overrides}
+
+    def accepted_params(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Parameter sets whose responses this search would return for the caller's"""
+        return [self.params_for(self.name, params)]
+
+    async def search(self, query: str, **params: Any) -> Dict[str, Any]:
+        params = self.params_for(self.name, params)
+        if inspect.iscoroutinefunction(self.client.search):
+            response = await self.client.search(query=query, **params)
+        else:
+            response = await asyncio.to_thread(self.client.search, query=query, **params)
+        return {**response, "provider": self.name}
+
+
+class LatencyTracker:
+    """Rolling window of response times, for percentile-based hedge delays"""
+
+    def __init__(self, window: int = 200):
+        self._samples: deque = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """pct-th percentile of the window, or None while it is too small to trust"""
+        with self._lock:
+            samples = sorted(self._samples)
+        if len(samples) < MIN_LATENCY_SAMPLES:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * pct / 100))]
+
+
+class HedgedSearch:
+    """Race several search providers and use the first responses to arrive.
+
+    The first provider is the primary and starts at once. Each backup starts
+    hedge_delay seconds after the previous request, or at once when every running
+    request has failed. A hedge_delay of 0 fires all providers together, e.g. a
+    fast "basic" search alongside "advanced". None waits for the primary's recent
+    p95 latency, so only the slowest requests are duplicated. The first `quorum`
+    successful responses win and the stragglers are cancelled. If some responses
+    have arrived by the deadline they are used; if none have, asyncio.TimeoutError
+    is raised. A slow provider therefore costs at most `deadline` seconds.
+    """
+
+    def __init__(self, providers: Sequence[SearchProvider], deadline: float = 30.0,
+                 hedge_delay: Optional[float] = None, quorum: int = 1,
+                 hedge_percentile: float = 95.0, initial_delay: float = 5.0):
+        if not providers:
+            raise ValueError("HedgedSearch needs at least one provider")
+        self.logger = logging.getLogger(__name__)
+        self.providers = list(providers)
+        self.deadline = deadline
+        self.hedge_delay = hedge_delay
+        self.quorum = max(1, min(quorum, len(self.providers)))
+        self.hedge_percentile = hedge_percentile
+        self.initial_delay = initial_delay
+        self.latency = LatencyTracker()
+        self._stats = {"requests": 0, "hedged": 0, "deadline_misses": 0, "wins": {}}
+        self._stats_lock = threading.Lock()
+
+    def current_delay(self) -> float:
+        """Seconds to wait before starting the next backup request"""
+        if self.hedge_delay is not None:
+            return self.hedge_delay
+        observed = self.latency.percentile(self.hedge_percentile)
+        return self.initial_delay if observed is None else observed
+
+    def params_for(self, provider: Optional[str], params: Dict[str, Any]) -> Dict[str, Any]:
+        """Parameters behind a response from `provider`, the name search() put on it.
+
+        A win by a provider with overrides (e.g. "basic") was not produced by the
+        caller's parameters, so callers cache it under these instead.
+        """
+        by_name = {p.name: p for p in self.providers}
+        for name in (provider or "").split("+"):
+            if name in by_name:
+                params = by_name[name].params_for(name, params)
+        return params
+
+    def accepted_params(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Parameter sets of every provider, primary first: any of them may win the race"""
+        accepted: List[Dict[str, Any]] = []
+        for provider in self.providers:
+            used = provider.params_for(provider.name, params)
+            if used not in accepted:
+                accepted.append(used)
+        return accepted
+
+    def _count(self, key: str, provider: Optional[str] = None) -> None:
+        with self._stats_lock:
+            if provider is None:
+                self._stats[key] += 1
+            else:
+                self._stats[key][provider] = self._stats[key].get(provider, 0) + 1
+
+    async def _timed(self, provider: SearchProvider, query: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        response = await provider.search(query, **params)
+        if provider is self.providers[0]:
+            self.latency.record(loop.time() - started)
+        return response
+
+    async def search(self, query: str, **params: Any) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.deadline
+        waiting = list(self.providers)
+        pending: Dict[asyncio.Task, SearchProvider] = {}
+        responses: List[Dict[str, Any]] = []
+        errors: List[BaseException] = []
+        self._count("requests")
+
+        def launch() -> Optional[float]:
+            provider = waiting.pop(0)
+            if provider is not self.providers[0]:
+                self._count("hedged")
+                METRICS.inc("research_search_hedges_total", provider=provider.name)
+            pending[asyncio.create_task(self._timed(provider, query, params))] = provider
+            return loop.time() + self.current_delay() if waiting else None
+
+        next_hedge = launch()
+        try:
+            while pending and len(responses) < self.quorum:
+                now = loop.time()
+                if now >= deadline:
+                    break
+                wake = deadline if next_hedge is None else min(deadline, next_hedge)
+                done, _ = await asyncio.wait(pending, timeout=wake - now,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    provider = pending.pop(task)
+                    try:
+                        responses.append(task.result())
+                    except Exception as e:
+                        self.logger.warning(f"Search provider {provider.name} failed: {str(e)}")
+                        errors.append(e)
+                if waiting and len(responses) < self.quorum and (not pending or loop.time() >= next_hedge):
+                    next_hedge = launch()
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+        if not responses:
+            if errors and not pending:
+                raise errors[-1]
+            self._count("deadline_misses")
+            METRICS.inc("research_search_deadline_misses_total")
+            raise asyncio.TimeoutError(f"No search response within {self.deadline}s for: {query}")
+        # Requests that finished together may overshoot the quorum
+        winner = self._merge(responses[:self.quorum])
+        self._count("wins", winner["provider"])
+        return winner
+
+    @staticmethod
+    def _merge(responses: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """One response from the winners: results deduplicated by URL, in arrival order"""
+        if len(responses) == 1:
+            return responses[0]
+        merged = {**responses[0], "results": [],
+                  "provider": "+".join(r["provider"] for r in responses)}
+        seen = set()
+        for response in responses:
+            for item in response.get("results", []):
+                if item.get("url") not in seen:
+                    seen.add(item.get("url"))
+                    merged["results"].append(item)
+            if not merged.get("answer") and response.get("answer"):
+                merged["answer"] = response["answer"]
+        return merged
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = {**self._stats, "wins": dict(self._stats["wins"])}
+        stats["hedge_delay_s"] = round(self.current_delay(), 3)
+        return stats
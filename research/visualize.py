@@ -1,61 +1,141 @@
-import matplotlib.pyplot as plt
-import seaborn as sns
-import numpy as np
+import io
 import datetime
-from docx import Document
-from docx.shared import Inches
-from typing import List, Dict, Optional
+from typing import Any, List, Dict, Optional, Tuple
 import os
 import logging
+import threading
 
-class VisualizationAgent:
-    def __init__(self):
-        self.chart_files = []
-        self.logger = logging.getLogger(__name__)
+# Matplotlib is imported on first render, not at startup; each worker thread
+# then reuses its own Figure and Agg canvas instead of building them per chart
+_STYLE_LOCK = threading.Lock()
+_style_ready = False
+_local = threading.local()
+
+# "print" is the original 300 dpi tight-bbox output; "fast" skips layout passes
+QUALITY_DPI = {"fast": 100, "print": 300}
+
+
+def _init_matplotlib() -> None:
+    global _style_ready
+    if _style_ready:
+        return
+    with _STYLE_LOCK:
+        if _style_ready:
+            return
+        import matplotlib.style
+        # Import the Agg pieces here too: worker threads importing them at once can deadlock
+        import matplotlib.figure  # noqa: F401
+        import matplotlib.backends.backend_agg  # noqa: F401
         try:
             # Updated style setting that works with modern matplotlib
-            plt.style.use('seaborn-v0_8')
-            self.logger.info("Visualization styles initialized")
+            matplotlib.style.use('seaborn-v0_8')
+            logging.getLogger(__name__).info("Visualization styles initialized")
         except Exception as e:
-            self.logger.warning(f"Could not set seaborn style: {str(e)}")
-            plt.style.use('default')
+            logging.getLogger(__name__).warning(f"Could not set seaborn style: {str(e)}")
+            matplotlib.style.use('default')
+        _style_ready = True
+
+
+def _axes(figsize: Tuple[float, float]) -> Any:
+    """This thread's reusable axes, emptied of the previous chart's bars and labels.
+
+    Removing the data artists keeps the axes, spines and tick machinery, which
+    matplotlib would otherwise rebuild from scratch for every chart.
+    """
+    _init_matplotlib()
+    ax = getattr(_local, "axes", None)
+    if ax is None:
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        figure = Figure(figsize=figsize)
+        FigureCanvasAgg(figure)
+        ax = _local.axes = figure.add_subplot()
+    else:
+        for artist in list(ax.patches) + list(ax.texts) + list(ax.collections):
+            artist.remove()
+        if ax.get_legend() is not None:
+            ax.get_legend().remove()
+        ax.figure.set_size_inches(*figsize)
+    return ax
+
+
+class VisualizationAgent:
+    def __init__(self, quality: str = "print"):
+        if quality not in QUALITY_DPI:
+            raise ValueError(f"Unknown chart quality '{quality}', expected one of {tuple(QUALITY_DPI)}")
+        self.quality = quality
+        self.chart_files = []
+        self.logger = logging.getLogger(__name__)
+
+    def render_reliability(self, sources: List[Dict], title: str = "Source Reliability",
+                           ylabel: str = "Reliability Score", fmt: str = "png",
+                           dpi: Optional[int] = None) -> bytes:
+        """Render the reliability bar chart to an in-memory png or svg.
+
+        Sources carrying domain_reliability (see DomainReliabilityIndex.annotate)
+        also get a marker at their domain's average over past runs.
+        """
+        if not sources:
+            raise ValueError("No sources provided")
+
+        # Prepare data
+        labels = []
+        scores = []
+        colors = []
+
+        for i, src in enumerate(sources):
+            label = src.get("title", f"Source {i+1}")
+            labels.append(label[:25] + "..." if len(label) > 25 else label)
+            score = float(src.get("score", 0.0))
+            scores.append(score)
+            colors.append(self._get_score_color(score))
+
+        ax = _axes((12, 6))
+        figure = ax.figure
+        # Numeric positions: categorical labels would merge sources whose truncated titles match
+        positions = range(len(labels))
+        bars = ax.barh(positions, scores, color=colors)
+        ax.set_yticks(positions, labels)
+        ax.set_ylim(-0.5, len(labels) - 0.5)
+        ax.set_title(title, pad=20)
+        ax.set_xlabel(ylabel)
+        ax.set_xlim(0, 1.0)
+
+        # Add score labels
+        for bar in bars:
+            width = bar.get_width()
+            ax.text(width + 0.02, bar.get_y() + bar.get_height()/2,
+                    f'{width:.2f}', ha='left', va='center')
+
+        history = [(i, float(src["domain_reliability"])) for i, src in enumerate(sources)
+                   if src.get("domain_reliability") is not None]
+        if history:
+            ax.scatter([value for _, value in history], [i for i, _ in history], marker='|', s=400,
+                       linewidths=2.5, color='#2c3e50', zorder=3, label='Domain average, past runs')
+            ax.legend(loc='lower right', bbox_to_anchor=(1.0, 1.0), frameon=False, fontsize='small')
+
+        buffer = io.BytesIO()
+        if self.quality == "print":
+            figure.tight_layout()
+            figure.savefig(buffer, format=fmt, dpi=dpi or QUALITY_DPI["print"], bbox_inches='tight')
+        else:
+            import matplotlib
+            # Fixed margins for the ~25 character labels instead of layout passes;
+            # svg text stays text rather than being drawn as glyph paths
+            figure.subplots_adjust(left=0.2, right=0.97, top=0.88, bottom=0.1)
+            with matplotlib.rc_context({"svg.fonttype": "none"}):
+                figure.savefig(buffer, format=fmt, dpi=dpi or QUALITY_DPI["fast"])
+        return buffer.getvalue()
 
     def plot_reliability(self, sources: List[Dict], title: str = "Source Reliability", 
                          xlabel: str = "Sources", ylabel: str = "Reliability Score", 
-                         filename: str = "reliability_plot.png") -> Optional[str]:
-        """Generate a reliability score bar chart"""
+                         filename: str = "reliability_plot.png", dpi: Optional[int] = None) -> Optional[str]:
+        """Generate a reliability score bar chart; the format follows the file extension"""
         try:
-            if not sources:
-                raise ValueError("No sources provided")
-                
-            # Prepare data
-            labels = []
-            scores = []
-            colors = []
-            
-            for i, src in enumerate(sources):
-                title = src.get("title", f"Source {i+1}")
-                labels.append(title[:25] + "..." if len(title) > 25 else title)
-                score = float(src.get("score", 0.0))
-                scores.append(score)
-                colors.append(self._get_score_color(score))
-            
-            # Create figure with improved layout
-            plt.figure(figsize=(12, 6))
-            bars = plt.barh(labels, scores, color=colors)
-            plt.title(title, pad=20)
-            plt.xlabel(ylabel)
-            plt.xlim(0, 1.0)
-            
-            # Add score labels
-            for bar in bars:
-                width = bar.get_width()
-                plt.text(width + 0.02, bar.get_y() + bar.get_height()/2,
-                         f'{width:.2f}', ha='left', va='center')
-            
-            plt.tight_layout()
-            plt.savefig(filename, dpi=300, bbox_inches='tight')
-            plt.close()
+            fmt = os.path.splitext(filename)[1].lstrip(".").lower() or "png"
+            data = self.render_reliability(sources, title=title, ylabel=ylabel, fmt=fmt, dpi=dpi)
+            with open(filename, 'wb') as f:
+                f.write(data)
             
             self.chart_files.append(filename)
             self.logger.info(f"Generated reliability plot: {filename}")
@@ -80,6 +160,8 @@ class VisualizationAgent:
                 self.logger.warning("No visualization files to save")
                 return False
                 
+            from docx import Document
+            from docx.shared import Inches
             doc = Document()
             doc.add_heading("Research Visualizations", level=1)
             doc.add_paragraph(f"Generated on: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M')}")
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""Query and export the results store written by app.py, batch.py and server.py.
+
+Example:
+    python results.py export history.csv --since 2025-01-01 --contains "solar"
+    python results.py export history.parquet --query "impact of AI on jobs"
+    python results.py stats
+"""
+import os
+import sys
+import json
+import argparse
+from typing import List, Optional
+
+from research.results_store import DEFAULT_RESULTS_DIR, ResultsStore
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Query and export past research results")
+    parser.add_argument("--root", default=os.getenv("RESULTS_STORE_DIR", DEFAULT_RESULTS_DIR),
+                        help="results store directory")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("stats", help="number of runs and rows, and the date range")
+    for name, help_text in (("export", "write matching rows to a .csv or .parquet file"),
+                            ("show", "print matching rows as JSON lines")):
+        command = commands.add_parser(name, help=help_text)
+        if name == "export":
+            command.add_argument("path")
+        command.add_argument("--query", help="exact query (case and spacing are ignored)")
+        command.add_argument("--contains", help="substring of the query")
+        command.add_argument("--since", help="first day, YYYY-MM-DD")
+        command.add_argument("--until", help="last day, YYYY-MM-DD")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    store = ResultsStore(args.root)
+    if args.command == "stats":
+        print(json.dumps(store.stats(), indent=2))
+        return 0
+    filters = {"query": args.query, "contains": args.contains, "since": args.since, "until": args.until}
+    if args.command == "export":
+        try:
+            count = store.export(args.path, **filters)
+        except ImportError as e:
+            print(f"Error: {e}")
+            return 1
+        print(f"Exported {count} rows to {args.path}")
+    else:
+        for row in store.rows(**filters):
+            print(json.dumps(row))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+import os
+import sys
+import json
+import time
+import uuid
+import asyncio
+import argparse
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from app import stream_pipeline
+from research.clients import needs_api_keys
+from research.cache import ResultCache
+
+logger = logging.getLogger(__name__)
+
+MAX_BODY_BYTES = 64 * 1024
+REASONS = {200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found",
+           405: "Method Not Allowed", 413: "Payload Too Large", 429: "Too Many Requests",
+           500: "Internal Server Error"}
+
+
+class QueueFullError(Exception):
+    """Raised when a submission would exceed the bounded job queue"""
+
+
+class Job:
+    """One pipeline execution, shared by every request that coalesced onto it.
+
+    Token events are only replayed while the job runs or is being followed; once
+    it has finished and nobody is streaming it, they are dropped and the node and
+    result events (the result holds the full answer) are kept.
+    """
+
+    def __init__(self, query: str, mode: Optional[str], refresh: bool, use_cache: Optional[bool]):
+        self.id = uuid.uuid4().hex
+        self.query = query
+        self.mode = mode
+        self.refresh = refresh
+        self.use_cache = use_cache
+        self.status = "queued"
+        self.events: List[Dict[str, Any]] = []
+        self.result: Optional[Dict[str, Any]] = None
+        self.subscribers = 1
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._followers = 0
+        self._changed = asyncio.Condition()
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("done", "failed")
+
+    async def publish(self, event: Dict[str, Any]) -> None:
+        async with self._changed:
+            self.events.append(event)
+            self._changed.notify_all()
+
+    async def follow(self):
+        """Yield every event from the start, then new ones until the job finishes"""
+        position = 0
+        self._followers += 1
+        try:
+            while True:
+                async with self._changed:
+                    await self._changed.wait_for(lambda: position < len(self.events) or self.done)
+                    pending = self.events[position:]
+                    finished = self.done
+                for event in pending:
+                    yield event
+                position += len(pending)
+                if finished and position >= len(self.events):
+                    return
+        finally:
+            self._followers -= 1
+            self.compact()
+
+    def compact(self) -> None:
+        """Drop a finished job's token events unless a follower is still reading them"""
+        if self.done and not self._followers:
+            self.events = [event for event in self.events if event["type"] != "token"]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "query": self.query,
+            "status": self.status,
+            "subscribers": self.subscribers,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "result": self.result
+        }
+
+
+class ResearchService:
+    """Bounded job queue in front of stream_pipeline with request coalescing.
+
+    Identical in-flight submissions (same normalized query and options) share a
+    single job. At most max_queue jobs wait behind max_concurrency running ones;
+    further submissions are rejected so callers back off instead of piling up.
+    All jobs run in this process, so they share the compiled graph and clients.
+    """
+
+    def __init__(self, max_concurrency: int = 4, max_queue: int = 32,
+                 mode: Optional[str] = None, retain_seconds: float = 3600.0):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.mode = mode
+        self.retain_seconds = retain_seconds
+        self.jobs: Dict[str, Job] = {}
+        self.inflight: Dict[Tuple, Job] = {}
+        self.counts = {"submitted": 0, "coalesced": 0, "rejected": 0, "completed": 0}
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+
+    def start(self) -> None:
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.max_concurrency)]
+        # Finished jobs also expire while no new jobs arrive
+        self._workers.append(asyncio.create_task(self._prune_periodically()))
+
+    async def stop(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+
+    def submit(self, query: str, mode: Optional[str] = None, refresh: bool = False,
+               use_cache: Optional[bool] = None) -> Tuple[Job, bool]:
+        """Return (job, coalesced); raises QueueFullError when the queue is full"""
+        mode = mode or self.mode
+        key = (ResultCache.normalize_query(query), mode, refresh, use_cache)
+        self.counts["submitted"] += 1
+        job = self.inflight.get(key)
+        if job is not None:
+            job.subscribers += 1
+            self.counts["coalesced"] += 1
+            return job, True
+
+        self._prune()
+        job = Job(query, mode, refresh, use_cache)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.counts["rejected"] += 1
+            raise QueueFullError(f"{self.max_queue} jobs already queued")
+        self.jobs[job.id] = job
+        self.inflight[key] = job
+        return job, False
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job) -> None:
+        job.status = "running"
+        job.started_at = time.time()
+        try:
+            async for event in stream_pipeline(job.query, job.mode, job.use_cache, job.refresh):
+                if event["type"] == "result":
+                    job.result = event["result"]
+                await job.publish(event)
+            job.status = "done" if job.result and job.result["success"] else "failed"
+        except Exception as e:
+            logger.error(f"Job {job.id} failed: {str(e)}", exc_info=True)
+            job.result = {"success": False, "answer": str(e), "path": None}
+            job.status = "failed"
+            await job.publish({"type": "result", "result": job.result})
+        finally:
+            job.finished_at = time.time()
+            self.counts["completed"] += 1
+            for key, inflight in list(self.inflight.items()):
+                if inflight is job:
+                    del self.inflight[key]
+            async with job._changed:
+                job._changed.notify_all()
+            job.compact()
+
+    def _prune(self) -> None:
+        cutoff = time.time() - self.retain_seconds
+        for job_id in [j.id for j in self.jobs.values() if j.done and j.finished_at < cutoff]:
+            del self.jobs[job_id]
+
+    async def _prune_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(min(self.retain_seconds, 60.0))
+            self._prune()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.counts,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "running": sum(1 for j in self.inflight.values() if j.status == "running"),
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue
+        }
+
+
+async def _read_request(reader: asyncio.StreamReader) -> Tuple[str, str, Dict[str, str], bytes]:
+    request_line = (await reader.readline()).decode("latin-1").strip()
+    if not request_line:
+        raise ValueError("Empty request")
+    method, target, _ = request_line.split(" ", 2)
+    headers = {}
+    while True:
+        line = (await reader.readline()).decode("latin-1").strip()
+        if not line:
+            break
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get("content-length", "0") or 0)
+    if length > MAX_BODY_BYTES:
+        raise OverflowError(f"Body larger than {MAX_BODY_BYTES} bytes")
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), urlsplit(target).path, headers, body
+
+
+def _response(status: int, payload: Any, headers: Optional[Dict[str, str]] = None) -> bytes:
+    body = json.dumps(payload).encode("utf-8")
+    head = [f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+            "Content-Type: application/json",
+            f"Content-Length: {len(body)}",
+            "Connection: close"]
+    head += [f"{k}: {v}" for k, v in (headers or {}).items()]
+    return ("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body
+
+
+class ResearchServer:
+    """Minimal asyncio HTTP/1.1 front-end for ResearchService.
+
+    POST /research             submit {"query", "mode"?, "refresh"?, "use_cache"?} -> 202 {"id", ...}
+    GET  /research/{id}        poll job status and result
+    GET  /research/{id}/stream server-sent events: node, token and result events
+    GET  /health               queue and coalescing counters
+    """
+
+    def __init__(self, service: ResearchService):
+        self.service = service
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            try:
+                method, path, _, body = await _read_request(reader)
+            except OverflowError as e:
+                writer.write(_response(413, {"error": str(e)}))
+                return
+            except (ValueError, asyncio.IncompleteReadError):
+                writer.write(_response(400, {"error": "Malformed request"}))
+                return
+
+            parts = [p for p in path.split("/") if p]
+            if parts == ["health"] and method == "GET":
+                writer.write(_response(200, self.service.stats()))
+            elif parts == ["research"] and method == "POST":
+                writer.write(self._submit(body))
+            elif len(parts) == 2 and parts[0] == "research" and method == "GET":
+                job = self.service.jobs.get(parts[1])
+                writer.write(_response(200, job.to_dict()) if job else _response(404, {"error": "Unknown job"}))
+            elif len(parts) == 3 and parts[0] == "research" and parts[2] == "stream" and method == "GET":
+                await self._stream(parts[1], writer)
+            elif parts and parts[0] in ("research", "health"):
+                writer.write(_response(405, {"error": f"{method} not allowed"}))
+            else:
+                writer.write(_response(404, {"error": "Not found"}))
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        except Exception as e:
+            logger.error(f"Request failed: {str(e)}", exc_info=True)
+            writer.write(_response(500, {"error": str(e)}))
+        finally:
+            try:
+                await writer.drain()
+                writer.close()
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    def _submit(self, body: bytes) -> bytes:
+        try:
+            request = json.loads(body or b"{}")
+            query = (request.get("query") or "").strip()
+        except (json.JSONDecodeError, AttributeError):
+            return _response(400, {"error": "Body must be a JSON object"})
+        if not query:
+            return _response(400, {"error": "query is required"})
+        if request.get("mode") not in (None, "agent", "direct"):
+            return _response(400, {"error": "mode must be 'agent' or 'direct'"})
+        # bool("false") is True, so only JSON booleans are accepted for the flags
+        for flag in ("refresh", "use_cache"):
+            if request.get(flag) is not None and not isinstance(request[flag], bool):
+                return _response(400, {"error": f"{flag} must be true or false"})
+        try:
+            job, coalesced = self.service.submit(
+                query,
+                mode=request.get("mode"),
+                refresh=request.get("refresh") or False,
+                use_cache=request.get("use_cache")
+            )
+        except QueueFullError as e:
+            return _response(429, {"error": str(e)}, {"Retry-After": "5"})
+        return _response(202, {"id": job.id, "status": job.status, "coalesced": coalesced},
+                         {"Location": f"/research/{job.id}"})
+
+    async def _stream(self, job_id: str, writer: asyncio.StreamWriter) -> None:
+        job = self.service.jobs.get(job_id)
+        if job is None:
+            writer.write(_response(404, {"error": "Unknown job"}))
+            return
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+                     b"Cache-Control: no-cache\r\nConnection: close\r\n\r\n")
+        async for event in job.follow():
+            writer.write(f"event: {event['type']}\ndata: {json.dumps(event)}\n\n".encode("utf-8"))
+            # Slow readers apply backpressure here rather than buffering unboundedly
+            await writer.drain()
+
+
+async def serve(host: str = "127.0.0.1", port: int = 8080, concurrency: int = 4,
+                queue_size: int = 32, mode: Optional[str] = None) -> None:
+    service = ResearchService(max_concurrency=concurrency, max_queue=queue_size, mode=mode)
+    service.start()
+    server = await asyncio.start_server(ResearchServer(service).handle, host, port)
+    logger.info(f"Research service listening on http://{host}:{port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.stop()
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Serve the research pipeline over HTTP")
+    parser.add_argument("--host", default=os.getenv("RESEARCH_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("RESEARCH_PORT", "8080")))
+    parser.add_argument("-c", "--concurrency", type=int, default=4, help="pipelines in flight")
+    parser.add_argument("-q", "--queue-size", type=int, default=32,
+                        help="jobs allowed to wait; further submissions get 429")
+    parser.add_argument("--mode", choices=("agent", "direct"), default=None, help="default research mode")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if needs_api_keys() and not (os.getenv("TAVILY_API_KEY") and os.getenv("GOOGLE_API_KEY")):
+        print("Error: TAVILY_API_KEY and GOOGLE_API_KEY environment variables are required")
+        sys.exit(1)
+    try:
+        asyncio.run(serve(args.host, args.port, args.concurrency, args.queue_size, args.mode))
+    except KeyboardInterrupt:
+        logger.info("Research service stopped")
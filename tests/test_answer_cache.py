@@ -0,0 +1,59 @@
+import pytest
+
+from research.answer_cache import AnswerCache, content_tokens, cosine, ngram_vector
+
+ASKED = [
+    "impact of inflation on housing prices",
+    "major AI regulation changes in 2023",
+    "cost of onshore wind farms",
+    "does remote work improve productivity",
+]
+
+# Character trigrams alone rate each pair as the same question
+DIFFERENT_QUESTIONS = [
+    ("impact of inflation on housing prices", "impact of deflation on housing prices"),
+    ("major AI regulation changes in 2023", "major AI regulation changes in 2024"),
+    ("cost of onshore wind farms", "cost of offshore wind farms"),
+    ("does remote work improve productivity", "does remote work not improve productivity"),
+]
+
+SAME_QUESTIONS = [
+    ("impact of inflation on housing prices", "the impact of inflation on the housing prices"),
+    ("impact of inflation on housing prices", "Impacts of inflation on housing price?"),
+    ("cost of onshore wind farms", "what is the cost of onshore wind farms"),
+]
+
+
+@pytest.fixture
+def cache():
+    cache = AnswerCache(":memory:")
+    for query in ASKED:
+        cache.store(query, {"text": f"report on {query}"}, [], {"success": True})
+    return cache
+
+
+@pytest.mark.parametrize("asked, query", DIFFERENT_QUESTIONS)
+def test_different_questions_miss_despite_similar_spelling(cache, asked, query):
+    assert cosine(ngram_vector(asked), ngram_vector(query)) >= cache.threshold
+    assert cache.lookup(query) is None
+    assert cache.previous(query) is None
+
+
+@pytest.mark.parametrize("asked, query", SAME_QUESTIONS)
+def test_stopword_and_plural_rephrasings_hit(cache, asked, query):
+    entry = cache.lookup(query)
+    assert entry is not None
+    assert entry["query"] == asked
+    assert entry["report"] == {"text": f"report on {asked}"}
+
+
+def test_content_tokens_fold_plurals_and_drop_stopwords():
+    assert content_tokens("What are the costs of wind farms?") == {"cost", "wind", "farm"}
+    assert content_tokens("does it not work") == {"not", "work"}
+
+
+def test_hits_and_misses_are_counted(cache):
+    cache.lookup(ASKED[0])
+    cache.lookup("impact of deflation on housing prices")
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+
+from research import cache as cache_module
+from research.cache import ResultCache
+from research.fakes import FakeChatModel, FakeTavilyClient
+from research.research_agent import ResearchAgent
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache_module.time, "time", clock)
+    return clock
+
+
+def test_entries_expire_after_their_ttl(clock):
+    cache = ResultCache(":memory:", ttl=60)
+    cache.set("a", [1])
+    cache.set("b", [2], ttl=600)
+    clock.now += 61
+    assert cache.get("a") is None
+    assert cache.get("b") == [2]
+    assert cache.stats()["entries"] == 1
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = ResultCache(":memory:", max_entries=2)
+    cache.set("a", 1)
+    clock.now += 1
+    cache.set("b", 2)
+    clock.now += 1
+    assert cache.get("a") == 1
+    clock.now += 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+
+
+def test_keys_ignore_case_and_whitespace_but_not_params():
+    assert ResultCache.key_for("  Solar   POWER ") == ResultCache.key_for("solar power")
+    assert ResultCache.key_for("solar power", max_results=5) != ResultCache.key_for("solar power", max_results=3)
+    assert ResultCache.key_for("solar power") != ResultCache.key_for("wind power")
+
+
+def test_hits_and_misses_are_counted():
+    cache = ResultCache(":memory:")
+    cache.set("a", 1)
+    cache.get("a")
+    cache.get("missing")
+    assert cache.get_first(["missing", "a"]) == 1
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (2, 1, 2 / 3)
+
+
+def test_repeated_search_is_served_from_the_cache():
+    tavily = FakeTavilyClient()
+    cache = ResultCache(":memory:")
+    agent = ResearchAgent(llm=FakeChatModel(), tavily=tavily, cache=cache)
+
+    async def two_searches():
+        return await agent._search("Solar power"), await agent._search("solar  power")
+
+    first, second = asyncio.run(two_searches())
+    assert first and first == second
+    assert tavily.calls == 1
+    assert cache.stats()["hits"] == 1
@@ -0,0 +1,66 @@
+import time
+import asyncio
+
+import pytest
+
+from research.fakes import FakeChatModel, FakeTavilyClient
+from research.limits import STAGE_LIMITS
+from research.research_agent import ResearchAgent
+from research.resilience import ProviderGuard
+
+
+class InFlight:
+    """Counts concurrent calls and remembers the peak"""
+
+    def __init__(self):
+        self.now = 0
+        self.peak = 0
+
+    def enter(self):
+        self.now += 1
+        self.peak = max(self.peak, self.now)
+
+    def exit(self):
+        self.now -= 1
+
+
+@pytest.fixture
+def limits():
+    yield STAGE_LIMITS
+    STAGE_LIMITS.configure(search=None, llm=None)
+
+
+def test_llm_guard_holds_a_slot_per_model_call(limits):
+    limits.configure(llm=1)
+    guard = ProviderGuard("gemini", rate=1000, stage="llm")
+    calls = InFlight()
+
+    async def model_call():
+        calls.enter()
+        await asyncio.sleep(0.01)
+        calls.exit()
+
+    async def many():
+        await asyncio.gather(*(guard.acall(model_call) for _ in range(4)))
+
+    asyncio.run(many())
+    assert calls.peak == 1
+
+
+def test_searches_hold_a_search_slot_each(limits):
+    limits.configure(search=1)
+    searches = InFlight()
+    fake = FakeTavilyClient()
+
+    class SlowClient:
+        def search(self, **params):
+            searches.enter()
+            time.sleep(0.02)
+            searches.exit()
+            return fake.search(**params)
+
+    agent = ResearchAgent(llm=FakeChatModel(), tavily=SlowClient(), mode="direct")
+    results = asyncio.run(agent.run("impact of AI on jobs"))
+    assert results
+    assert fake.calls > 1
+    assert searches.peak == 1
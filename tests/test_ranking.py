@@ -0,0 +1,53 @@
+from research.ranking import ResultRanker, bm25_scores, canonicalize_url, hamming_distance, simhash
+
+
+def test_canonicalize_url_drops_only_tracking_noise():
+    assert canonicalize_url("http://www.Example.org:443/a/?utm_source=x&b=2&a=1&fbclid=y") == \
+        "https://example.org/a?a=1&b=2"
+    assert canonicalize_url("https://x.org/item?ref=home&ref_src=twsrc") == "https://x.org/item"
+    assert canonicalize_url("https://x.org/") == "https://x.org/"
+    assert canonicalize_url("") == ""
+
+
+def test_canonicalize_url_keeps_content_params_that_look_like_tracking():
+    first = canonicalize_url("https://x.org/item?reference=123")
+    assert first == "https://x.org/item?reference=123"
+    assert first != canonicalize_url("https://x.org/item?reference=456")
+    assert canonicalize_url("https://x.org/doc?referrer_id=9&refresh=1") == "https://x.org/doc?referrer_id=9&refresh=1"
+
+
+def test_simhash_is_close_for_near_duplicates():
+    text = "solar panels convert sunlight into electricity for homes and businesses across the country"
+    assert hamming_distance(simhash(text), simhash(text + " today")) < \
+        hamming_distance(simhash(text), simhash("wind turbines spin offshore in the north sea all winter long"))
+
+
+def test_deduplicate_drops_repeated_urls_and_near_duplicate_content():
+    text = " ".join(f"word{i}" for i in range(60))
+    results = [
+        {"url": "https://a.org/page?utm_source=x", "content": text, "score": 0.5},
+        {"url": "https://www.a.org/page/", "content": text, "score": 0.9},
+        {"url": "https://b.org/syndicated-copy", "content": text.upper(), "score": 0.4},
+        {"url": "https://c.org/other", "content": "an unrelated article about wind power and storage", "score": 0.3},
+    ]
+    kept = ResultRanker().deduplicate(results)
+    assert [r["url"] for r in kept] == ["https://www.a.org/page/", "https://c.org/other"]
+
+
+def test_bm25_prefers_documents_matching_more_query_terms():
+    scores = bm25_scores("solar battery storage", [
+        "wind turbines and offshore farms",
+        "solar power output",
+        "solar battery storage for homes",
+    ])
+    assert scores[0] == 0.0
+    assert scores[2] > scores[1] > 0.0
+
+
+def test_rank_orders_by_blended_relevance():
+    results = [
+        {"url": "https://a.org", "title": "Wind", "content": "offshore wind farms", "score": 0.5},
+        {"url": "https://b.org", "title": "Solar storage", "content": "solar battery storage", "score": 0.5},
+    ]
+    ranked = ResultRanker(top_k=1).rank("solar battery storage", results)
+    assert [r["url"] for r in ranked] == ["https://b.org"]
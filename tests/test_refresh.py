@@ -0,0 +1,88 @@
+import asyncio
+import importlib
+
+import pytest
+
+from research.answer_cache import AnswerCache
+from research.refresh import diff_sources, is_material, renumber_citations
+
+
+def source(url, content="text"):
+    return {"url": url, "content": content, "title": url}
+
+
+PREVIOUS = [source("https://a.org"), source("https://b.org"), source("https://c.org"), source("https://d.org")]
+
+
+def test_diff_reports_added_changed_and_removed_positions():
+    current = [source("https://b.org", "new text"), source("https://www.a.org/"),
+               source("https://e.org"), {"url": "", "content": "Direct answer"}, source("https://c.org")]
+    diff = diff_sources(PREVIOUS, current)
+    assert diff["added"] == [2]
+    assert diff["changed"] == [0]
+    assert diff["removed"] == ["https://d.org/"]
+    assert diff["unchanged"] == 2
+    assert diff["change_ratio"] == 3 / 4
+
+
+def test_small_changes_are_not_material():
+    unchanged = diff_sources(PREVIOUS, list(PREVIOUS))
+    assert not is_material(unchanged)
+    one_changed = diff_sources(PREVIOUS * 3, PREVIOUS[:3] + [source("https://d.org", "edited")])
+    assert one_changed["change_ratio"] == 0.25
+    assert is_material(one_changed, min_change_ratio=0.2)
+    assert not is_material(one_changed, min_change_ratio=0.3)
+
+
+def test_citations_follow_their_sources_to_new_positions():
+    report = "Prices rose [Source 1] while [Source 4] disagreed, see [Source 2]."
+    current = [source("https://b.org"), source("https://a.org"), source("https://e.org")]
+    assert renumber_citations(report, PREVIOUS, current) == \
+        "Prices rose [Source 2] while [Removed source] disagreed, see [Source 1]."
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    # app creates its log, outputs and caches in the working directory on import
+    monkeypatch.chdir(tmp_path)
+    app = importlib.import_module("app")
+    monkeypatch.setattr(app, "ANSWER_CACHE", AnswerCache(":memory:"))
+    return app
+
+
+BASELINE = [source(f"https://site{i}.org") for i in range(10)]
+
+
+def stored(app, query):
+    app._store_answer(query, {"query": query, "report": {"answer": "first report"},
+                              "research_results": BASELINE}, {"success": True, "path": "report.docx"})
+
+
+def test_non_material_refresh_keeps_the_previous_baseline(app):
+    query = "impact of AI on jobs"
+    stored(app, query)
+    previous = app.ANSWER_CACHE.previous(query)
+    state = {**app._initial_state(query), "previous": previous,
+             "research_results": BASELINE[:9] + [source("https://site9.org", "minor edit")]}
+    update = asyncio.run(app.diff_node(state))
+    assert not update["source_diff"]["material"]
+    assert update["report"] == previous["report"]
+
+    app._store_answer(query, {**state, **update}, {"success": True, "path": "report.docx"})
+    assert app.ANSWER_CACHE.stats()["entries"] == 1
+    assert app.ANSWER_CACHE.previous(query)["sources"] == BASELINE
+
+
+def test_material_refresh_becomes_the_new_baseline(app):
+    query = "impact of AI on jobs"
+    stored(app, query)
+    current = BASELINE[:5] + [source(f"https://new{i}.org") for i in range(5)]
+    state = {**app._initial_state(query), "previous": app.ANSWER_CACHE.previous(query),
+             "research_results": current}
+    update = asyncio.run(app.diff_node(state))
+    assert update["source_diff"]["material"]
+    assert "report" not in update
+
+    app._store_answer(query, {**state, **update, "report": {"answer": "redrafted"}},
+                      {"success": True, "path": "report.docx"})
+    assert app.ANSWER_CACHE.previous(query)["sources"] == current
@@ -0,0 +1,27 @@
+import asyncio
+
+from research.fakes import FakeChatModel, FakeTavilyClient
+from research.research_agent import ResearchAgent
+
+
+def test_agent_mode_runs_one_agent_loop_and_searches_other_variations_directly(monkeypatch):
+    tavily = FakeTavilyClient()
+    agent = ResearchAgent(llm=FakeChatModel(), tavily=tavily, mode="agent")
+    loops = []
+    executor = type(agent.agent_executor)
+    ainvoke = executor.ainvoke
+
+    async def counting_ainvoke(self, inputs, *args, **kwargs):
+        loops.append(inputs["input"])
+        return await ainvoke(self, inputs, *args, **kwargs)
+
+    # AgentExecutor is a pydantic model, so patch the class rather than the instance
+    monkeypatch.setattr(executor, "ainvoke", counting_ainvoke)
+    query = "impact of AI on jobs"
+    variations = agent.expander.expand(query, agent.max_variations)
+    assert len(variations) > 1
+
+    results = asyncio.run(agent.run(query))
+    assert loops == [query]
+    assert tavily.calls == len(variations)
+    assert {r["query_used"] for r in results} >= set(variations[1:])
@@ -0,0 +1,142 @@
+import time
+import asyncio
+
+import pytest
+
+from research import resilience
+from research.fakes import FakeChatModel, FakeHTTPError, FakeTavilyClient
+from research.resilience import (
+    CircuitBreaker, CircuitOpenError, GuardedChatModel, ProviderGuard, RetryPolicy,
+    error_status, is_retryable, retry_after
+)
+
+
+def make_guard(max_attempts: int = 4, breaker: CircuitBreaker = None) -> ProviderGuard:
+    # A high rate keeps the token bucket out of the way; tiny delays keep tests fast
+    return ProviderGuard("test", rate=1000, policy=RetryPolicy(max_attempts, base_delay=0.001, max_delay=5),
+                         breaker=breaker)
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record (instead of performing) the guard's blocking backoff sleeps"""
+    recorded = []
+    monkeypatch.setattr(resilience.time, "sleep", recorded.append)
+    return recorded
+
+
+def test_fake_errors_look_like_http_errors():
+    assert error_status(FakeHTTPError(429)) == 429
+    assert retry_after(FakeHTTPError(429, retry_after=2)) == 2.0
+    assert retry_after(FakeHTTPError(503)) is None
+    assert is_retryable(FakeHTTPError(429)) and is_retryable(FakeHTTPError(503))
+    assert not is_retryable(FakeHTTPError(400))
+
+
+def test_retry_policy_honors_retry_after_up_to_max_delay():
+    policy = RetryPolicy(base_delay=0.001, max_delay=5)
+    assert policy.delay(0, FakeHTTPError(429, retry_after=2)) == 2.0
+    assert policy.delay(0, FakeHTTPError(429, retry_after=60)) == 5
+    assert 0 <= policy.delay(3) <= 0.008
+
+
+def test_guard_retries_throttled_calls(sleeps):
+    fake = FakeTavilyClient(fail_first=2, fail_status=429, retry_after=2)
+    response = make_guard().call(fake.search, query="solar")
+    assert response["results"]
+    assert fake.calls == 3
+    assert sleeps == [2.0, 2.0]
+
+
+def test_guard_gives_up_after_max_attempts(sleeps):
+    fake = FakeTavilyClient(fail_first=10, fail_status=503)
+    with pytest.raises(FakeHTTPError):
+        make_guard(max_attempts=3).call(fake.search, query="solar")
+    assert fake.calls == 3
+    assert len(sleeps) == 2
+
+
+def test_guard_does_not_retry_client_errors(sleeps):
+    fake = FakeTavilyClient(fail_first=1, fail_status=400)
+    with pytest.raises(FakeHTTPError):
+        make_guard().call(fake.search, query="solar")
+    assert fake.calls == 1
+    assert sleeps == []
+
+
+def test_async_guard_retries_throttled_calls():
+    fake = FakeTavilyClient(fail_first=1, fail_status=429, retry_after=0)
+
+    async def search(**kwargs):
+        return fake.search(**kwargs)
+
+    response = asyncio.run(make_guard().acall(search, query="solar"))
+    assert response["results"]
+    assert fake.calls == 2
+
+
+def test_breaker_opens_after_threshold_and_rejects_calls(sleeps):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    guard = make_guard(max_attempts=1, breaker=breaker)
+    fake = FakeTavilyClient(fail_first=10, fail_status=503)
+    for _ in range(2):
+        with pytest.raises(FakeHTTPError):
+            guard.call(fake.search, query="solar")
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        guard.call(fake.search, query="solar")
+    assert fake.calls == 2
+
+
+def test_half_open_breaker_lets_exactly_one_probe_through():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.01)
+    breaker.record_failure()
+    assert not breaker.allow()
+    time.sleep(0.02)
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow() and breaker.allow()
+
+
+def test_failed_probe_reopens_the_breaker():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.01)
+    breaker.record_failure()
+    time.sleep(0.02)
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+
+def test_inconclusive_probe_is_released(sleeps):
+    # time.sleep is patched out here, so the breaker is half-open at once instead
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    fake = FakeTavilyClient(fail_first=1, fail_status=400)
+    with pytest.raises(FakeHTTPError):
+        make_guard(breaker=breaker).call(fake.search, query="solar")
+    # A 400 says nothing about the provider's health; the next caller may probe
+    assert breaker.allow()
+
+
+def test_guarded_chat_model_charges_each_model_call():
+    guard = make_guard()
+    acquired = []
+    original = guard.bucket.acquire_async
+
+    async def counting_acquire():
+        acquired.append(1)
+        await original()
+
+    guard.bucket.acquire_async = counting_acquire
+    model = GuardedChatModel(FakeChatModel(), guard).bind_tools([])
+
+    async def two_calls():
+        await model.ainvoke("first question")
+        await model.ainvoke("second question")
+
+    asyncio.run(two_calls())
+    assert len(acquired) == 2
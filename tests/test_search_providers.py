@@ -0,0 +1,128 @@
+import asyncio
+
+import pytest
+
+from research.cache import ResultCache
+from research.fakes import FakeChatModel, FakeTavilyClient
+from research.research_agent import ResearchAgent, SEARCH_PARAMS
+from research.search_providers import HedgedSearch, SearchProvider
+
+
+class TimedClient:
+    """Async Tavily stand-in that answers after `delay` seconds, or raises `error`"""
+
+    def __init__(self, delay: float, urls=("https://a.org",), error: Exception = None):
+        self.delay = delay
+        self.urls = urls
+        self.error = error
+        self.started = []
+        self.cancelled = 0
+
+    async def search(self, query, **params):
+        self.started.append(asyncio.get_running_loop().time())
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.error is not None:
+            raise self.error
+        return {"results": [{"url": url, "content": query} for url in self.urls]}
+
+
+class SlowAdvanced:
+    """FakeTavilyClient whose advanced-depth searches are slow, so basic always wins"""
+
+    def __init__(self):
+        self.fake = FakeTavilyClient()
+
+    async def search(self, **params):
+        await asyncio.sleep(0.2 if params.get("search_depth") == "advanced" else 0)
+        return self.fake.search(**params)
+
+
+def basic_hedge(client) -> HedgedSearch:
+    return HedgedSearch([SearchProvider("advanced", client),
+                         SearchProvider("basic", client, search_depth="basic")], hedge_delay=0.0)
+
+
+def test_backup_starts_after_hedge_delay_and_loser_is_cancelled():
+    primary, backup = TimedClient(1.0), TimedClient(0.01)
+    search = HedgedSearch([SearchProvider("primary", primary), SearchProvider("backup", backup)],
+                          hedge_delay=0.1)
+    response = asyncio.run(search.search("solar"))
+    assert response["provider"] == "backup"
+    assert backup.started[0] - primary.started[0] >= 0.09
+    assert primary.cancelled == 1
+    assert search.stats()["hedged"] == 1
+
+
+def test_fast_primary_never_starts_the_backup():
+    primary, backup = TimedClient(0.01), TimedClient(0.01)
+    search = HedgedSearch([SearchProvider("primary", primary), SearchProvider("backup", backup)],
+                          hedge_delay=0.5)
+    assert asyncio.run(search.search("solar"))["provider"] == "primary"
+    assert backup.started == []
+
+
+def test_deadline_raises_timeout_when_nothing_arrives():
+    slow = TimedClient(1.0)
+    search = HedgedSearch([SearchProvider("primary", slow), SearchProvider("backup", slow)],
+                          deadline=0.1, hedge_delay=0.0)
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(search.search("solar"))
+    assert slow.cancelled == 2
+    assert search.stats()["deadline_misses"] == 1
+
+
+def test_primary_error_fails_over_at_once():
+    primary, backup = TimedClient(0, error=RuntimeError("primary down")), TimedClient(0.01)
+    search = HedgedSearch([SearchProvider("primary", primary), SearchProvider("backup", backup)],
+                          hedge_delay=10.0)
+    response = asyncio.run(asyncio.wait_for(search.search("solar"), timeout=1.0))
+    assert response["provider"] == "backup"
+
+
+def test_last_error_is_raised_when_every_provider_fails():
+    search = HedgedSearch([SearchProvider("primary", TimedClient(0, error=RuntimeError("primary down"))),
+                           SearchProvider("backup", TimedClient(0, error=ValueError("backup down")))],
+                          hedge_delay=10.0)
+    with pytest.raises(ValueError, match="backup down"):
+        asyncio.run(search.search("solar"))
+
+
+def test_quorum_merges_winners_by_url():
+    first = TimedClient(0.01, urls=("https://a.org", "https://b.org"))
+    second = TimedClient(0.02, urls=("https://b.org", "https://c.org"))
+    search = HedgedSearch([SearchProvider("first", first), SearchProvider("second", second)],
+                          hedge_delay=0.0, quorum=2)
+    response = asyncio.run(search.search("solar"))
+    assert response["provider"] == "first+second"
+    assert [r["url"] for r in response["results"]] == ["https://a.org", "https://b.org", "https://c.org"]
+
+
+def test_params_for_applies_the_winners_overrides():
+    search = basic_hedge(FakeTavilyClient())
+    params = {"search_depth": "advanced", "max_results": 5}
+    assert search.params_for("advanced", params) == params
+    assert search.params_for("basic", params)["search_depth"] == "basic"
+    assert search.params_for("advanced+basic", params)["search_depth"] == "basic"
+    assert search.accepted_params(params) == [params, {**params, "search_depth": "basic"}]
+
+
+def test_basic_wins_are_cached_under_basic_params_and_served_again(tmp_path):
+    client = SlowAdvanced()
+    cache = ResultCache(str(tmp_path / "search.sqlite"))
+    agent = ResearchAgent(llm=FakeChatModel(), tavily=client.fake, cache=cache,
+                          search=basic_hedge(client))
+
+    async def three_searches():
+        return [await agent._search("solar power") for _ in range(3)]
+
+    first, second, third = asyncio.run(three_searches())
+    assert first and first == second == third
+    # The advanced request was cancelled before reaching the client each time it ran
+    assert client.fake.calls == 1
+    assert cache.stats()["hits"] == 2 and cache.stats()["misses"] == 1
+    assert cache.get(ResultCache.key_for("solar power", **SEARCH_PARAMS)) is None
+    assert cache.get(ResultCache.key_for("solar power", **{**SEARCH_PARAMS, "search_depth": "basic"}))
@@ -0,0 +1,69 @@
+import asyncio
+import importlib
+
+import pytest
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    # server imports app, which creates its log, outputs and caches in the working directory
+    monkeypatch.chdir(tmp_path)
+    server = importlib.import_module("server")
+
+    async def fake_pipeline(query, mode=None, use_cache=None, refresh=False):
+        yield {"type": "node", "node": "research"}
+        for word in ("The ", "report."):
+            await asyncio.sleep(0.01)
+            yield {"type": "token", "text": word}
+        yield {"type": "result", "result": {"success": True, "answer": "The report."}}
+
+    monkeypatch.setattr(server, "stream_pipeline", fake_pipeline)
+    return server
+
+
+async def finished(job):
+    while not job.done:
+        await asyncio.sleep(0.005)
+
+
+def test_finished_job_keeps_node_and_result_events_only(server):
+    async def scenario():
+        service = server.ResearchService(max_concurrency=1)
+        service.start()
+        job, _ = service.submit("impact of AI on jobs")
+        await finished(job)
+        await service.stop()
+        return job
+
+    job = asyncio.run(scenario())
+    assert [event["type"] for event in job.events] == ["node", "result"]
+    assert job.result["answer"] == "The report."
+
+
+def test_live_follower_still_receives_every_token(server):
+    async def scenario():
+        service = server.ResearchService(max_concurrency=1)
+        service.start()
+        job, _ = service.submit("impact of AI on jobs")
+        events = [event async for event in job.follow()]
+        await service.stop()
+        return job, events
+
+    job, events = asyncio.run(scenario())
+    assert [event["type"] for event in events] == ["node", "token", "token", "result"]
+    assert [event["type"] for event in job.events] == ["node", "result"]
+
+
+def test_finished_jobs_expire_without_new_submissions(server):
+    async def scenario():
+        service = server.ResearchService(max_concurrency=1, retain_seconds=0.05)
+        service.start()
+        job, _ = service.submit("impact of AI on jobs")
+        await finished(job)
+        assert job.id in service.jobs
+        await asyncio.sleep(0.2)
+        await service.stop()
+        return service, job
+
+    service, job = asyncio.run(scenario())
+    assert job.id not in service.jobs
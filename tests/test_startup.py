@@ -0,0 +1,20 @@
+import pytest
+
+from benchmarks.bench_startup import STARTUP_BUDGET_MS, bench_startup
+
+ENTRY_POINTS = ["app", "batch", "server", "research"]
+
+
+@pytest.fixture(scope="module")
+def startup():
+    return bench_startup(ENTRY_POINTS, iterations=3)
+
+
+@pytest.mark.parametrize("module", ENTRY_POINTS)
+def test_entry_point_loads_no_heavy_dependencies(startup, module):
+    assert startup[module]["heavy_loaded"] == []
+
+
+@pytest.mark.parametrize("module", ENTRY_POINTS)
+def test_entry_point_imports_within_budget(startup, module):
+    assert startup[module]["p50_ms"] <= STARTUP_BUDGET_MS, startup[module]["heaviest"]